@@ -1,12 +1,35 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
 import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
 from requests.exceptions import RequestException
 from rest_framework import status
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
 
-SBDB_LOOKUP_URL = "https://ssd-api.jpl.nasa.gov/sbdb.api"
+from .metrics import SBDB_ERRORS, SBDB_REQUESTS, SBDB_SECONDS
+
+SBDB_LOOKUP_URL = os.getenv("SBDB_LOOKUP_URL", "https://ssd-api.jpl.nasa.gov/sbdb.api")
 DEFAULT_TIMEOUT = 10  # seconds
+DEFAULT_CONNECT_TIMEOUT = 3.05  # seconds, just over a TCP retransmit window
+# How long found / not-found lookups are served from the cache
+SBDB_CACHE_TTL_S = float(os.getenv("SBDB_CACHE_TTL_S", 24 * 60 * 60))
+SBDB_NOT_FOUND_TTL_S = float(os.getenv("SBDB_NOT_FOUND_TTL_S", 60 * 60))
+# Longest wait between retries, whatever Retry-After upstream asks for
+SBDB_MAX_RETRY_AFTER_S = float(os.getenv("SBDB_MAX_RETRY_AFTER_S", 5))
+# No retry starts later than this after the lookup began
+SBDB_DEADLINE_S = float(os.getenv("SBDB_DEADLINE_S", 10))
+# Optional directory persisting the cache across processes and restarts
+SBDB_CACHE_DIR = os.getenv("SBDB_CACHE_DIR") or None
 
 
 @dataclass
@@ -15,35 +38,272 @@ class SBDBError(Exception):
     http_status: int = status.HTTP_502_BAD_GATEWAY
 
 
-def call_sbdb_lookup(search_str: str):
-    """Call SBDB Lookup API with sstr=<search_str>.
-
-    SBDB returns either:
-      - `object` (dict) for an exact/unique match, or
-      - `list` (list of dicts) for multiple candidates, or
-      - `message` (string) for not found.
-
-    Docs: https://ssd-api.jpl.nasa.gov/ (SBDB Lookup)"""
-    params = {
-        "sstr": search_str,
-        "full-prec": "false",  # flag to request objects in full precision
-    }
-    try:
-        response = requests.get(SBDB_LOOKUP_URL, params=params)
-    except requests.RequestException as e:
-        raise SBDBError(f"Upstream SBDB error: {e}", status.HTTP_502_BAD_GATEWAY)
-
-    if response.status_code != 200:
-        raise SBDBError(
-            f"SBDB returned HTTP {response.status_code}", response.status_code
+def normalize_search_str(search_str: str) -> str:
+    """Cache key of a search: whitespace collapsed, case folded."""
+    return " ".join(search_str.split()).casefold()
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire individually.
+
+    With a `directory`, entries are also written there as one JSON file per
+    key, so other processes and restarts can reuse them.
+    """
+
+    def __init__(self, max_size: int = 1024, directory: Optional[str] = None):
+        self.max_size = max_size
+        self.directory = directory
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if not self.directory:
+            return None
+        try:
+            with open(self._file(key)) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("key") != key or stored.get("expires_at", 0) <= now:
+            return None
+        self._remember(key, stored["expires_at"], stored["value"])
+        return stored["value"]
+
+    def set(self, key: str, value: Any, ttl_s: float) -> None:
+        expires_at = time.time() + ttl_s
+        self._remember(key, expires_at, value)
+
+        if not self.directory:
+            return
+        # Write then rename, so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"key": key, "expires_at": expires_at, "value": value}, f)
+            os.replace(tmp_path, self._file(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# time.monotonic() after which the lookup in progress stops retrying
+_deadline: ContextVar[Optional[float]] = ContextVar("sbdb_deadline", default=None)
+
+
+class BoundedRetry(Retry):
+    """Retry waiting at most `max_wait_s` between attempts, clamping the
+    Retry-After header, and giving up instead of retrying past the deadline
+    of the lookup in progress."""
+
+    def __init__(self, *args, max_wait_s: float = SBDB_MAX_RETRY_AFTER_S, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_wait_s = max_wait_s
+
+    def new(self, **kw):
+        kw.setdefault("max_wait_s", self.max_wait_s)
+        return super().new(**kw)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.max_wait_s)
+
+    def get_backoff_time(self) -> float:
+        return min(super().get_backoff_time(), self.max_wait_s)
+
+    def increment(
+        self,
+        method=None,
+        url=None,
+        response=None,
+        error=None,
+        _pool=None,
+        _stacktrace=None,
+    ):
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        deadline = _deadline.get()
+        if deadline is not None:
+            # The same wait sleep() is about to take
+            wait = None
+            if response is not None and new_retry.respect_retry_after_header:
+                wait = new_retry.get_retry_after(response)
+            wait = wait or new_retry.get_backoff_time()
+            if time.monotonic() + wait >= deadline:
+                reason = error or ResponseError("SBDB lookup deadline exceeded")
+                raise MaxRetryError(_pool, url, reason) from reason
+        return new_retry
+
+
+class SBDBClient:
+    """SBDB Lookup API client with pooled keep-alive connections, bounded
+    timeouts, retries on 429/5xx and a TTL cache of answers.
+
+    Retries wait at most `max_retry_after_s` and none starts later than
+    `deadline_s` into the lookup, so a lookup takes at most `deadline_s`
+    plus one attempt's connect and read timeouts.
+
+    `transport` replaces the HTTP adapter mounted for `base_url`, so tests
+    and benchmarks can answer requests without the network. Pointing
+    `base_url` at a local server works as well.
+    """
+
+    def __init__(
+        self,
+        base_url: str = SBDB_LOOKUP_URL,
+        timeout: Union[float, Tuple[float, float]] = (
+            DEFAULT_CONNECT_TIMEOUT,
+            DEFAULT_TIMEOUT,
+        ),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_retry_after_s: float = SBDB_MAX_RETRY_AFTER_S,
+        deadline_s: float = SBDB_DEADLINE_S,
+        cache_ttl_s: float = SBDB_CACHE_TTL_S,
+        not_found_ttl_s: float = SBDB_NOT_FOUND_TTL_S,
+        cache_size: int = 1024,
+        cache_dir: Optional[str] = SBDB_CACHE_DIR,
+        pool_size: int = 10,
+        transport: Optional[BaseAdapter] = None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.deadline_s = deadline_s
+        self.cache_ttl_s = cache_ttl_s
+        self.not_found_ttl_s = not_found_ttl_s
+        self.cache = TTLCache(cache_size, cache_dir)
+
+        if transport is None:
+            transport = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=pool_size,
+                max_retries=BoundedRetry(
+                    total=retries,
+                    backoff_factor=backoff_factor,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                    respect_retry_after_header=True,
+                    max_wait_s=max_retry_after_s,
+                    # Hand the last response back instead of raising RetryError
+                    raise_on_status=False,
+                ),
+            )
+        self.session = requests.Session()
+        self.session.mount(base_url, transport)
+
+    def lookup(self, search_str: str) -> Dict[str, Any]:
+        """Call SBDB Lookup API with sstr=<search_str>, answering from the
+        cache when the same normalized search was made recently.
+
+        SBDB returns either:
+          - `object` (dict) for an exact/unique match, or
+          - `list` (list of dicts) for multiple candidates, or
+          - `message` (string) for not found.
+
+        Docs: https://ssd-api.jpl.nasa.gov/ (SBDB Lookup)"""
+        key = normalize_search_str(search_str)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        data = self._fetch(search_str)
+        not_found = "object" not in data and "list" not in data
+        self.cache.set(
+            key, data, self.not_found_ttl_s if not_found else self.cache_ttl_s
         )
+        return data
+
+    def _fetch(self, search_str: str) -> Dict[str, Any]:
+        params = {
+            "sstr": search_str,
+            "full-prec": "false",  # flag to request objects in full precision
+        }
+        SBDB_REQUESTS.inc()
+        start = time.perf_counter()
+        token = _deadline.set(time.monotonic() + self.deadline_s)
+        try:
+            response = self.session.get(
+                self.base_url, params=params, timeout=self.timeout
+            )
+        except requests.Timeout as e:
+            SBDB_ERRORS.labels("timeout").inc()
+            raise SBDBError(f"SBDB timed out: {e}", status.HTTP_504_GATEWAY_TIMEOUT)
+        except RequestException as e:
+            SBDB_ERRORS.labels("connection").inc()
+            raise SBDBError(f"Upstream SBDB error: {e}", status.HTTP_502_BAD_GATEWAY)
+        finally:
+            _deadline.reset(token)
+            SBDB_SECONDS.observe(time.perf_counter() - start)
 
-    try:
-        data = response.json()
-    except ValueError:
-        raise SBDBError("SBDB response was not valid JSON")
+        if response.status_code != 200:
+            SBDB_ERRORS.labels("http").inc()
+            raise SBDBError(
+                f"SBDB returned HTTP {response.status_code}", response.status_code
+            )
 
-    return data
+        try:
+            data = response.json()
+        except ValueError:
+            SBDB_ERRORS.labels("invalid").inc()
+            raise SBDBError("SBDB response was not valid JSON")
+        if not isinstance(data, dict):
+            SBDB_ERRORS.labels("invalid").inc()
+            raise SBDBError("SBDB response was not a JSON object")
+
+        return data
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[SBDBClient] = None
+_client_lock = threading.Lock()
+
+
+def get_sbdb_client() -> SBDBClient:
+    """Process-wide SBDB client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SBDBClient()
+        return _client
+
+
+def set_sbdb_client(client: Optional[SBDBClient]) -> None:
+    """Replace the process-wide client, e.g. with one on a fake transport."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def call_sbdb_lookup(search_str: str):
+    """Look up search_str through the shared client, see SBDBClient.lookup."""
+    return get_sbdb_client().lookup(search_str)
 
 
 def extract_spkid(data) -> str:
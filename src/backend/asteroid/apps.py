@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AsteroidConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "asteroid"
+
+    def ready(self):
+        from .datasets import warm_up
+
+        warm_up()
@@ -0,0 +1,313 @@
+import math
+from typing import Any, Dict
+
+import numpy as np
+
+from .constants import (CRATER_A, CRATER_B, CRATER_MATERIAL_SF,
+                        EARTH_GRAVITATIONAL_CONSTANT, ENTRY_HEIGHT_M, J_PER_MT,
+                        RING_THRESHOLDS_KPA, SIMPLE_CRATER_DEPTH_FACTOR,
+                        SIMPLE_TRANSIENT_TO_FINAL_FACTOR)
+from .utils import as_float_columns, is_finite_positive, raise_for_invalid_rows
+
+# ---------------------------------------------
+# Kernels
+#
+# Array versions of the formulas of the scalar functions in calculations.py /
+# physics_helpers.py. NumPy's pow loops and the libm pow behind Python's **
+# differ in the last bit for a few percent of inputs, so results cannot be
+# bit-identical. Given the same inputs, a kernel agrees with its scalar
+# function to within KERNEL_RTOL relative. fall_time_kernel and
+# impact_mass_kernel subtract two nearly equal terms, so for them the bound is
+# relative to the larger term instead: v / g for fall times, the entry mass
+# for impact masses. Kernels do no validation.
+# ---------------------------------------------
+
+KERNEL_RTOL = 1e-12
+
+
+def volume_kernel(diameter_m: np.ndarray) -> np.ndarray:
+    radius_m = diameter_m / 2.0
+    return (4.0 / 3.0) * math.pi * (radius_m**3)
+
+
+def impact_energy_kernel(mass_kg: np.ndarray, velocity_m_s: np.ndarray) -> np.ndarray:
+    E_joules = 0.5 * mass_kg * (velocity_m_s**2)
+    return E_joules / J_PER_MT
+
+
+def impact_mass_kernel(
+    entry_mass_kg: np.ndarray,
+    entry_velocity_m_s: np.ndarray,
+    decay_time_s: np.ndarray,
+    asteroid_density: np.ndarray,
+) -> np.ndarray:
+    impact_mass_kg = entry_mass_kg - (
+        entry_velocity_m_s**2 * decay_time_s * 0.0025 ** (1 / 3)
+    ) / (asteroid_density ** (1 / 3))
+    # Same as max(0, impact_mass_kg), NaN included
+    return np.where(impact_mass_kg > 0, impact_mass_kg, 0.0)
+
+
+def crater_diameter_transient_kernel(
+    E_mt: np.ndarray, scaling_factor: np.ndarray
+) -> np.ndarray:
+    return CRATER_A * (E_mt * scaling_factor * J_PER_MT) ** CRATER_B
+
+
+def fall_time_kernel(
+    staring_height_m: np.ndarray, velocity_m_s: np.ndarray
+) -> np.ndarray:
+    return (
+        np.sqrt(
+            velocity_m_s**2 / EARTH_GRAVITATIONAL_CONSTANT**2
+            + 2 * staring_height_m / EARTH_GRAVITATIONAL_CONSTANT
+        )
+        - velocity_m_s / EARTH_GRAVITATIONAL_CONSTANT
+    )
+
+
+def ring_radius_kernel(
+    E_mt: np.ndarray,
+    pressure_pa: np.ndarray,
+    asteroid_diameter_m: np.ndarray,
+    scaling_factor: np.ndarray,
+) -> np.ndarray:
+    E_joules = E_mt * J_PER_MT
+    asteroid_radius_m = asteroid_diameter_m / 2.0
+    volume = (4.0 / 3.0) * math.pi * (scaling_factor * asteroid_radius_m) ** 3.0
+    return (scaling_factor * asteroid_radius_m) * (
+        (E_joules * 3.0) / (pressure_pa * volume)
+    ) ** (1.0 / 3.0)
+
+
+# ---------------------------------------------
+# Validation helpers
+# ---------------------------------------------
+
+
+def _is_nan_or_inf(values: np.ndarray) -> np.ndarray:
+    """Rows the scalar functions reject after their `<= 0 -> 0` shortcut."""
+    return ~(values <= 0) & ~np.isfinite(values)
+
+
+def _material_scaling_factors(material_type: Any, length: int) -> np.ndarray:
+    """CRATER_MATERIAL_SF per row, NaN for unknown materials."""
+    materials = np.broadcast_to(np.asarray(material_type), (length,))
+    scaling_factors = np.full(length, np.nan)
+    for material, scaling_factor in CRATER_MATERIAL_SF.items():
+        scaling_factors[materials == material] = scaling_factor
+    return scaling_factors
+
+
+# ---------------------------------------------
+# Batch functions
+#
+# Each mirrors the scalar function of the same name: same formula, same
+# `<= 0 -> 0` shortcuts, and the rows the scalar version would raise on are
+# reported together in one RowValidationError.
+# ---------------------------------------------
+
+
+def calculate_volume_batch(diameter_m: Any) -> np.ndarray:
+    """Sphere volumes (m^3) from diameters (m), see physics_helpers.calculate_volume."""
+    (diameter_m,) = as_float_columns(diameter_m=diameter_m)
+    raise_for_invalid_rows({"diameter_m": ~is_finite_positive(diameter_m)})
+    return volume_kernel(diameter_m)
+
+
+def calculate_mass_batch(volume_m3: Any, density_kg_m3: Any) -> np.ndarray:
+    """Masses (kg) from volumes and densities, see physics_helpers.calculate_mass."""
+    volume_m3, density_kg_m3 = as_float_columns(
+        volume_m3=volume_m3, density_kg_m3=density_kg_m3
+    )
+    raise_for_invalid_rows(
+        {
+            "volume_m3": ~is_finite_positive(volume_m3),
+            "density_kg_m3": ~is_finite_positive(density_kg_m3),
+        }
+    )
+    return volume_m3 * density_kg_m3
+
+
+def calculate_impact_energy_batch(mass_kg: Any, velocity_m_s: Any) -> np.ndarray:
+    """Impact energies (Mt TNT), see calculations.calculate_impact_energy."""
+    mass_kg, velocity_m_s = as_float_columns(mass_kg=mass_kg, velocity_m_s=velocity_m_s)
+    active = is_finite_positive(mass_kg)
+    raise_for_invalid_rows(
+        {
+            "mass_kg": _is_nan_or_inf(mass_kg),
+            "velocity_m_s": active & ~is_finite_positive(velocity_m_s),
+        }
+    )
+
+    E_mt = np.zeros_like(mass_kg)
+    E_mt[active] = impact_energy_kernel(mass_kg[active], velocity_m_s[active])
+    return E_mt
+
+
+def calculate_asteroid_impact_mass_batch(
+    entry_mass_kg: Any,
+    entry_velocity_m_s: Any,
+    decay_time_s: Any,
+    asteroid_density: Any,
+) -> np.ndarray:
+    """Masses left at impact (kg), see calculations.caclulate_asteroid_impact_mass."""
+    columns = as_float_columns(
+        entry_mass_kg=entry_mass_kg,
+        entry_velocity_m_s=entry_velocity_m_s,
+        decay_time_s=decay_time_s,
+        asteroid_density=asteroid_density,
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return impact_mass_kernel(*columns)
+
+
+def calculate_crater_depth_final_batch(D_f_m: Any) -> np.ndarray:
+    """Simple crater depths (m), see calculations.calculate_crater_depth_final."""
+    (D_f_m,) = as_float_columns(D_f_m=D_f_m)
+    raise_for_invalid_rows({"D_f_m": _is_nan_or_inf(D_f_m)})
+    return np.where(D_f_m > 0, D_f_m * SIMPLE_CRATER_DEPTH_FACTOR, 0.0)
+
+
+def calculate_crater_diameter_final_batch(D_tc_m: Any) -> np.ndarray:
+    """Final crater diameters (m), see calculations.calculate_crater_diameter_final."""
+    (D_tc_m,) = as_float_columns(D_tc_m=D_tc_m)
+    raise_for_invalid_rows({"D_tc_m": _is_nan_or_inf(D_tc_m)})
+    return np.where(D_tc_m > 0, D_tc_m * SIMPLE_TRANSIENT_TO_FINAL_FACTOR, 0.0)
+
+
+def calculate_crater_diameter_transient_batch(
+    E_mt: Any, material_type: Any
+) -> np.ndarray:
+    """Transient crater diameters (m), see
+    calculations.calculate_crater_diameter_transient."""
+    (E_mt,) = as_float_columns(E_mt=E_mt)
+    scaling_factors = _material_scaling_factors(material_type, len(E_mt))
+    active = is_finite_positive(E_mt)
+    raise_for_invalid_rows(
+        {
+            "E_mt": _is_nan_or_inf(E_mt),
+            "material_type": active & np.isnan(scaling_factors),
+        }
+    )
+
+    D_tc_m = np.zeros_like(E_mt)
+    D_tc_m[active] = crater_diameter_transient_kernel(
+        E_mt[active], scaling_factors[active]
+    )
+    return D_tc_m
+
+
+def calculate_fall_time_batch(staring_height_m: Any, velocity_m_s: Any) -> np.ndarray:
+    """Fall times (s), see calculations.calculate_fall_time."""
+    columns = as_float_columns(
+        staring_height_m=staring_height_m, velocity_m_s=velocity_m_s
+    )
+    with np.errstate(invalid="ignore"):
+        return fall_time_kernel(*columns)
+
+
+def calculate_ring_radius_batch(
+    E_mt: Any, pressure_pa: Any, asteroid_diameter_m: Any, material_type: Any
+) -> np.ndarray:
+    """Blast ring radii (m), see calculations.calculate_ring_radius."""
+    E_mt, pressure_pa, asteroid_diameter_m = as_float_columns(
+        E_mt=E_mt, pressure_pa=pressure_pa, asteroid_diameter_m=asteroid_diameter_m
+    )
+    scaling_factors = _material_scaling_factors(material_type, len(E_mt))
+    active = E_mt != 0
+    raise_for_invalid_rows({"material_type": active & np.isnan(scaling_factors)})
+
+    ring_radius_m = np.zeros_like(E_mt)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ring_radius_m[active] = ring_radius_kernel(
+            E_mt[active],
+            pressure_pa[active],
+            asteroid_diameter_m[active],
+            scaling_factors[active],
+        )
+    return ring_radius_m
+
+
+def calculate_rings_batch(
+    E_mt: Any, asteroid_diameter_m: Any, material_type: Any
+) -> Dict[str, np.ndarray]:
+    """Ring radii per threshold as columns "kpa_70" ... "kpa_3", see
+    calculations.calculate_rings."""
+    return {
+        f"kpa_{kpa}": calculate_ring_radius_batch(
+            E_mt, kpa * 1_000.0, asteroid_diameter_m, material_type  # kPa -> Pa
+        )
+        for kpa in RING_THRESHOLDS_KPA
+    }
+
+
+def run_physics_batch(
+    diameter_m: Any,
+    density_kg_m3: Any,
+    entry_velocity_m_s: Any,
+    material_type: Any,
+    fall_height_m: float = ENTRY_HEIGHT_M,
+) -> Dict[str, np.ndarray]:
+    """
+    Run the simulation physics chain (everything but population and
+    trajectory) for many scenarios at once.
+
+    Params:
+        diameter_m (array): asteroid diameters in meters (m)
+        density_kg_m3 (array): densities in kilograms per cubic meter (kg/m^3)
+        entry_velocity_m_s (array): entry velocities in meters per second (m/s)
+        material_type (array): one of "sedimentary" | "crystalline" | "water" per row
+        fall_height_m (float): entry height in meters (m)
+
+    Returns:
+        dict[str, np.ndarray]: one column per output; each is within the
+        KERNEL_RTOL bound of its scalar function applied to the columns
+        before it, as in the scalar chain of simulations.run_simulation
+
+    Raises:
+        RowValidationError: listing every invalid input row at once
+    """
+    diameter_m, density_kg_m3, entry_velocity_m_s = as_float_columns(
+        diameter_m=diameter_m,
+        density_kg_m3=density_kg_m3,
+        entry_velocity_m_s=entry_velocity_m_s,
+    )
+    raise_for_invalid_rows(
+        {
+            "diameter_m": ~is_finite_positive(diameter_m),
+            "density_kg_m3": ~is_finite_positive(density_kg_m3),
+            "entry_velocity_m_s": ~is_finite_positive(entry_velocity_m_s),
+            "material_type": np.isnan(
+                _material_scaling_factors(material_type, len(diameter_m))
+            ),
+        }
+    )
+
+    fall_time_s = calculate_fall_time_batch(fall_height_m, entry_velocity_m_s)
+    volume_m3 = calculate_volume_batch(diameter_m)
+    mass_kg = calculate_mass_batch(volume_m3, density_kg_m3)
+    impact_mass_kg = calculate_asteroid_impact_mass_batch(
+        mass_kg, entry_velocity_m_s, fall_time_s, density_kg_m3
+    )
+    energy_mt = calculate_impact_energy_batch(impact_mass_kg, entry_velocity_m_s)
+    crater_transient_diameter_m = calculate_crater_diameter_transient_batch(
+        energy_mt, material_type
+    )
+    crater_final_diameter_m = calculate_crater_diameter_final_batch(
+        crater_transient_diameter_m
+    )
+    crater_depth_m = calculate_crater_depth_final_batch(crater_final_diameter_m)
+    rings = calculate_rings_batch(energy_mt, diameter_m, material_type)
+
+    return {
+        "fall_time_s": fall_time_s,
+        "volume_m3": volume_m3,
+        "mass_kg": mass_kg,
+        "impact_mass_kg": impact_mass_kg,
+        "energy_mt": energy_mt,
+        "crater_transient_diameter_m": crater_transient_diameter_m,
+        "crater_final_diameter_m": crater_final_diameter_m,
+        "crater_depth_m": crater_depth_m,
+        **rings,
+    }
@@ -1,10 +1,8 @@
+import heapq
 import math
-import os
-from typing import Any, List, Tuple
+from typing import Any, Iterator, List, Optional, Tuple
 
 import numpy as np
-import rioxarray
-from pyproj import Transformer, Proj, transform
 
 from .constants import *
 from .utils import as_finite_positive_float
@@ -133,10 +131,8 @@ def calculate_rings(
     E_mt: float, asteroid_diameter_m: float, material_type: str
 ) -> Dict[str, List[Dict[str, Any]]]:
     """Build the rings dict from pressure thresholds (kPa)."""
-    thresholds_kpa = [70, 50, 35, 20, 10, 3]
-
     rings: Dict[str, Any] = {}
-    for kpa in thresholds_kpa:
+    for kpa in RING_THRESHOLDS_KPA:
         radius_m = calculate_ring_radius(
             E_mt,
             kpa * 1_000.0,  # kPa -> Pa
@@ -168,107 +164,252 @@ def calculate_ring_radius(
     return ring_radius_m
 
 
-def calculate_asteroid_fall_trajecotry_coordinates(
+def fall_trajectory_samples(
+    lat_deg: float,
+    lon_deg: float,
     azimuth_angle_deg: float,
     entry_angle_deg: float,
     entry_velocity_m_s: float,
     fall_time_s: float,
-) -> float:
-    asteroid_coordinates = []
-    entry_angle_deg = max(entry_angle_deg, 0.1)
-    entry_angle_deg = min(entry_angle_deg, 89.9)
-
-    for time_moment_s in np.arange(0, fall_time_s + 1, 1):
-        inverted_time_moment_s = fall_time_s - time_moment_s
+    time_moments_s: np.ndarray,
+) -> np.ndarray:
+    """
+    Positions on the straight-line fall path ending at the aim point.
 
-        h = (
-            entry_velocity_m_s * inverted_time_moment_s
-            + 0.5 * EARTH_GRAVITATIONAL_CONSTANT * inverted_time_moment_s**2
-        )
+    Params:
+        lat_deg (float): aim point latitude in degrees
+        lon_deg (float): aim point longitude in degrees
+        azimuth_angle_deg (float): direction of travel, 0°=North, 90°=East
+        entry_angle_deg (float): entry angle from horizontal in degrees
+        entry_velocity_m_s (float): entry velocity in meters per second (m/s)
+        fall_time_s (float): time from spawn to impact in seconds (s)
+        time_moments_s (np.ndarray): sample times in seconds from spawn
 
-        x_m = (
-            h * math.sin(azimuth_angle_deg) / math.tan(entry_angle_deg)
-        )
-        y_m = (
-            h * math.cos(azimuth_angle_deg) / math.tan(entry_angle_deg)
-        )
+    Returns:
+        np.ndarray: (n, 4) rows of [t, lon, lat, h], h rounded to meters
+    """
+    entry_angle_deg = max(entry_angle_deg, 0.1)
+    entry_angle_deg = min(entry_angle_deg, 89.9)
 
-        utm = Proj(proj="utm", zone=33, ellps="WGS84")
-        wgs84 = Proj(proj="latlon", datum="WGS84")
+    # Samples after impact stay on the ground
+    inverted_time_moments_s = np.maximum(fall_time_s - time_moments_s, 0.0)
 
-        lon, lat = transform(utm, wgs84, x_m, y_m)
+    h = (
+        entry_velocity_m_s * inverted_time_moments_s
+        + 0.5 * EARTH_GRAVITATIONAL_CONSTANT * inverted_time_moments_s**2
+    )
 
-        # Weird way to store, but cezium wants this
-        asteroid_coordinates.append(round(time_moment_s))
-        asteroid_coordinates.append(lon)
-        asteroid_coordinates.append(lat)
-        asteroid_coordinates.append(round(h))
+    # Horizontal distance still to travel, measured back from the aim point
+    ground_distance_m = h / math.tan(math.radians(entry_angle_deg))
+    back_azimuth_deg = np.full_like(ground_distance_m, azimuth_angle_deg + 180.0)
+    lon, lat, _ = WGS84.fwd(
+        np.full_like(ground_distance_m, lon_deg),
+        np.full_like(ground_distance_m, lat_deg),
+        back_azimuth_deg,
+        ground_distance_m,
+    )
 
-    return asteroid_coordinates
+    return np.column_stack([time_moments_s, lon, lat, np.rint(h)])
 
 
-def get_population_in_radius(
-    latitude: float, longtitude: float, radius_m: float
-) -> float:
-    """
-    Inputs: impact longtitude, impact latitude, impact radius (m)
-    Outputs: Approximate population in circle radius
+def calculate_asteroid_fall_trajecotry_coordinates(
+    lat_deg: float,
+    lon_deg: float,
+    azimuth_angle_deg: float,
+    entry_angle_deg: float,
+    entry_velocity_m_s: float,
+    fall_time_s: float,
+) -> List[float]:
     """
+    Sample the straight-line fall path ending at the aim point once per second.
 
-    ghsl_file = os.getenv("DATASET_GHS_POP_URL")
-    ghsl = rioxarray.open_rasterio(ghsl_file)
-
-    transformer = Transformer.from_crs("EPSG:4326", "ESRI:54009", always_xy=True)
-    center_x, center_y = transformer.transform(longtitude, latitude)
+    Params:
+        lat_deg (float): aim point latitude in degrees
+        lon_deg (float): aim point longitude in degrees
+        azimuth_angle_deg (float): direction of travel, 0°=North, 90°=East
+        entry_angle_deg (float): entry angle from horizontal in degrees
+        entry_velocity_m_s (float): entry velocity in meters per second (m/s)
+        fall_time_s (float): time from spawn to impact in seconds (s)
 
-    resolution_m = abs(ghsl.rio.resolution()[0])
+    Returns:
+        list: flat [t, lon, lat, h, t, lon, lat, h, ...] samples as Cesium
+        expects them, t in seconds from spawn and h in meters
+    """
+    # The last whole second can fall after impact, it stays on the ground
+    time_moments_s = np.arange(0, fall_time_s + 1, 1)
+
+    # Weird way to store, but cezium wants this
+    asteroid_coordinates = fall_trajectory_samples(
+        lat_deg,
+        lon_deg,
+        azimuth_angle_deg,
+        entry_angle_deg,
+        entry_velocity_m_s,
+        fall_time_s,
+        time_moments_s.astype(float),
+    )
+    return asteroid_coordinates.ravel().tolist()
 
-    multiplier = 1
-    if radius_m < resolution_m / 2:
-        multiplier = radius_m / resolution_m
-        radius_m = resolution_m / 2
 
-    radius_in_pixels = int(np.ceil(radius_m / resolution_m)) + 1
+def iter_fall_trajectory_chunks(
+    lat_deg: float,
+    lon_deg: float,
+    azimuth_angle_deg: float,
+    entry_angle_deg: float,
+    entry_velocity_m_s: float,
+    fall_time_s: float,
+    step_s: float = 1.0,
+    chunk_samples: int = 4096,
+    times_s: Optional[np.ndarray] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Sample the fall path every step_s seconds, or at times_s when given,
+    chunk_samples samples at a time.
 
-    try:
-        x_coords = ghsl.x.values
-        y_coords = ghsl.y.values
+    Only one chunk is held in memory, however many samples the path has.
+    With step_s=1 the chunks concatenate to
+    calculate_asteroid_fall_trajecotry_coordinates().
 
-        # Optimization
-        # Find nearest indices
-        x_idx = np.argmin(np.abs(x_coords - center_x))
-        y_idx = np.argmin(np.abs(y_coords - center_y))
+    Params:
+        (as calculate_asteroid_fall_trajecotry_coordinates)
+        step_s (float): time between samples in seconds (s)
+        chunk_samples (int): samples per yielded chunk
+        times_s (np.ndarray | None): explicit sample times, e.g. from
+            select_fall_trajectory_times(); overrides step_s
+
+    Yields:
+        np.ndarray: (n <= chunk_samples, 4) rows of [t, lon, lat, h]
+    """
+    if times_s is None:
+        step_s = as_finite_positive_float("step_s", step_s)
+        # Same sample count as np.arange(0, fall_time_s + step_s, step_s)
+        total = int(math.ceil((fall_time_s + step_s) / step_s))
+    else:
+        total = len(times_s)
+
+    for start in range(0, total, chunk_samples):
+        stop = min(start + chunk_samples, total)
+        if times_s is None:
+            chunk_times_s = np.arange(start, stop, dtype=float) * step_s
+        else:
+            chunk_times_s = np.asarray(times_s[start:stop], dtype=float)
+        yield fall_trajectory_samples(
+            lat_deg,
+            lon_deg,
+            azimuth_angle_deg,
+            entry_angle_deg,
+            entry_velocity_m_s,
+            fall_time_s,
+            chunk_times_s,
+        )
 
-        # Create slice with bounds checking
-        x_min = max(0, x_idx - radius_in_pixels)
-        x_max = min(len(x_coords), x_idx + radius_in_pixels)
-        y_min = max(0, y_idx - radius_in_pixels)
-        y_max = min(len(y_coords), y_idx + radius_in_pixels)
 
-        # Slice the data (load only the region we need)
-        subset = ghsl.isel(x=slice(x_min, x_max), y=slice(y_min, y_max))
+def geodetic_to_ecef(
+    lon_deg: np.ndarray, lat_deg: np.ndarray, h_m: np.ndarray
+) -> np.ndarray:
+    """(n, 3) WGS-84 earth-centred earth-fixed positions in meters (m)."""
+    lon, lat = np.radians(lon_deg), np.radians(lat_deg)
+    prime_vertical_m = WGS84.a / np.sqrt(1 - WGS84.es * np.sin(lat) ** 2)
+    return np.column_stack(
+        [
+            (prime_vertical_m + h_m) * np.cos(lat) * np.cos(lon),
+            (prime_vertical_m + h_m) * np.cos(lat) * np.sin(lon),
+            (prime_vertical_m * (1 - WGS84.es) + h_m) * np.sin(lat),
+        ]
+    )
 
-        # Get coordinates for each pixel in subset
-        xx, yy = np.meshgrid(subset.x.values, subset.y.values)
 
-        # Calculate distances from center
-        distances = np.sqrt((xx - center_x) ** 2 + (yy - center_y) ** 2)
+def _interpolation_error_m(
+    times_s: np.ndarray, positions_m: np.ndarray, first: int, last: int
+) -> Tuple[float, int]:
+    """Largest distance between the candidates strictly inside [first, last]
+    and the straight line interpolated in time between its end points, and
+    the candidate where it occurs."""
+    if last - first < 2:
+        return 0.0, first
+    fraction = (times_s[first + 1 : last] - times_s[first]) / (
+        times_s[last] - times_s[first]
+    )
+    interpolated_m = positions_m[first] + fraction[:, None] * (
+        positions_m[last] - positions_m[first]
+    )
+    error_m = np.linalg.norm(positions_m[first + 1 : last] - interpolated_m, axis=1)
+    worst = int(np.argmax(error_m))
+    return float(error_m[worst]), first + 1 + worst
 
-        # Create mask for pixels within radius
-        mask = distances <= radius_m
 
-        # Apply mask and sum (only loads the subset into memory)
-        ghsl_values = subset.values
-        if ghsl_values.ndim == 3:  # If there's a band dimension
-            ghsl_values = ghsl_values[0]
+def select_fall_trajectory_times(
+    lat_deg: float,
+    lon_deg: float,
+    azimuth_angle_deg: float,
+    entry_angle_deg: float,
+    entry_velocity_m_s: float,
+    fall_time_s: float,
+    tolerance_m: Optional[float] = None,
+    max_points: Optional[int] = None,
+    candidates: int = 4096,
+) -> np.ndarray:
+    """
+    Fewest sample times whose linear-in-time interpolation (what Cesium's
+    SampledPositionProperty does) stays within tolerance_m of the fall path,
+    and/or the max_points times that keep that error smallest.
 
-        population = float(np.sum(ghsl_values[mask])) * multiplier
+    The path is sampled at `candidates` evenly spaced times and simplified
+    with Douglas-Peucker on the time-synchronous distance: the segment with
+    the largest error is split at its worst candidate until the error is
+    within tolerance_m or max_points times are chosen. The high, nearly
+    straight part of the path needs few points; curvature of the Earth and
+    gravity add them where the path bends.
 
-    except Exception as e:
-        print(f"Error: {e}")
-        return None
+    Params:
+        (as calculate_asteroid_fall_trajecotry_coordinates)
+        tolerance_m (float | None): largest allowed interpolation error (m)
+        max_points (int | None): most sample times to return, >= 2
+        candidates (int): dense samples the times are chosen from
 
-    return population
+    Returns:
+        np.ndarray: increasing sample times in seconds from spawn, starting
+        at 0 and ending at impact
+    """
+    if tolerance_m is None and max_points is None:
+        raise ValueError("Give tolerance_m, max_points or both.")
+    if tolerance_m is not None:
+        tolerance_m = as_finite_positive_float("tolerance_m", tolerance_m)
+    if max_points is not None and (
+        isinstance(max_points, bool)
+        or not isinstance(max_points, int)
+        or max_points < 2
+    ):
+        raise ValueError("max_points must be an integer >= 2.")
+
+    times_s = np.linspace(0.0, fall_time_s, candidates)
+    samples = fall_trajectory_samples(
+        lat_deg,
+        lon_deg,
+        azimuth_angle_deg,
+        entry_angle_deg,
+        entry_velocity_m_s,
+        fall_time_s,
+        times_s,
+    )
+    positions_m = geodetic_to_ecef(samples[:, 1], samples[:, 2], samples[:, 3])
+
+    chosen = [0, candidates - 1]
+    limit = max_points if max_points is not None else candidates
+    error_m, worst = _interpolation_error_m(times_s, positions_m, 0, candidates - 1)
+    # Max-heap of segments by error: (-error, first, last, worst)
+    segments = [(-error_m, 0, candidates - 1, worst)]
+    while segments and len(chosen) < limit:
+        negative_error_m, first, last, worst = heapq.heappop(segments)
+        if -negative_error_m <= (tolerance_m or 0.0):
+            break
+        chosen.append(worst)
+        for a, b in ((first, worst), (worst, last)):
+            error_m, split = _interpolation_error_m(times_s, positions_m, a, b)
+            if error_m > 0:
+                heapq.heappush(segments, (-error_m, a, b, split))
+
+    return times_s[np.sort(chosen)]
 
 
 def ground_intercept_from_spawn(
@@ -0,0 +1,212 @@
+import csv
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from .api_calls import normalize_search_str
+from .models import Asteroid
+
+# SPK-IDs of numbered asteroids are 20000000 + number
+NUMBERED_SPKID_OFFSET = 20_000_000
+
+# Catalog column -> Asteroid field. SBDB Query API field names first, then the
+# MPC (MPCORB JSON) spellings of the same quantities.
+COLUMN_FIELDS = {
+    "spkid": "spkid",
+    "full_name": "full_name",
+    "pdes": "designation",
+    "name": "name",
+    "neo": "neo",
+    "pha": "pha",
+    "H": "h_mag",
+    "diameter": "diameter_km",
+    "albedo": "albedo",
+    "epoch": "epoch_jd",
+    "e": "eccentricity",
+    "a": "semi_major_axis_au",
+    "q": "perihelion_au",
+    "i": "inclination_deg",
+    "om": "ascending_node_deg",
+    "w": "perihelion_arg_deg",
+    "ma": "mean_anomaly_deg",
+    # MPC
+    "Name": "name",
+    "Principal_desig": "designation",
+    "NEO_flag": "neo",
+    "PHA_flag": "pha",
+    "Epoch": "epoch_jd",
+    "Node": "ascending_node_deg",
+    "Peri": "perihelion_arg_deg",
+    "M": "mean_anomaly_deg",
+    "Perihelion_dist": "perihelion_au",
+}
+
+FLOAT_FIELDS = (
+    "h_mag",
+    "diameter_km",
+    "albedo",
+    "epoch_jd",
+    "eccentricity",
+    "semi_major_axis_au",
+    "perihelion_au",
+    "inclination_deg",
+    "ascending_node_deg",
+    "perihelion_arg_deg",
+    "mean_anomaly_deg",
+)
+BOOL_FIELDS = ("neo", "pha")
+TEXT_FIELDS = ("full_name", "designation", "name")
+
+# Every field a re-run overwrites
+UPSERT_FIELDS = [
+    *TEXT_FIELDS,
+    "normalized_name",
+    "normalized_designation",
+    *BOOL_FIELDS,
+    *FLOAT_FIELDS,
+    "updated_at",
+]
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return float(value)
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().upper() in ("Y", "YES", "TRUE", "1")
+    return bool(value)
+
+
+def row_to_asteroid(row: Dict[str, Any]) -> Asteroid:
+    """
+    Build an unsaved Asteroid from one catalog row.
+
+    Rows without an spkid take it from their MPC "Number" (numbered objects).
+
+    Raises:
+        ValueError: no spkid can be determined, or a numeric column is not a number
+    """
+    fields: Dict[str, Any] = {}
+    for column, value in row.items():
+        field = COLUMN_FIELDS.get(column)
+        if field is not None:
+            fields[field] = value
+
+    spkid = fields.get("spkid")
+    if spkid in (None, "") and row.get("Number") not in (None, ""):
+        number = str(row["Number"]).strip("() ")
+        spkid = NUMBERED_SPKID_OFFSET + int(number)
+        fields.setdefault("designation", number)
+    if spkid in (None, ""):
+        raise ValueError(f"Catalog row has no spkid: {row}")
+
+    values: Dict[str, Any] = {"spkid": int(spkid)}
+    for field in TEXT_FIELDS:
+        values[field] = str(fields.get(field) or "").strip()
+    for field in BOOL_FIELDS:
+        values[field] = _flag(fields.get(field))
+    for field in FLOAT_FIELDS:
+        values[field] = _float_or_none(fields.get(field))
+    values["normalized_name"] = normalize_search_str(
+        values["name"] or values["designation"]
+    )
+    values["normalized_designation"] = normalize_search_str(values["designation"])
+    return Asteroid(**values)
+
+
+def read_catalog(path: str, file_format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yield catalog rows as dicts from a JSON or CSV dump.
+
+    JSON may be an SBDB Query API response ({"fields": [...], "data": [[...]]})
+    or a list of objects (e.g. MPCORB JSON). CSV needs a header row. CSV is
+    streamed; JSON is parsed whole.
+    """
+    file_format = file_format or os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format == "csv":
+        with open(path, newline="") as f:
+            yield from csv.DictReader(f)
+    elif file_format == "json":
+        with open(path) as f:
+            payload = json.load(f)
+        if isinstance(payload, dict) and "fields" in payload:
+            fields = payload["fields"]
+            for values in payload.get("data", []):
+                yield dict(zip(fields, values))
+        elif isinstance(payload, list):
+            yield from payload
+        else:
+            raise ValueError(
+                "JSON catalog must be an SBDB query response or a list of objects."
+            )
+    else:
+        raise ValueError(
+            f"Unsupported catalog format '{file_format}', use json or csv."
+        )
+
+
+def _batches(rows: Iterable[Asteroid], batch_size: int) -> Iterator[List[Asteroid]]:
+    # Keyed by spkid: a conflicting upsert must not touch one row twice
+    batch: Dict[int, Asteroid] = {}
+    for asteroid in rows:
+        batch[asteroid.spkid] = asteroid
+        if len(batch) >= batch_size:
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+
+
+def upsert_catalog(
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = 5_000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Insert or update catalog rows keyed by spkid, in bulk batches inside one
+    transaction, so a failed load leaves the table untouched and re-running
+    the same dump changes nothing.
+
+    Returns:
+        int: number of rows written
+    """
+    written = 0
+    with transaction.atomic():
+        for batch in _batches(map(row_to_asteroid, rows), batch_size):
+            Asteroid.objects.bulk_create(
+                batch,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["spkid"],
+                update_fields=UPSERT_FIELDS,
+            )
+            written += len(batch)
+            if progress is not None:
+                progress(written)
+    return written
+
+
+def find_spkid(search_str: str) -> Optional[int]:
+    """SPK-ID of the catalog object named, numbered or designated search_str."""
+    key = normalize_search_str(search_str)
+    if not key:
+        return None
+
+    query = Q(normalized_name=key) | Q(normalized_designation=key)
+    # "99942" and "(99942)" both mean numbered asteroid 99942
+    number = key.strip("()")
+    if number.isdigit():
+        query |= Q(spkid=NUMBERED_SPKID_OFFSET + int(number))
+
+    return (
+        Asteroid.objects.filter(query, spkid__isnull=False)
+        .order_by("spkid")
+        .values_list("spkid", flat=True)
+        .first()
+    )
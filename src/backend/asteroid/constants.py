@@ -29,6 +29,9 @@ KPA_FATALITY_RATE: Dict[str, float] = {
     "kpa_3": 0,
 }
 
+# Overpressure thresholds (kPa) of the blast rings, strongest first
+RING_THRESHOLDS_KPA = (70, 50, 35, 20, 10, 3)
+
 CRATER_A: float = 0.0162  # <-- document source
 CRATER_B: float = 0.29  # <-- document source
 
@@ -36,7 +39,20 @@ SEMI_MAJOR_AXIS_ECCENTRY_RATIO = 1.4956 * 10**11  # Earth
 
 EARTH_GRAVITATIONAL_CONSTANT = 9.81  # m/s^2
 EARTH_RADIUS_M = 6378137
+ENTRY_HEIGHT_M = 120 * 1000  # atmospheric entry height the fall starts at
 # ---------------- ASK PHYSICIST FOR SOURCES SO I CAN CITE HERE IN COMMENTS ----------------
 
+# Atmospheric entry (asteroid.entry). Exponential atmosphere and
+# strength / pancake model of Collins, Melosh & Marcus (2005), Earth Impact
+# Effects Program; ablation coefficient of stony bodies from Hills & Goda
+# (1993); pancake spreading rate from Passey & Melosh (1980).
+AIR_DENSITY_SEA_LEVEL_KG_M3 = 1.225
+ATMOSPHERE_SCALE_HEIGHT_M = 8000.0
+DRAG_COEFFICIENT = 2.0
+ABLATION_COEFFICIENT_S2_M2 = 1.4e-8  # 0.014 s^2/km^2
+PANCAKE_SPREAD_COEFFICIENT = 3.5
+# Radius growth (r / r0) at which the flattened body counts as burst
+PANCAKE_FACTOR = 7.0
+
 BLAST_RADIUS_SF: Dict[str, float] = {"sedimentary": 2.5, "crystalline": 3, "water": 2}
 WGS84 = Geod(ellps="WGS84")
@@ -0,0 +1,735 @@
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import rioxarray
+from affine import Affine
+
+from .metrics import DATASET_CACHE_LOOKUPS, RASTER_MAPPED_BYTES
+from .raster import wrap_period_in_columns
+from .timing import count
+
+logger = logging.getLogger(__name__)
+
+GHS_POP_ENV = "DATASET_GHS_POP_URL"
+GHS_POP_DATASET = "ghs_pop"
+GHS_POP_SAT_ENV = "DATASET_GHS_POP_SAT_URL"
+GHS_POP_SAT_DATASET = "ghs_pop_sat"
+GHS_POP_PYRAMID_ENV = "DATASET_GHS_POP_PYRAMID_URL"
+GHS_POP_PYRAMID_DATASET = "ghs_pop_pyramid"
+GHS_POP_TILES_ENV = "DATASET_GHS_POP_TILES_URL"
+GHS_POP_TILES_DATASET = "ghs_pop_tiles"
+# Tiles and index files of write_tiled_raster() stores, current or replaced
+_TILE_STORE_FILE = re.compile(r"tiles(-[0-9a-f]+)?\.bin|tile_index(-[0-9a-f]+)?\.npy")
+
+
+class DatasetError(Exception):
+    """A dataset is not configured or its files do not match their manifest.
+
+    Deliberately not a ValueError: it is a server problem, not bad input.
+    """
+
+
+@dataclass
+class RasterDataset:
+    """An opened single-band raster plus the metadata needed to query it.
+
+    The underlying rioxarray handle is lazy, so only the windows read through
+    `read_window` are ever pulled from disk.
+    """
+
+    path: str
+    mtime: float
+    data: Any  # xarray.DataArray (first band only)
+    transform: Affine
+    resolution: Tuple[float, float]
+    nodata: Optional[float]
+    crs: str
+    width: int
+    height: int
+    wrap_columns: Optional[int]
+
+    @classmethod
+    def open(cls, path: str) -> "RasterDataset":
+        """Open `path` lazily and capture its georeferencing metadata.
+
+        Parameters:
+            path (str): filesystem path to a GeoTIFF.
+
+        Returns:
+            RasterDataset: handle ready for window reads.
+        """
+        mtime = os.path.getmtime(path)
+        # cache=False: this handle lives for the whole process, xarray must
+        # not keep every window we ever read in memory
+        raster = rioxarray.open_rasterio(path, cache=False)
+        if "band" in raster.dims:
+            raster = raster.isel(band=0)
+
+        transform = raster.rio.transform()
+        crs = str(raster.rio.crs)
+        return cls(
+            path=path,
+            mtime=mtime,
+            data=raster,
+            transform=transform,
+            resolution=raster.rio.resolution(),
+            nodata=raster.rio.nodata,
+            crs=crs,
+            width=raster.rio.width,
+            height=raster.rio.height,
+            wrap_columns=wrap_period_in_columns(crs, transform, raster.rio.width),
+        )
+
+    def read_window(
+        self, row_start: int, row_stop: int, col_start: int, col_stop: int
+    ) -> np.ndarray:
+        """Read a [row_start:row_stop, col_start:col_stop] window as float64.
+
+        Nodata pixels are returned as 0 so the window can be summed directly.
+        """
+        subset = self.data.isel(
+            y=slice(row_start, row_stop), x=slice(col_start, col_stop)
+        )
+        values = np.asarray(subset.values, dtype=np.float64)
+        if self.nodata is not None:
+            values[values == self.nodata] = 0.0
+        return values
+
+    @property
+    def mapped_bytes(self) -> int:
+        # Windows are read on demand and dropped, nothing stays resident
+        return 0
+
+    def close(self) -> None:
+        self.data.close()
+
+
+def manifest_path(path: str) -> str:
+    """Path of the JSON manifest stored next to a derived `.npy` dataset."""
+    return os.path.splitext(path)[0] + ".json"
+
+
+@dataclass
+class SummedAreaTable:
+    """Memory-mapped summed-area table (integral image) of a raster.
+
+    `table[r, c]` holds the sum of all source pixels above and left of pixel
+    (r, c), so the table is one row and one column larger than the source and
+    any rectangle sum costs four lookups.
+    """
+
+    path: str
+    mtime: float
+    table: np.ndarray
+    transform: Affine
+    resolution: Tuple[float, float]
+    crs: str
+    width: int
+    height: int
+    wrap_columns: Optional[int]
+
+    @classmethod
+    def open(cls, path: str) -> "SummedAreaTable":
+        """Memory-map the table at `path` and read its manifest.
+
+        Parameters:
+            path (str): `.npy` file written by `manage.py build_population_sat`.
+
+        Returns:
+            SummedAreaTable: table ready for rectangle queries.
+        """
+        mtime = os.path.getmtime(path)
+        with open(manifest_path(path)) as f:
+            manifest = json.load(f)
+
+        table = np.load(path, mmap_mode="r")
+        width, height = manifest["width"], manifest["height"]
+        if table.shape != (height + 1, width + 1):
+            raise DatasetError(
+                f"Summed-area table {path} has shape {table.shape}, "
+                f"manifest expects {(height + 1, width + 1)}."
+            )
+
+        transform = Affine(*manifest["transform"])
+        return cls(
+            path=path,
+            mtime=mtime,
+            table=table,
+            transform=transform,
+            resolution=(transform.a, transform.e),
+            crs=manifest["crs"],
+            width=width,
+            height=height,
+            wrap_columns=wrap_period_in_columns(manifest["crs"], transform, width),
+        )
+
+    def rect_sums(
+        self,
+        row_start: np.ndarray,
+        row_stop: np.ndarray,
+        col_start: np.ndarray,
+        col_stop: np.ndarray,
+    ) -> np.ndarray:
+        """Sums of the half-open rectangles [row_start:row_stop, col_start:col_stop].
+
+        Arguments broadcast against each other and are clipped to the raster;
+        empty rectangles sum to 0.
+        """
+        row_start = np.clip(row_start, 0, self.height)
+        row_stop = np.clip(row_stop, row_start, self.height)
+        col_start = np.clip(col_start, 0, self.width)
+        col_stop = np.clip(col_stop, col_start, self.width)
+
+        table = self.table
+        return (
+            table[row_stop, col_stop]
+            - table[row_start, col_stop]
+            - table[row_stop, col_start]
+            + table[row_start, col_start]
+        )
+
+    @property
+    def mapped_bytes(self) -> int:
+        return self.table.nbytes
+
+    def close(self) -> None:
+        pass
+
+
+def write_summed_area_table(
+    source: RasterDataset, path: str, block_rows: int = 256
+) -> None:
+    """Build the summed-area table of `source` into a `.npy` file plus manifest.
+
+    The source is streamed in blocks of `block_rows` rows, so memory stays at
+    one block regardless of raster size. The output needs
+    8 * (height + 1) * (width + 1) bytes of disk.
+    """
+    table = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float64, shape=(source.height + 1, source.width + 1)
+    )
+    table[0, :] = 0.0
+    table[:, 0] = 0.0
+
+    previous_row = np.zeros(source.width, dtype=np.float64)
+    for row_start in range(0, source.height, block_rows):
+        row_stop = min(row_start + block_rows, source.height)
+        block = source.read_window(row_start, row_stop, 0, source.width)
+        block_table = np.cumsum(np.cumsum(block, axis=1), axis=0)
+        block_table += previous_row
+        table[row_start + 1 : row_stop + 1, 1:] = block_table
+        previous_row = block_table[-1]
+
+    table.flush()
+    del table
+
+    manifest = {
+        "source": source.path,
+        "source_mtime": source.mtime,
+        "transform": list(source.transform)[:6],
+        "crs": source.crs,
+        "width": source.width,
+        "height": source.height,
+    }
+    with open(manifest_path(path), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+@dataclass
+class PyramidLevel:
+    """One memory-mapped level of a population pyramid.
+
+    Exposes the same window-reading interface as RasterDataset so population
+    queries can run on any level.
+    """
+
+    path: str
+    factor: int
+    values: np.ndarray
+    transform: Affine
+    resolution: Tuple[float, float]
+    crs: str
+    width: int
+    height: int
+    wrap_columns: Optional[int]
+
+    def read_window(
+        self, row_start: int, row_stop: int, col_start: int, col_stop: int
+    ) -> np.ndarray:
+        return np.asarray(
+            self.values[row_start:row_stop, col_start:col_stop], dtype=np.float64
+        )
+
+
+@dataclass
+class PopulationPyramid:
+    """Coarser copies of the population raster, each level summing
+    `factor` x `factor` pixels of the one below so population is conserved.
+
+    `levels` are ordered from finest to coarsest and exclude the source
+    raster itself.
+    """
+
+    path: str
+    mtime: float
+    levels: List[PyramidLevel]
+
+    @classmethod
+    def open(cls, path: str) -> "PopulationPyramid":
+        """Memory-map every level listed in the manifest at `path`.
+
+        Parameters:
+            path (str): manifest.json written by `manage.py build_population_pyramid`.
+
+        Returns:
+            PopulationPyramid: opened pyramid.
+        """
+        mtime = os.path.getmtime(path)
+        with open(path) as f:
+            manifest = json.load(f)
+
+        directory = os.path.dirname(path)
+        levels = []
+        for level in manifest["levels"]:
+            level_path = os.path.join(directory, level["file"])
+            transform = Affine(*level["transform"])
+            levels.append(
+                PyramidLevel(
+                    path=level_path,
+                    factor=level["factor"],
+                    values=np.load(level_path, mmap_mode="r"),
+                    transform=transform,
+                    resolution=(transform.a, transform.e),
+                    crs=manifest["crs"],
+                    width=level["width"],
+                    height=level["height"],
+                    wrap_columns=wrap_period_in_columns(
+                        manifest["crs"], transform, level["width"]
+                    ),
+                )
+            )
+
+        return cls(path=path, mtime=mtime, levels=levels)
+
+    @property
+    def mapped_bytes(self) -> int:
+        return sum(level.values.nbytes for level in self.levels)
+
+    def close(self) -> None:
+        pass
+
+
+def _sum_blocks(values: np.ndarray, factor: int) -> np.ndarray:
+    """Sum non-overlapping factor x factor blocks, zero-padding ragged edges."""
+    rows = -(-values.shape[0] // factor) * factor
+    cols = -(-values.shape[1] // factor) * factor
+    padded = np.zeros((rows, cols), dtype=np.float64)
+    padded[: values.shape[0], : values.shape[1]] = values
+    return padded.reshape(rows // factor, factor, cols // factor, factor).sum(
+        axis=(1, 3)
+    )
+
+
+def write_population_pyramid(
+    source: RasterDataset,
+    directory: str,
+    factor: int = 4,
+    levels: int = 4,
+    block_rows: int = 256,
+) -> str:
+    """Build `levels` block-summed levels of `source` into `directory`.
+
+    Level i has a resolution `factor ** i` times coarser than the source, e.g.
+    250 m -> 1 km -> 4 km -> 16 km -> 64 km for the defaults. Each level is
+    built by streaming the level below in blocks of about `block_rows` rows.
+
+    Returns:
+        str: path of the written manifest.json.
+    """
+    os.makedirs(directory, exist_ok=True)
+    block_rows = max(factor, block_rows - block_rows % factor)
+
+    manifest_levels = []
+    below = source
+    for level in range(1, levels + 1):
+        height = -(-below.height // factor)
+        width = -(-below.width // factor)
+        file_name = f"level_{level}.npy"
+        values = np.lib.format.open_memmap(
+            os.path.join(directory, file_name),
+            mode="w+",
+            dtype=np.float64,
+            shape=(height, width),
+        )
+        for row_start in range(0, below.height, block_rows):
+            row_stop = min(row_start + block_rows, below.height)
+            block = below.read_window(row_start, row_stop, 0, below.width)
+            out_start = row_start // factor
+            values[out_start : out_start + -(-block.shape[0] // factor)] = _sum_blocks(
+                block, factor
+            )
+        values.flush()
+
+        transform = below.transform * Affine.scale(factor)
+        level_factor = factor**level
+        manifest_levels.append(
+            {
+                "file": file_name,
+                "factor": level_factor,
+                "transform": list(transform)[:6],
+                "width": width,
+                "height": height,
+            }
+        )
+        below = PyramidLevel(
+            path=file_name,
+            factor=level_factor,
+            values=values,
+            transform=transform,
+            resolution=(transform.a, transform.e),
+            crs=source.crs,
+            width=width,
+            height=height,
+            wrap_columns=None,
+        )
+
+    path = os.path.join(directory, "manifest.json")
+    manifest = {
+        "source": source.path,
+        "source_mtime": source.mtime,
+        "crs": source.crs,
+        "levels": manifest_levels,
+    }
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return path
+
+
+@dataclass
+class TiledRaster:
+    """Population raster preprocessed into square tiles for window reads.
+
+    Tiles holding any people are stored back to back in one flat
+    memory-mapped file, `index[tile_row, tile_col]` is a tile's slot in it or
+    -1 for an all-empty tile (ocean, nodata), so empty areas take no disk.
+    Nodata was stored as 0 and reads need no masking. Exposes the same
+    window-reading interface as RasterDataset.
+    """
+
+    path: str
+    mtime: float
+    tiles: np.ndarray  # (stored tiles, tile_size, tile_size)
+    index: np.ndarray  # (tile rows, tile columns)
+    tile_size: int
+    transform: Affine
+    resolution: Tuple[float, float]
+    crs: str
+    width: int
+    height: int
+    wrap_columns: Optional[int]
+
+    @classmethod
+    def open(cls, path: str) -> "TiledRaster":
+        """Memory-map the tiles and load the tile index listed in the manifest.
+
+        Parameters:
+            path (str): manifest.json written by `manage.py prepare_population`.
+
+        Returns:
+            TiledRaster: tiles ready for window reads.
+        """
+        mtime = os.path.getmtime(path)
+        with open(path) as f:
+            manifest = json.load(f)
+
+        directory = os.path.dirname(path)
+        tile_size = manifest["tile_size"]
+        shape = (manifest["stored_tiles"], tile_size, tile_size)
+        if shape[0]:
+            tiles = np.memmap(
+                os.path.join(directory, manifest["tiles_file"]),
+                dtype=manifest["dtype"],
+                mode="r",
+                shape=shape,
+            )
+        else:
+            # An empty file cannot be mapped
+            tiles = np.zeros(shape, dtype=manifest["dtype"])
+        index = np.load(os.path.join(directory, manifest["index_file"]))
+
+        width, height = manifest["width"], manifest["height"]
+        if index.shape != (-(-height // tile_size), -(-width // tile_size)):
+            raise DatasetError(
+                f"Tile index of {path} has shape {index.shape}, which does not "
+                f"cover {height}x{width} pixels in {tile_size} pixel tiles."
+            )
+
+        transform = Affine(*manifest["transform"])
+        return cls(
+            path=path,
+            mtime=mtime,
+            tiles=tiles,
+            index=index,
+            tile_size=tile_size,
+            transform=transform,
+            resolution=(transform.a, transform.e),
+            crs=manifest["crs"],
+            width=width,
+            height=height,
+            wrap_columns=wrap_period_in_columns(manifest["crs"], transform, width),
+        )
+
+    def read_window(
+        self, row_start: int, row_stop: int, col_start: int, col_stop: int
+    ) -> np.ndarray:
+        """Read a [row_start:row_stop, col_start:col_stop] window of the raster.
+
+        A window inside one stored tile is a read-only view of the mapped
+        file, no pixel is copied; other windows are assembled from their
+        tiles. Values keep the stored dtype (float32 for GHSL).
+        """
+        size = self.tile_size
+        row_stop = min(row_stop, self.height)
+        col_stop = min(col_stop, self.width)
+        shape = (max(row_stop - row_start, 0), max(col_stop - col_start, 0))
+        if not shape[0] or not shape[1]:
+            return np.zeros(shape, dtype=self.tiles.dtype)
+
+        tile_rows = range(row_start // size, (row_stop - 1) // size + 1)
+        tile_cols = range(col_start // size, (col_stop - 1) // size + 1)
+        if len(tile_rows) == 1 and len(tile_cols) == 1:
+            slot = self.index[tile_rows[0], tile_cols[0]]
+            if slot >= 0:
+                top, left = tile_rows[0] * size, tile_cols[0] * size
+                return self.tiles[
+                    slot,
+                    row_start - top : row_stop - top,
+                    col_start - left : col_stop - left,
+                ]
+
+        values = np.zeros(shape, dtype=self.tiles.dtype)
+        for tile_row in tile_rows:
+            top = tile_row * size
+            row_lo, row_hi = max(row_start, top), min(row_stop, top + size)
+            for tile_col in tile_cols:
+                slot = self.index[tile_row, tile_col]
+                if slot < 0:
+                    continue
+                left = tile_col * size
+                col_lo, col_hi = max(col_start, left), min(col_stop, left + size)
+                values[
+                    row_lo - row_start : row_hi - row_start,
+                    col_lo - col_start : col_hi - col_start,
+                ] = self.tiles[
+                    slot, row_lo - top : row_hi - top, col_lo - left : col_hi - left
+                ]
+        return values
+
+    @property
+    def mapped_bytes(self) -> int:
+        return self.tiles.nbytes + self.index.nbytes
+
+    def close(self) -> None:
+        pass
+
+
+def write_tiled_raster(
+    source: RasterDataset, directory: str, tile_size: int = 256
+) -> str:
+    """Split `source` into tile_size x tile_size tiles stored in `directory`.
+
+    The source is streamed one row of tiles at a time, all-empty tiles are
+    left out of the flat tiles file. Every store gets tiles and index files
+    of its own, named in the manifest, so replacing the manifest is the one
+    step that switches readers over: processes still mapping a previous
+    store keep reading it until they reopen. Files of the store replaced are
+    kept for readers that just read its manifest, older ones are removed.
+
+    Returns:
+        str: path of the written manifest.json.
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Keep the source precision, nodata becomes 0 on the way
+    dtype = np.result_type(source.data.dtype, np.float32)
+    tile_rows = -(-source.height // tile_size)
+    tile_cols = -(-source.width // tile_size)
+    index = np.full((tile_rows, tile_cols), -1, dtype=np.int64)
+
+    version = uuid.uuid4().hex[:16]
+    tiles_file, index_file = f"tiles-{version}.bin", f"tile_index-{version}.npy"
+    stored = 0
+    with open(os.path.join(directory, tiles_file), "wb") as f:
+        for tile_row in range(tile_rows):
+            row_start = tile_row * tile_size
+            row_stop = min(row_start + tile_size, source.height)
+            band = np.zeros((tile_size, tile_cols * tile_size), dtype=dtype)
+            band[: row_stop - row_start, : source.width] = source.read_window(
+                row_start, row_stop, 0, source.width
+            )
+            tiles = band.reshape(tile_size, tile_cols, tile_size).swapaxes(0, 1)
+            occupied = np.flatnonzero(tiles.any(axis=(1, 2)))
+            index[tile_row, occupied] = stored + np.arange(occupied.size)
+            stored += occupied.size
+            np.ascontiguousarray(tiles[occupied]).tofile(f)
+    with open(os.path.join(directory, index_file), "wb") as f:
+        np.save(f, index)
+
+    path = os.path.join(directory, "manifest.json")
+    keep = {tiles_file, index_file}
+    try:
+        with open(path) as f:
+            previous = json.load(f)
+        keep.update((previous["tiles_file"], previous["index_file"]))
+    except (OSError, ValueError, KeyError):
+        pass
+    manifest = {
+        "source": source.path,
+        "source_mtime": source.mtime,
+        "source_nodata": None if source.nodata is None else float(source.nodata),
+        "crs": source.crs,
+        "transform": list(source.transform)[:6],
+        "width": source.width,
+        "height": source.height,
+        "tile_size": tile_size,
+        "dtype": dtype.name,
+        "stored_tiles": stored,
+        "tiles_file": tiles_file,
+        "index_file": index_file,
+    }
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+    for name in os.listdir(directory):
+        if name not in keep and _TILE_STORE_FILE.fullmatch(name):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return path
+
+
+class DatasetManager:
+    """Process-wide registry of opened raster datasets.
+
+    Each dataset is opened once and reused by every request. A dataset is
+    reopened transparently if its configured path or the file's mtime changes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._datasets: Dict[str, RasterDataset] = {}
+
+    def get(
+        self,
+        name: str,
+        path: Optional[str],
+        opener: Callable[[str], Any] = RasterDataset.open,
+    ) -> Any:
+        """Return the cached dataset `name`, (re)opening it from `path` if stale.
+
+        Parameters:
+            name (str): logical dataset name, e.g. "ghs_pop".
+            path (str): current configured path of the dataset.
+            opener (Callable): builds the dataset from a path, must return an
+                object with `path`, `mtime` and `close()`; its `mapped_bytes`,
+                if any, is reported on the metrics endpoint.
+
+        Returns:
+            Any: opened dataset.
+        """
+        if not path:
+            raise DatasetError(f"No path configured for dataset '{name}'.")
+
+        mtime = os.path.getmtime(path)
+        dataset = self._datasets.get(name)
+        if dataset is not None and dataset.path == path and dataset.mtime == mtime:
+            count("cache_hits")
+            DATASET_CACHE_LOOKUPS.labels(name, "hit").inc()
+            return dataset
+        count("cache_misses")
+        DATASET_CACHE_LOOKUPS.labels(name, "miss").inc()
+
+        with self._lock:
+            # Another thread may have reopened it while we waited
+            dataset = self._datasets.get(name)
+            if dataset is not None and dataset.path == path and dataset.mtime == mtime:
+                return dataset
+
+            # The stale handle is not closed here: requests already holding it
+            # may still be reading, it is released once they drop it
+            logger.info("Opening raster dataset %s from %s", name, path)
+            dataset = opener(path)
+            self._datasets[name] = dataset
+            RASTER_MAPPED_BYTES.labels(name).set(getattr(dataset, "mapped_bytes", 0))
+
+        return dataset
+
+    def clear(self) -> None:
+        """Close and forget every cached dataset."""
+        with self._lock:
+            datasets = list(self._datasets.items())
+            self._datasets.clear()
+
+        for name, dataset in datasets:
+            RASTER_MAPPED_BYTES.labels(name).set(0)
+            dataset.close()
+
+
+dataset_manager = DatasetManager()
+
+
+def get_population_dataset() -> Union[RasterDataset, TiledRaster]:
+    """Return the cached GHSL population raster: the tiled store configured by
+    DATASET_GHS_POP_TILES_URL if it exists, else the GeoTIFF configured by
+    DATASET_GHS_POP_URL."""
+    path = os.getenv(GHS_POP_TILES_ENV)
+    if path and os.path.exists(path):
+        return dataset_manager.get(GHS_POP_TILES_DATASET, path, TiledRaster.open)
+    return dataset_manager.get(GHS_POP_DATASET, os.getenv(GHS_POP_ENV))
+
+
+def get_population_sat() -> Optional[SummedAreaTable]:
+    """Return the cached population summed-area table, None if not configured."""
+    path = os.getenv(GHS_POP_SAT_ENV)
+    if not path or not os.path.exists(path):
+        return None
+    return dataset_manager.get(GHS_POP_SAT_DATASET, path, SummedAreaTable.open)
+
+
+def get_population_pyramid() -> Optional[PopulationPyramid]:
+    """Return the cached population pyramid, None if not configured."""
+    path = os.getenv(GHS_POP_PYRAMID_ENV)
+    if not path or not os.path.exists(path):
+        return None
+    return dataset_manager.get(GHS_POP_PYRAMID_DATASET, path, PopulationPyramid.open)
+
+
+def warm_up() -> None:
+    """Open every configured dataset ahead of the first request.
+
+    Missing or unreadable datasets are logged and skipped so that management
+    commands (migrate, makemigrations, ...) still work without the data.
+    """
+    try:
+        get_population_dataset()
+    except Exception as e:
+        logger.warning("Population dataset not loaded: %s", e)
+
+    try:
+        get_population_sat()
+    except Exception as e:
+        logger.warning("Population summed-area table not loaded: %s", e)
+
+    try:
+        get_population_pyramid()
+    except Exception as e:
+        logger.warning("Population pyramid not loaded: %s", e)
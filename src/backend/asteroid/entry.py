@@ -0,0 +1,547 @@
+import math
+import operator
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .constants import (ABLATION_COEFFICIENT_S2_M2,
+                        AIR_DENSITY_SEA_LEVEL_KG_M3, ATMOSPHERE_SCALE_HEIGHT_M,
+                        DRAG_COEFFICIENT, EARTH_GRAVITATIONAL_CONSTANT,
+                        EARTH_RADIUS_M, ENTRY_HEIGHT_M, J_PER_MT,
+                        PANCAKE_FACTOR, PANCAKE_SPREAD_COEFFICIENT)
+from .utils import as_float_columns, is_finite_positive, raise_for_invalid_rows
+
+# Integrator tolerances: relative, and absolute per state column
+ENTRY_RTOL = float(os.getenv("ENTRY_RTOL", 1e-6))
+# Longest altitude drop per step, resolves breakup and peak-energy altitudes
+ENTRY_MAX_STEP_DZ_M = float(os.getenv("ENTRY_MAX_STEP_DZ_M", 1000.0))
+ENTRY_MAX_STEPS = 100_000
+
+TERMINAL_TYPES = ("impact", "airburst", "skip_out", "unresolved")
+_IMPACT, _AIRBURST, _SKIP_OUT, _UNRESOLVED = range(len(TERMINAL_TYPES))
+# Left when less than this fraction of the entry mass remains
+_ABLATED_FRACTION = 1e-6
+# Kinetic energy fraction below which a body has spent its entry energy; the
+# rest of its descent at near terminal speed is stiff and changes no output
+_SPENT_FRACTION = 1e-4
+
+# State columns
+_Z, _V, _THETA, _M, _R = range(5)
+
+# Dormand-Prince 5(4) tableau; the equations do not depend on t, so the
+# nodes c_i are not needed
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# 5th minus 4th order weights, the local error estimate
+_E = (
+    35 / 384 - 5179 / 57600,
+    0.0,
+    500 / 1113 - 7571 / 16695,
+    125 / 192 - 393 / 640,
+    -2187 / 6784 + 92097 / 339200,
+    11 / 84 - 187 / 2100,
+    -1 / 40,
+)
+
+
+def yield_strength_pa(density_kg_m3: np.ndarray) -> np.ndarray:
+    """Strength at which the ram pressure breaks a body up (Collins et al.
+    2005, eq. 10): log10 Y = 2.107 + 0.0624 sqrt(density)."""
+    return 10 ** (2.107 + 0.0624 * np.sqrt(density_kg_m3))
+
+
+def air_density_kg_m3(altitude_m: np.ndarray) -> np.ndarray:
+    # Trial stages of a step can dip below ground, keep them finite
+    altitude_m = np.maximum(altitude_m, -ATMOSPHERE_SCALE_HEIGHT_M)
+    return AIR_DENSITY_SEA_LEVEL_KG_M3 * np.exp(-altitude_m / ATMOSPHERE_SCALE_HEIGHT_M)
+
+
+def _derivatives(
+    y: np.ndarray, broken: np.ndarray, density_kg_m3: np.ndarray
+) -> np.ndarray:
+    """d/dt of [altitude, speed, path angle below horizontal, mass, radius]
+    under drag, gravity, Earth curvature, ablation and, once broken up,
+    pancake spreading."""
+    z, v, theta, m, r = y.T
+    rho_air = air_density_kg_m3(z)
+    drag_n = 0.5 * DRAG_COEFFICIENT * rho_air * math.pi * r**2 * v**2
+    sin_theta, cos_theta = np.sin(theta), np.cos(theta)
+    v_safe = np.maximum(v, 1e-3)
+
+    dydt = np.empty_like(y)
+    dydt[:, _Z] = -v * sin_theta
+    dydt[:, _V] = (
+        -drag_n / np.maximum(m, 1e-12) + EARTH_GRAVITATIONAL_CONSTANT * sin_theta
+    )
+    dydt[:, _THETA] = (
+        EARTH_GRAVITATIONAL_CONSTANT / v_safe - v / (EARTH_RADIUS_M + z)
+    ) * cos_theta
+    dydt[:, _M] = -ABLATION_COEFFICIENT_S2_M2 * drag_n * v
+    dydt[:, _R] = np.where(
+        broken, v * np.sqrt(PANCAKE_SPREAD_COEFFICIENT * rho_air / density_kg_m3), 0.0
+    )
+    return dydt
+
+
+def _dormand_prince_step(
+    y: np.ndarray, h: np.ndarray, broken: np.ndarray, density_kg_m3: np.ndarray
+):
+    """One 5th-order step of size h per body, and its error estimate."""
+    k = [_derivatives(y, broken, density_kg_m3)]
+    for row in _A[1:]:
+        increment = sum(a * k_i for a, k_i in zip(row, k) if a)
+        k.append(_derivatives(y + h[:, None] * increment, broken, density_kg_m3))
+    y_new = y + h[:, None] * sum(a * k_i for a, k_i in zip(_A[-1], k) if a)
+    error = h[:, None] * np.tensordot(_E, np.stack(k), axes=1)
+    return y_new, error
+
+
+def _lerp(a: np.ndarray, b: np.ndarray, fraction: np.ndarray) -> np.ndarray:
+    return a + fraction * (b - a)
+
+
+def _valid_columns(
+    diameter_m: Any, density_kg_m3: Any, entry_velocity_m_s: Any, entry_angle_deg: Any
+) -> Tuple[np.ndarray, ...]:
+    diameter_m, density_kg_m3, entry_velocity_m_s, entry_angle_deg = as_float_columns(
+        diameter_m=diameter_m,
+        density_kg_m3=density_kg_m3,
+        entry_velocity_m_s=entry_velocity_m_s,
+        entry_angle_deg=entry_angle_deg,
+    )
+    raise_for_invalid_rows(
+        {
+            "diameter_m": ~is_finite_positive(diameter_m),
+            "density_kg_m3": ~is_finite_positive(density_kg_m3),
+            "entry_velocity_m_s": ~is_finite_positive(entry_velocity_m_s),
+            "entry_angle_deg": ~(is_finite_positive(entry_angle_deg))
+            | (entry_angle_deg > 90),
+        }
+    )
+    return diameter_m, density_kg_m3, entry_velocity_m_s, entry_angle_deg
+
+
+def simulate_entry_batch(
+    diameter_m: Any,
+    density_kg_m3: Any,
+    entry_velocity_m_s: Any,
+    entry_angle_deg: Any,
+    entry_height_m: float = ENTRY_HEIGHT_M,
+) -> Dict[str, np.ndarray]:
+    """
+    Fly many bodies through the atmosphere at once.
+
+    Integrates drag, gravity, ablation and pancake breakup over an
+    exponential atmosphere with an adaptive Dormand-Prince 5(4) scheme.
+    Every body keeps its own step size, but all steps of a round are taken
+    together on arrays; finished bodies drop out of the working set. A body
+    breaks up once the ram pressure exceeds its strength, then flattens;
+    it bursts when its radius reaches PANCAKE_FACTOR times the original
+    (or when ablation or drag have consumed its kinetic energy) and impacts
+    if it reaches the ground first.
+
+    Params:
+        diameter_m (array): diameters in meters (m)
+        density_kg_m3 (array): densities in kilograms per cubic meter (kg/m^3)
+        entry_velocity_m_s (array): speeds at entry_height_m in meters per second (m/s)
+        entry_angle_deg (array): entry angles from horizontal in (0, 90] degrees
+        entry_height_m (float): altitude the integration starts at in meters (m)
+
+    Returns:
+        dict[str, np.ndarray]: per body
+            "breakup_altitude_m" (NaN when intact),
+            "peak_energy_altitude_m" (largest energy deposition per meter of descent),
+            "terminal_altitude_m" (0 on impact, burst altitude, NaN when skipping out),
+            "terminal_type" (one of TERMINAL_TYPES),
+            "impact_velocity_m_s" / "impact_mass_kg" (NaN unless "impact"),
+            "deposited_energy_mt" (kinetic energy left in the atmosphere)
+
+    Raises:
+        RowValidationError: listing every invalid input row at once
+    """
+    diameter_m, density_kg_m3, entry_velocity_m_s, entry_angle_deg = _valid_columns(
+        diameter_m, density_kg_m3, entry_velocity_m_s, entry_angle_deg
+    )
+
+    n = len(diameter_m)
+    radius_m = diameter_m / 2
+    mass_kg = density_kg_m3 * (4 / 3) * math.pi * radius_m**3
+    entry_energy_j = 0.5 * mass_kg * entry_velocity_m_s**2
+    strength_pa = yield_strength_pa(density_kg_m3)
+    y = np.column_stack(
+        [
+            np.full(n, float(entry_height_m)),
+            entry_velocity_m_s,
+            np.radians(entry_angle_deg),
+            mass_kg,
+            radius_m,
+        ]
+    )
+    atol = np.column_stack(
+        [
+            np.full(n, 1e-2),
+            np.full(n, 1e-3),
+            np.full(n, 1e-9),
+            mass_kg * 1e-9,
+            radius_m * 1e-9,
+        ]
+    )
+
+    breakup_altitude_m = np.full(n, np.nan)
+    peak_energy_altitude_m = np.full(n, np.nan)
+    peak_energy_per_m = np.zeros(n)
+    terminal_altitude_m = np.full(n, np.nan)
+    terminal_type = np.full(n, _UNRESOLVED)
+    impact_velocity_m_s = np.full(n, np.nan)
+    impact_mass_kg = np.full(n, np.nan)
+    final_energy_j = np.zeros(n)
+
+    broken = np.zeros(n, dtype=bool)
+    h = np.minimum(0.1, ENTRY_MAX_STEP_DZ_M / entry_velocity_m_s)
+    active = np.arange(n)
+
+    for _ in range(ENTRY_MAX_STEPS):
+        if not len(active):
+            break
+        y_a, h_a, broken_a = y[active], h[active], broken[active]
+        # Oversized trial steps can overflow; their error is then not finite
+        # and they are retried smaller
+        with np.errstate(over="ignore", invalid="ignore"):
+            y_new, error = _dormand_prince_step(
+                y_a, h_a, broken_a, density_kg_m3[active]
+            )
+
+        scale = atol[active] + ENTRY_RTOL * np.maximum(np.abs(y_a), np.abs(y_new))
+        with np.errstate(invalid="ignore"):
+            error_norm = np.max(np.abs(error) / scale, axis=1)
+        accepted = error_norm <= 1.0
+
+        # Next step: grow or shrink towards the tolerance, never dropping
+        # more than ENTRY_MAX_STEP_DZ_M of altitude at the current descent rate
+        with np.errstate(divide="ignore"):
+            factor = np.clip(0.9 * error_norm**-0.2, 0.2, 5.0)
+        factor[~np.isfinite(factor)] = 0.2
+        y_next = np.where(accepted[:, None], y_new, y_a)
+        descent_m_s = np.maximum(y_next[:, _V] * np.sin(y_next[:, _THETA]), 1e-3)
+        h[active] = np.minimum(h_a * factor, ENTRY_MAX_STEP_DZ_M / descent_m_s)
+
+        rows, old, new = active[accepted], y_a[accepted], y_new[accepted]
+        y[rows] = new
+
+        # Breakup: ram pressure crosses the strength within this step
+        pressure_old = air_density_kg_m3(old[:, _Z]) * old[:, _V] ** 2
+        pressure_new = air_density_kg_m3(new[:, _Z]) * new[:, _V] ** 2
+        breaks = ~broken[rows] & (pressure_new >= strength_pa[rows])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.clip(
+                np.log(strength_pa[rows] / pressure_old)
+                / np.log(pressure_new / pressure_old),
+                0.0,
+                1.0,
+            )
+        breakup_altitude_m[rows[breaks]] = _lerp(old[:, _Z], new[:, _Z], fraction)[
+            breaks
+        ]
+        broken[rows[breaks]] = True
+
+        # Energy deposited per meter of descent, its peak locates h2
+        energy_old = 0.5 * old[:, _M] * old[:, _V] ** 2
+        energy_new = 0.5 * new[:, _M] * new[:, _V] ** 2
+        drop_m = old[:, _Z] - new[:, _Z]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_m = np.where(drop_m > 0, (energy_old - energy_new) / drop_m, 0.0)
+        peaks = per_m > peak_energy_per_m[rows]
+        peak_energy_per_m[rows[peaks]] = per_m[peaks]
+        mid_altitude_m = 0.5 * (old[:, _Z] + np.maximum(new[:, _Z], 0.0))
+        peak_energy_altitude_m[rows[peaks]] = mid_altitude_m[peaks]
+        final_energy_j[rows] = energy_new
+
+        # Terminal events, checked in order of precedence
+        done = np.zeros(len(rows), dtype=bool)
+
+        impact = new[:, _Z] <= 0
+        fraction = np.where(impact, old[:, _Z] / np.where(drop_m > 0, drop_m, 1.0), 0)
+        impact_velocity_m_s[rows[impact]] = _lerp(old[:, _V], new[:, _V], fraction)[
+            impact
+        ]
+        impact_mass_kg[rows[impact]] = _lerp(old[:, _M], new[:, _M], fraction)[impact]
+        terminal_altitude_m[rows[impact]] = 0.0
+        terminal_type[rows[impact]] = _IMPACT
+        final_energy_j[rows[impact]] = (
+            0.5 * impact_mass_kg[rows[impact]] * impact_velocity_m_s[rows[impact]] ** 2
+        )
+        done |= impact
+
+        burst_radius_m = PANCAKE_FACTOR * radius_m[rows]
+        burst = ~done & (
+            (new[:, _R] >= burst_radius_m)
+            | (new[:, _M] <= _ABLATED_FRACTION * mass_kg[rows])
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.clip(
+                (burst_radius_m - old[:, _R]) / (new[:, _R] - old[:, _R]), 0.0, 1.0
+            )
+        fraction = np.where(new[:, _R] >= burst_radius_m, fraction, 1.0)
+        terminal_altitude_m[rows[burst]] = _lerp(old[:, _Z], new[:, _Z], fraction)[
+            burst
+        ]
+        terminal_type[rows[burst]] = _AIRBURST
+        final_energy_j[rows[burst]] = 0.0
+        done |= burst
+
+        # A spent fragment cloud has deposited its energy in the air; a spent
+        # intact body falls the rest of the way at about its current speed
+        spent = ~done & (energy_new <= _SPENT_FRACTION * entry_energy_j[rows])
+        spent_burst = spent & broken[rows]
+        terminal_altitude_m[rows[spent_burst]] = new[spent_burst, _Z]
+        terminal_type[rows[spent_burst]] = _AIRBURST
+        final_energy_j[rows[spent_burst]] = 0.0
+        spent_fall = spent & ~broken[rows]
+        impact_velocity_m_s[rows[spent_fall]] = new[spent_fall, _V]
+        impact_mass_kg[rows[spent_fall]] = new[spent_fall, _M]
+        terminal_altitude_m[rows[spent_fall]] = 0.0
+        terminal_type[rows[spent_fall]] = _IMPACT
+        done |= spent
+
+        skip_out = ~done & (new[:, _Z] > entry_height_m)
+        terminal_type[rows[skip_out]] = _SKIP_OUT
+        done |= skip_out
+
+        active = np.setdiff1d(active, rows[done], assume_unique=True)
+
+    return {
+        "breakup_altitude_m": breakup_altitude_m,
+        "peak_energy_altitude_m": peak_energy_altitude_m,
+        "terminal_altitude_m": terminal_altitude_m,
+        "terminal_type": np.array(TERMINAL_TYPES, dtype=object)[terminal_type],
+        "impact_velocity_m_s": impact_velocity_m_s,
+        "impact_mass_kg": impact_mass_kg,
+        "deposited_energy_mt": (entry_energy_j - final_energy_j) / J_PER_MT,
+    }
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+# A single body runs the same scheme on Python floats: for one row the NumPy
+# overhead of every stage costs far more than the arithmetic
+
+
+def _scalar_air_density_kg_m3(altitude_m: float) -> float:
+    altitude_m = max(altitude_m, -ATMOSPHERE_SCALE_HEIGHT_M)
+    return AIR_DENSITY_SEA_LEVEL_KG_M3 * math.exp(
+        -altitude_m / ATMOSPHERE_SCALE_HEIGHT_M
+    )
+
+
+def _scalar_derivatives(
+    y: Sequence[float], broken: bool, density_kg_m3: float
+) -> Tuple[float, ...]:
+    """_derivatives for one body."""
+    z, v, theta, m, r = y
+    rho_air = _scalar_air_density_kg_m3(z)
+    drag_n = 0.5 * DRAG_COEFFICIENT * rho_air * math.pi * (r * r) * (v * v)
+    sin_theta, cos_theta = math.sin(theta), math.cos(theta)
+    return (
+        -v * sin_theta,
+        -drag_n / max(m, 1e-12) + EARTH_GRAVITATIONAL_CONSTANT * sin_theta,
+        (EARTH_GRAVITATIONAL_CONSTANT / max(v, 1e-3) - v / (EARTH_RADIUS_M + z))
+        * cos_theta,
+        -ABLATION_COEFFICIENT_S2_M2 * drag_n * v,
+        (
+            v * math.sqrt(PANCAKE_SPREAD_COEFFICIENT * rho_air / density_kg_m3)
+            if broken
+            else 0.0
+        ),
+    )
+
+
+def _combine(
+    y: Sequence[float],
+    h: float,
+    weights: Sequence[float],
+    k: List[Tuple[float, ...]],
+) -> List[float]:
+    """y + h * sum(weights * k), column by column, skipping zero weights
+    like _dormand_prince_step."""
+    weights, k = zip(*((w, k_j) for w, k_j in zip(weights, k) if w))
+    return [
+        y_i + h * sum(map(operator.mul, weights, column))
+        for y_i, column in zip(y, zip(*k))
+    ]
+
+
+def _scalar_dormand_prince_step(
+    y: Sequence[float], h: float, broken: bool, density_kg_m3: float
+) -> Tuple[List[float], List[float]]:
+    """_dormand_prince_step for one body."""
+    k = [_scalar_derivatives(y, broken, density_kg_m3)]
+    for row in _A[1:]:
+        k.append(_scalar_derivatives(_combine(y, h, row, k), broken, density_kg_m3))
+    y_new = _combine(y, h, _A[-1], k)
+    error = _combine([0.0] * len(y), h, _E, k)
+    return y_new, error
+
+
+def _clipped_fraction(numerator: float, denominator: float) -> float:
+    if not denominator:
+        return 1.0
+    return min(max(numerator / denominator, 0.0), 1.0)
+
+
+def simulate_entry(
+    diameter_m: float,
+    density_kg_m3: float,
+    entry_velocity_m_s: float,
+    entry_angle_deg: float,
+    entry_height_m: float = ENTRY_HEIGHT_M,
+) -> Dict[str, Any]:
+    """
+    Atmospheric entry of one body, see simulate_entry_batch.
+
+    Takes the same steps and events as simulate_entry_batch on Python floats,
+    so results agree with a batch of one to within rounding.
+
+    Returns:
+        dict[str, Any]: the simulate_entry_batch outputs as Python scalars,
+        None where they are NaN
+
+    Raises:
+        RowValidationError: when an input is invalid
+    """
+    columns = _valid_columns(
+        [diameter_m], [density_kg_m3], [entry_velocity_m_s], [entry_angle_deg]
+    )
+    diameter_m, density_kg_m3, entry_velocity_m_s, entry_angle_deg = (
+        float(column[0]) for column in columns
+    )
+
+    radius_m = diameter_m / 2
+    mass_kg = density_kg_m3 * (4 / 3) * math.pi * radius_m**3
+    entry_energy_j = 0.5 * mass_kg * entry_velocity_m_s**2
+    strength_pa = float(yield_strength_pa(density_kg_m3))
+    y = [
+        float(entry_height_m),
+        entry_velocity_m_s,
+        math.radians(entry_angle_deg),
+        mass_kg,
+        radius_m,
+    ]
+    atol = (1e-2, 1e-3, 1e-9, mass_kg * 1e-9, radius_m * 1e-9)
+    burst_radius_m = PANCAKE_FACTOR * radius_m
+
+    breakup_altitude_m = math.nan
+    peak_energy_altitude_m = math.nan
+    peak_energy_per_m = 0.0
+    terminal_altitude_m = math.nan
+    terminal_type = _UNRESOLVED
+    impact_velocity_m_s = math.nan
+    impact_mass_kg = math.nan
+    final_energy_j = 0.0
+
+    broken = False
+    h = min(0.1, ENTRY_MAX_STEP_DZ_M / entry_velocity_m_s)
+
+    for _ in range(ENTRY_MAX_STEPS):
+        # Oversized trial steps can overflow; they are retried smaller
+        try:
+            y_new, error = _scalar_dormand_prince_step(y, h, broken, density_kg_m3)
+            ratios = [
+                abs(e) / (a + ENTRY_RTOL * max(abs(y_i), abs(n_i)))
+                for e, a, y_i, n_i in zip(error, atol, y, y_new)
+            ]
+        except (ArithmeticError, ValueError):
+            ratios = [math.inf]
+        error_norm = max(ratios) if all(map(math.isfinite, ratios)) else math.inf
+        accepted = error_norm <= 1.0
+
+        if error_norm == 0:
+            factor = 5.0
+        else:
+            factor = min(max(0.9 * error_norm**-0.2, 0.2), 5.0)
+        y_next = y_new if accepted else y
+        descent_m_s = max(y_next[_V] * math.sin(y_next[_THETA]), 1e-3)
+        h = min(h * factor, ENTRY_MAX_STEP_DZ_M / descent_m_s)
+        if not accepted:
+            continue
+        old, new, y = y, y_new, y_new
+
+        # Breakup: ram pressure crosses the strength within this step
+        if not broken:
+            pressure_new = _scalar_air_density_kg_m3(new[_Z]) * new[_V] ** 2
+            if pressure_new >= strength_pa:
+                pressure_old = _scalar_air_density_kg_m3(old[_Z]) * old[_V] ** 2
+                fraction = _clipped_fraction(
+                    math.log(strength_pa / pressure_old),
+                    math.log(pressure_new / pressure_old),
+                )
+                breakup_altitude_m = _lerp(old[_Z], new[_Z], fraction)
+                broken = True
+
+        # Energy deposited per meter of descent, its peak locates h2
+        energy_old = 0.5 * old[_M] * old[_V] ** 2
+        energy_new = 0.5 * new[_M] * new[_V] ** 2
+        drop_m = old[_Z] - new[_Z]
+        per_m = (energy_old - energy_new) / drop_m if drop_m > 0 else 0.0
+        if per_m > peak_energy_per_m:
+            peak_energy_per_m = per_m
+            peak_energy_altitude_m = 0.5 * (old[_Z] + max(new[_Z], 0.0))
+        final_energy_j = energy_new
+
+        # Terminal events, checked in order of precedence
+        if new[_Z] <= 0:
+            fraction = old[_Z] / (drop_m if drop_m > 0 else 1.0)
+            impact_velocity_m_s = _lerp(old[_V], new[_V], fraction)
+            impact_mass_kg = _lerp(old[_M], new[_M], fraction)
+            terminal_altitude_m = 0.0
+            terminal_type = _IMPACT
+            final_energy_j = 0.5 * impact_mass_kg * impact_velocity_m_s**2
+            break
+
+        if new[_R] >= burst_radius_m or new[_M] <= _ABLATED_FRACTION * mass_kg:
+            fraction = 1.0
+            if new[_R] >= burst_radius_m:
+                fraction = _clipped_fraction(
+                    burst_radius_m - old[_R], new[_R] - old[_R]
+                )
+            terminal_altitude_m = _lerp(old[_Z], new[_Z], fraction)
+            terminal_type = _AIRBURST
+            final_energy_j = 0.0
+            break
+
+        # A spent fragment cloud has deposited its energy in the air; a spent
+        # intact body falls the rest of the way at about its current speed
+        if energy_new <= _SPENT_FRACTION * entry_energy_j:
+            if broken:
+                terminal_altitude_m = new[_Z]
+                terminal_type = _AIRBURST
+                final_energy_j = 0.0
+            else:
+                impact_velocity_m_s = new[_V]
+                impact_mass_kg = new[_M]
+                terminal_altitude_m = 0.0
+                terminal_type = _IMPACT
+            break
+
+        if new[_Z] > entry_height_m:
+            terminal_type = _SKIP_OUT
+            break
+
+    return {
+        "breakup_altitude_m": _none_if_nan(breakup_altitude_m),
+        "peak_energy_altitude_m": _none_if_nan(peak_energy_altitude_m),
+        "terminal_altitude_m": _none_if_nan(terminal_altitude_m),
+        "terminal_type": TERMINAL_TYPES[terminal_type],
+        "impact_velocity_m_s": _none_if_nan(impact_velocity_m_s),
+        "impact_mass_kg": _none_if_nan(impact_mass_kg),
+        "deposited_energy_mt": (entry_energy_j - final_energy_j) / J_PER_MT,
+    }
@@ -0,0 +1,133 @@
+import base64
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from .models import Asteroid
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Seconds a filtered row count is reused; counting a large catalog is a full
+# index scan, while pages themselves are index range reads
+ASTEROID_COUNT_CACHE_TTL_S = float(os.getenv("ASTEROID_COUNT_CACHE_TTL_S", 300))
+
+# Columns of a listed asteroid, read with values() so no model instances are built
+LIST_FIELDS = (
+    "id",
+    "spkid",
+    "name",
+    "designation",
+    "full_name",
+    "neo",
+    "pha",
+    "h_mag",
+    "diameter_km",
+)
+
+# Query parameter -> ORM lookup
+_FLOAT_FILTERS = {
+    "diameter_min": "diameter_km__gte",
+    "diameter_max": "diameter_km__lte",
+    "h_min": "h_mag__gte",
+    "h_max": "h_mag__lte",
+}
+_BOOL_FILTERS = {"pha": "pha", "neo": "neo"}
+_TRUE, _FALSE = ("1", "true", "yes"), ("0", "false", "no")
+
+
+@dataclass
+class AsteroidPage:
+    count: int
+    results: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+
+
+def parse_filters(params: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    ORM filters from list query parameters: diameter_min/diameter_max (km),
+    h_min/h_max (absolute magnitude) and pha/neo (true/false).
+
+    Raises:
+        ValueError: a filter value is not a number / boolean
+    """
+    filters: Dict[str, Any] = {}
+    for param, lookup in _FLOAT_FILTERS.items():
+        value = params.get(param)
+        if value not in (None, ""):
+            try:
+                filters[lookup] = float(value)
+            except ValueError:
+                raise ValueError(f"'{param}' must be a number.")
+    for param, lookup in _BOOL_FILTERS.items():
+        value = params.get(param)
+        if value not in (None, ""):
+            if value.lower() in _TRUE:
+                filters[lookup] = True
+            elif value.lower() in _FALSE:
+                filters[lookup] = False
+            else:
+                raise ValueError(f"'{param}' must be true or false.")
+    return filters
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Raises:
+        ValueError: cursor was not produced by encode_cursor
+    """
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor.")
+    return last_id
+
+
+def count_asteroids(queryset: QuerySet, filters: Dict[str, Any]) -> int:
+    """Row count of a filtered list, cached per filter set."""
+    digest = hashlib.sha256(
+        json.dumps(filters, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    key = f"asteroid_count:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, ASTEROID_COUNT_CACHE_TTL_S)
+    return count
+
+
+def list_asteroids(
+    filters: Dict[str, Any],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> AsteroidPage:
+    """
+    One page of asteroids in id order, after the row the cursor points at.
+
+    Keyset pagination (WHERE id > last ORDER BY id LIMIT n) reads the same
+    number of index entries on every page, unlike OFFSET, which reads and
+    discards every row before the page.
+
+    Raises:
+        ValueError: invalid cursor
+    """
+    queryset = Asteroid.objects.filter(**filters)
+    page_queryset = queryset
+    if cursor:
+        page_queryset = page_queryset.filter(id__gt=decode_cursor(cursor))
+
+    # One row more than asked for tells whether there is a next page
+    rows = list(page_queryset.order_by("id").values(*LIST_FIELDS)[: limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]["id"]) if len(rows) > limit else None
+
+    return AsteroidPage(count_asteroids(queryset, filters), rows[:limit], next_cursor)
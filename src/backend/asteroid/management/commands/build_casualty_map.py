@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asteroid.constants import CRATER_MATERIAL_SF
+from asteroid.datasets import DatasetError
+from asteroid.risk_map import (RISK_MAP_TILE_SIZE, RISK_MAP_WORKERS,
+                               casualty_kernel, impactor_casualty_rings,
+                               lonlat_window, select_population_grid,
+                               write_casualty_risk_map)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a map of estimated deaths per impact location for one impactor "
+        "(memory-mapped .npy + .json manifest) by FFT-convolving the "
+        "population raster with its fatality-weighted blast rings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--diameter", type=float, required=True, help="m")
+        parser.add_argument("--density", type=float, default=3000.0, help="kg/m^3")
+        parser.add_argument("--velocity", type=float, default=20000.0, help="m/s")
+        parser.add_argument(
+            "--material",
+            default="crystalline",
+            choices=sorted(CRATER_MATERIAL_SF),
+        )
+        parser.add_argument("--output", required=True, help="Output .npy path.")
+        parser.add_argument(
+            "--bbox",
+            type=float,
+            nargs=4,
+            metavar=("WEST", "SOUTH", "EAST", "NORTH"),
+            help="Lon/lat box to map (default: the whole raster).",
+        )
+        parser.add_argument(
+            "--level",
+            type=int,
+            help="Pyramid level to convolve, 0 is the source raster "
+            "(default: coarsest level resolving the largest ring).",
+        )
+        parser.add_argument("--geotiff", help="Also export the map as a GeoTIFF.")
+        parser.add_argument(
+            "--tile-size",
+            type=int,
+            default=RISK_MAP_TILE_SIZE,
+            help="Side of the input tiles convolved per task.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=RISK_MAP_WORKERS,
+            help="Worker processes, 1 runs in this process.",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("tile_size", "workers"):
+            if options[name] <= 0:
+                raise CommandError(f"--{name.replace('_', '-')} must be positive.")
+
+        impactor = {
+            "diameter_m": options["diameter"],
+            "density_kg_m3": options["density"],
+            "entry_velocity_m_s": options["velocity"],
+            "material_type": options["material"],
+        }
+        try:
+            radii_m, fatality_rates = impactor_casualty_rings(**impactor)
+            grid = select_population_grid(radii_m[-1], options["level"])
+            window = lonlat_window(grid, *options["bbox"]) if options["bbox"] else None
+        except (DatasetError, ValueError) as e:
+            raise CommandError(str(e))
+
+        resolution_m = abs(grid.resolution[0])
+        kernel = casualty_kernel(radii_m, fatality_rates, resolution_m)
+        self.stdout.write(
+            f"Convolving {resolution_m:g} m population with a "
+            f"{kernel.shape[0]}x{kernel.shape[0]} kernel "
+            f"(outer ring {radii_m[-1]:,.0f} m)"
+        )
+
+        risk_map = write_casualty_risk_map(
+            grid,
+            kernel,
+            options["output"],
+            window=window,
+            impactor=impactor,
+            tile_size=options["tile_size"],
+            workers=options["workers"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if options["geotiff"]:
+            risk_map.export_geotiff(options["geotiff"])
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['geotiff']}"))
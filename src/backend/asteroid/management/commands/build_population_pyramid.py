@@ -0,0 +1,77 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from asteroid.datasets import (GHS_POP_ENV, GHS_POP_PYRAMID_ENV, RasterDataset,
+                               write_population_pyramid)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a multi-resolution population pyramid (memory-mapped .npy "
+        "levels + manifest.json) by block-summing the GHSL raster."
+    )
+
+    def add_arguments(self, parser):
+        default_output = os.getenv(GHS_POP_PYRAMID_ENV)
+        parser.add_argument(
+            "--source",
+            default=os.getenv(GHS_POP_ENV),
+            help=f"Population GeoTIFF (default: ${GHS_POP_ENV}).",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=os.path.dirname(default_output) if default_output else None,
+            help=f"Output directory (default: directory of ${GHS_POP_PYRAMID_ENV}).",
+        )
+        parser.add_argument(
+            "--factor",
+            type=int,
+            default=4,
+            help="Pixels summed along each axis per level.",
+        )
+        parser.add_argument(
+            "--levels",
+            type=int,
+            default=4,
+            help="Number of levels above the source raster.",
+        )
+        parser.add_argument(
+            "--block-rows",
+            type=int,
+            default=256,
+            help="Rows of the level below processed per block.",
+        )
+
+    def handle(self, *args, **options):
+        source_path = options["source"]
+        output_dir = options["output_dir"]
+        if not source_path:
+            raise CommandError(f"Pass --source or set {GHS_POP_ENV}.")
+        if not output_dir:
+            raise CommandError(f"Pass --output-dir or set {GHS_POP_PYRAMID_ENV}.")
+        for name in ("factor", "levels", "block_rows"):
+            if options[name] <= 0:
+                raise CommandError(f"--{name.replace('_', '-')} must be positive.")
+        if options["factor"] == 1:
+            raise CommandError("--factor must be at least 2.")
+
+        source = RasterDataset.open(source_path)
+        resolution_m = abs(source.resolution[0])
+        self.stdout.write(
+            f"Building {options['levels']} levels from {source_path}: "
+            + " -> ".join(
+                f"{resolution_m * options['factor'] ** level:g} m"
+                for level in range(options["levels"] + 1)
+            )
+        )
+
+        manifest = write_population_pyramid(
+            source,
+            output_dir,
+            factor=options["factor"],
+            levels=options["levels"],
+            block_rows=options["block_rows"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {manifest}"))
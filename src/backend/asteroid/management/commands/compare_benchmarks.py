@@ -0,0 +1,99 @@
+import json
+from typing import Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+
+STATS = ("min", "median", "mean")
+
+
+def read_benchmark_run(path: str, stat: str) -> Dict[str, float]:
+    """Seconds per benchmark, by full name, from a --benchmark-json file."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            run = json.load(f)
+        return {
+            benchmark["fullname"]: float(benchmark["stats"][stat])
+            for benchmark in run["benchmarks"]
+        }
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"{path} is not a pytest-benchmark JSON file ({e}).")
+
+
+def compare_benchmark_runs(
+    baseline: Dict[str, float], current: Dict[str, float]
+) -> List[Tuple[str, float, float, float]]:
+    """(name, baseline s, current s, relative change) of every benchmark in
+    both runs, slowest change first."""
+    rows = [
+        (name, baseline[name], current[name], current[name] / baseline[name] - 1)
+        for name in baseline.keys() & current.keys()
+        if baseline[name] > 0
+    ]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare two `pytest benchmarks --benchmark-json` runs and fail if any "
+        "benchmark got slower than the threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("baseline", help="JSON of the reference run.")
+        parser.add_argument("current", help="JSON of the run to check.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Slowdown in percent flagged as a regression.",
+        )
+        parser.add_argument(
+            "--stat",
+            choices=STATS,
+            default="median",
+            help="Statistic compared (median is least sensitive to outliers).",
+        )
+
+    def handle(self, *args, **options):
+        if options["threshold"] < 0:
+            raise CommandError("--threshold must be >= 0.")
+
+        try:
+            baseline = read_benchmark_run(options["baseline"], options["stat"])
+            current = read_benchmark_run(options["current"], options["stat"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        threshold = options["threshold"] / 100
+        regressions: List[str] = []
+        for name, before, after, change in compare_benchmark_runs(baseline, current):
+            line = (
+                f"{change:+8.1%}  {_format_seconds(before):>12} -> "
+                f"{_format_seconds(after):>12}  {name}"
+            )
+            if change > threshold:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            elif change < -threshold:
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                self.stdout.write(line)
+
+        for name in sorted(baseline.keys() - current.keys()):
+            self.stdout.write(f"{'missing':>8}  {name}")
+        for name in sorted(current.keys() - baseline.keys()):
+            self.stdout.write(f"{'new':>8}  {name}")
+
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmarks are more than "
+                f"{options['threshold']:g}% slower ({options['stat']})."
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions."))
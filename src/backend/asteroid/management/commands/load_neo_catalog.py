@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asteroid.catalog import read_catalog, upsert_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk load (insert or update by spkid) a local SBDB/MPC catalog dump, "
+        "JSON or CSV, into the Asteroid table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalog dump (.json or .csv).")
+        parser.add_argument(
+            "--format",
+            choices=("json", "csv"),
+            help="Dump format (default: from the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5_000,
+            help="Rows per bulk insert.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive.")
+
+        def progress(written):
+            self.stdout.write(f"{written:,} rows")
+
+        try:
+            written = upsert_catalog(
+                read_catalog(options["path"], options["format"]),
+                batch_size=options["batch_size"],
+                progress=progress if options["verbosity"] > 1 else None,
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Loaded {written:,} objects from {options['path']}")
+        )
@@ -0,0 +1,120 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asteroid.synthetic_population import (COMPRESSIONS, DTYPES, GHSL_EXTENT_M,
+                                           GHSL_ORIGIN_M, MOLLWEIDE_RADIUS_M,
+                                           PATTERNS, SyntheticPopulation,
+                                           random_cities,
+                                           write_synthetic_population)
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a deterministic synthetic population GeoTIFF laid out like the "
+        "GHSL grids (ESRI:54009), whose disc and rectangle populations are "
+        "known exactly, for tests and load testing without the GHSL download."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Output .tif path.")
+        parser.add_argument("--pattern", choices=PATTERNS, default="cities")
+        parser.add_argument(
+            "--resolution",
+            type=float,
+            default=1_000.0,
+            help="Pixel size in meters (GHSL: 250 or 1000).",
+        )
+        parser.add_argument("--width", type=int, default=1_024, help="Columns.")
+        parser.add_argument("--height", type=int, default=1_024, help="Rows.")
+        parser.add_argument(
+            "--globe",
+            action="store_true",
+            help="Cover the full GHSL extent; overrides --width/--height.",
+        )
+        parser.add_argument(
+            "--density",
+            type=float,
+            default=100.0,
+            help="People per km^2 of the uniform pattern.",
+        )
+        parser.add_argument(
+            "--cities", type=int, default=50, help="Cities of the cities pattern."
+        )
+        parser.add_argument(
+            "--city-population",
+            type=float,
+            default=1e6,
+            help="Median people per city.",
+        )
+        parser.add_argument(
+            "--city-sigma",
+            type=float,
+            default=5_000.0,
+            help="Median city standard deviation in meters.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="City layout seed.")
+        parser.add_argument(
+            "--tile-size",
+            type=int,
+            default=256,
+            help="Tile edge in pixels, 0 for a striped file.",
+        )
+        parser.add_argument("--compress", choices=COMPRESSIONS, default="lzw")
+        parser.add_argument("--dtype", choices=DTYPES, default="float32")
+
+    def handle(self, *args, **options):
+        resolution_m = options["resolution"]
+        if options["globe"]:
+            width = round(GHSL_EXTENT_M[0] / resolution_m)
+            height = round(GHSL_EXTENT_M[1] / resolution_m)
+            origin_m = GHSL_ORIGIN_M
+        else:
+            width, height = options["width"], options["height"]
+            origin_m = (-width * resolution_m / 2, height * resolution_m / 2)
+
+        try:
+            if options["pattern"] == "uniform":
+                population = SyntheticPopulation(density_per_km2=options["density"])
+            elif options["pattern"] == "cities":
+                if options["globe"]:
+                    # Largest rectangle inside the Mollweide ellipse, cities
+                    # beyond it would lose people to the nodata corners
+                    radius_m = MOLLWEIDE_RADIUS_M
+                    bounds_m = (-2 * radius_m, 2 * radius_m, -radius_m, radius_m)
+                else:
+                    bounds_m = (
+                        origin_m[0],
+                        origin_m[0] + width * resolution_m,
+                        origin_m[1] - height * resolution_m,
+                        origin_m[1],
+                    )
+                population = SyntheticPopulation(
+                    cities=random_cities(
+                        options["seed"],
+                        options["cities"],
+                        bounds_m,
+                        options["city_population"],
+                        options["city_sigma"],
+                    )
+                )
+            else:
+                population = SyntheticPopulation(ocean=True)
+
+            self.stdout.write(
+                f"Writing {width}x{height} {options['pattern']} raster at "
+                f"{resolution_m:g} m to {options['output']}"
+            )
+            write_synthetic_population(
+                options["output"],
+                population,
+                width,
+                height,
+                resolution_m,
+                origin_m,
+                options["tile_size"],
+                options["compress"],
+                options["dtype"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
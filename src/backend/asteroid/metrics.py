@@ -0,0 +1,134 @@
+import os
+import time
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+# Serve /metrics and record request latencies and pipeline stages
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Directory shared by all gunicorn workers (see gunicorn.conf.py). When set
+# before prometheus_client is imported, every worker writes its values to its
+# own memory-mapped files there and a scrape merges them without touching the
+# workers' locks.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Whole simulation requests range from a cache hit to a multi-second batch
+REQUEST_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Single stages go down to the sub-millisecond closed-form calculations
+STAGE_BUCKETS_S = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    10,
+)
+
+REQUEST_SECONDS = Histogram(
+    "asteroidsim_http_request_duration_seconds",
+    "Time from the request entering the middleware to the response leaving it.",
+    ["endpoint", "method"],
+    buckets=REQUEST_BUCKETS_S,
+)
+REQUESTS = Counter(
+    "asteroidsim_http_requests",
+    "Requests by endpoint, method and status code.",
+    ["endpoint", "method", "status"],
+)
+STAGE_SECONDS = Histogram(
+    "asteroidsim_stage_duration_seconds",
+    "Duration of the simulation pipeline stages, see timing.stage().",
+    ["stage"],
+    buckets=STAGE_BUCKETS_S,
+)
+SIMULATION_CACHE_LOOKUPS = Counter(
+    "asteroidsim_simulation_cache_lookups",
+    "Stored simulation lookups by result (hit or miss).",
+    ["result"],
+)
+DATASET_CACHE_LOOKUPS = Counter(
+    "asteroidsim_dataset_cache_lookups",
+    "Dataset manager lookups by dataset and result (hit or miss).",
+    ["dataset", "result"],
+)
+RASTER_PIXELS_READ = Counter(
+    "asteroidsim_raster_pixels_read",
+    "Population raster pixels read through pixel windows.",
+)
+RASTER_MAPPED_BYTES = Gauge(
+    "asteroidsim_raster_mapped_bytes",
+    "Bytes of raster data a worker keeps mapped or loaded, by dataset.",
+    ["dataset"],
+    # Workers map the same files, shared pages must not be counted twice
+    multiprocess_mode="livemax",
+)
+SBDB_REQUESTS = Counter(
+    "asteroidsim_sbdb_requests",
+    "Requests sent to the JPL SBDB Lookup API (cache misses).",
+)
+SBDB_ERRORS = Counter(
+    "asteroidsim_sbdb_errors",
+    "Failed SBDB requests by reason (timeout, connection, http, invalid).",
+    ["reason"],
+)
+SBDB_SECONDS = Histogram(
+    "asteroidsim_sbdb_request_duration_seconds",
+    "SBDB request latency including retries.",
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to scrape: this process's, or a merge of every worker's files
+    when PROMETHEUS_MULTIPROC_DIR is set."""
+    if os.getenv(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> bytes:
+    """Current metrics in the Prometheus text exposition format."""
+    return generate_latest(metrics_registry())
+
+
+def observe_stage(name: str, duration_s: float) -> None:
+    if METRICS_ENABLED:
+        STAGE_SECONDS.labels(name).observe(duration_s)
+
+
+class MetricsMiddleware:
+    """
+    Records the latency and status of every request, labelled with the name
+    of the matched URL pattern so unknown paths cannot blow up the series.
+
+    Like ServerTimingMiddleware it only sees streamed responses until their
+    first byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not METRICS_ENABLED:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration_s = time.perf_counter() - start
+
+        match = request.resolver_match
+        endpoint = (match.url_name if match is not None else None) or "unmatched"
+        REQUEST_SECONDS.labels(endpoint, request.method).observe(duration_s)
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.12 on 2026-10-17 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asteroid", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Simulation",
+            fields=[
+                (
+                    "id",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("inputs", models.JSONField()),
+                ("outputs", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
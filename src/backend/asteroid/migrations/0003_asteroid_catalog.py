@@ -0,0 +1,107 @@
+# Generated by Django 5.1.12 on 2026-10-17 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asteroid", "0002_simulation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="asteroid",
+            name="albedo",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="ascending_node_deg",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="designation",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="diameter_km",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="eccentricity",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="epoch_jd",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="full_name",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="h_mag",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="inclination_deg",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="mean_anomaly_deg",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="neo",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="normalized_name",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="perihelion_arg_deg",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="perihelion_au",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="pha",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="semi_major_axis_au",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="spkid",
+            field=models.BigIntegerField(null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="asteroid",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.12 on 2026-10-17 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asteroid", "0003_asteroid_catalog"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="asteroid",
+            index=models.Index(fields=["diameter_km"], name="asteroid_diameter_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="asteroid",
+            index=models.Index(fields=["h_mag"], name="asteroid_h_mag_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="asteroid",
+            index=models.Index(fields=["pha", "id"], name="asteroid_pha_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="asteroid",
+            index=models.Index(fields=["neo", "id"], name="asteroid_neo_id_idx"),
+        ),
+    ]
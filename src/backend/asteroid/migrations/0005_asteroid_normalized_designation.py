@@ -0,0 +1,38 @@
+# Generated by Django 5.1.12 on 2026-10-17 03:26
+
+from django.db import migrations, models
+
+
+def fill_normalized_designation(apps, schema_editor):
+    Asteroid = apps.get_model("asteroid", "Asteroid")
+    batch = []
+    for asteroid in Asteroid.objects.only("id", "designation").iterator(
+        chunk_size=10_000
+    ):
+        # Same as api_calls.normalize_search_str() at the time of writing
+        asteroid.normalized_designation = " ".join(
+            asteroid.designation.split()
+        ).casefold()
+        batch.append(asteroid)
+        if len(batch) == 10_000:
+            Asteroid.objects.bulk_update(batch, ["normalized_designation"])
+            batch = []
+    Asteroid.objects.bulk_update(batch, ["normalized_designation"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asteroid", "0004_asteroid_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="asteroid",
+            name="normalized_designation",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=64
+            ),
+        ),
+        migrations.RunPython(fill_normalized_designation, migrations.RunPython.noop),
+    ]
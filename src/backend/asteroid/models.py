@@ -2,4 +2,54 @@ from django.db import models
 
 
 class Asteroid(models.Model):
+    # Proper name, e.g. "Apophis"; empty for unnamed objects
     name = models.CharField(max_length=255)
+    spkid = models.BigIntegerField(unique=True, null=True)
+    # e.g. "99942 Apophis (2004 MN4)"
+    full_name = models.CharField(max_length=255, blank=True, default="")
+    # Primary designation: the number of numbered objects, else e.g. "2024 YR4"
+    designation = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    # normalize_search_str() of designation, so lookups in any case use an index
+    normalized_designation = models.CharField(
+        max_length=64, blank=True, default="", db_index=True
+    )
+    # normalize_search_str() of name, or of designation for unnamed objects
+    normalized_name = models.CharField(
+        max_length=255, blank=True, default="", db_index=True
+    )
+    neo = models.BooleanField(default=False)
+    pha = models.BooleanField(default=False)
+
+    h_mag = models.FloatField(null=True)  # absolute magnitude H
+    diameter_km = models.FloatField(null=True)
+    albedo = models.FloatField(null=True)
+
+    # Osculating orbital elements at epoch_jd
+    epoch_jd = models.FloatField(null=True)
+    eccentricity = models.FloatField(null=True)
+    semi_major_axis_au = models.FloatField(null=True)
+    perihelion_au = models.FloatField(null=True)
+    inclination_deg = models.FloatField(null=True)
+    ascending_node_deg = models.FloatField(null=True)
+    perihelion_arg_deg = models.FloatField(null=True)
+    mean_anomaly_deg = models.FloatField(null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Back the list filters (asteroid.listing); the flag indexes end in id
+        # so a filtered keyset page is a single index range read
+        indexes = [
+            models.Index(fields=["diameter_km"], name="asteroid_diameter_idx"),
+            models.Index(fields=["h_mag"], name="asteroid_h_mag_idx"),
+            models.Index(fields=["pha", "id"], name="asteroid_pha_id_idx"),
+            models.Index(fields=["neo", "id"], name="asteroid_neo_id_idx"),
+        ]
+
+
+class Simulation(models.Model):
+    # SHA-256 hex digest of the normalized inputs, see compute_simulation_id()
+    id = models.CharField(primary_key=True, max_length=64)
+    inputs = models.JSONField()
+    outputs = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,350 @@
+import math
+import os
+from functools import lru_cache
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+from pyproj import Transformer
+
+from .datasets import (
+    PyramidLevel,
+    RasterDataset,
+    SummedAreaTable,
+    TiledRaster,
+    get_population_dataset,
+    get_population_pyramid,
+    get_population_sat,
+)
+from .raster import (
+    PixelWindow,
+    antimeridian_columns,
+    pixel_axes,
+    read_pixel_window,
+    window_around,
+)
+from .timing import count
+
+# Queries whose raster window exceeds this many pixels are answered from the
+# summed-area table, when one is configured
+SAT_MIN_WINDOW_PIXELS = int(os.getenv("POPULATION_SAT_MIN_WINDOW_PIXELS", 1_000_000))
+# Upper bound on the relative error of SAT disc sums versus exact masking
+SAT_MAX_ERROR = float(os.getenv("POPULATION_SAT_MAX_ERROR", 0.01))
+# Discs are read from the coarsest pyramid level on which their diameter still
+# spans at least this many pixels
+PYRAMID_MIN_PIXELS_ACROSS = float(
+    os.getenv("POPULATION_PYRAMID_MIN_PIXELS_ACROSS", 100)
+)
+
+PopulationGrid = Union[RasterDataset, TiledRaster, PyramidLevel]
+
+
+@lru_cache(maxsize=None)
+def _lonlat_transformer(crs: str) -> Transformer:
+    """Cached WGS84 lon/lat -> raster CRS transformer."""
+    return Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+
+
+def to_raster_xy(
+    grid: Union[PopulationGrid, SummedAreaTable], latitude: float, longtitude: float
+) -> Tuple[float, float]:
+    """(x, y) of a WGS84 point in the CRS of any raster with a `crs`."""
+    return _lonlat_transformer(grid.crs).transform(longtitude, latitude)
+
+
+def get_population_in_radius(
+    latitude: float, longtitude: float, radius_m: float
+) -> float:
+    """
+    Inputs: impact longtitude, impact latitude, impact radius (m)
+    Outputs: Approximate population in circle radius
+
+    Bad radii raise ValueError, dataset problems propagate unchanged.
+    """
+    return float(get_disc_populations(latitude, longtitude, [radius_m])[0])
+
+
+def get_annulus_populations(
+    latitude: float, longtitude: float, radii_m: Sequence[float]
+) -> np.ndarray:
+    """
+    Population of the disc inside radii_m[0] and of every annulus between
+    consecutive radii, see get_disc_populations.
+
+    Params:
+        latitude (float): impact latitude in degrees
+        longtitude (float): impact longtitude in degrees
+        radii_m (Sequence[float]): ring radii in meters (m), sorted ascending
+
+    Returns:
+        np.ndarray: population per annulus, same length as radii_m
+    """
+    return np.diff(get_disc_populations(latitude, longtitude, radii_m), prepend=0.0)
+
+
+def get_disc_populations(
+    latitude: float, longtitude: float, radii_m: Sequence[float]
+) -> np.ndarray:
+    """
+    Population inside every disc of radius radii_m around the impact point.
+
+    Each disc is read from the coarsest pyramid level (see `manage.py
+    build_population_pyramid`) on which it still spans
+    POPULATION_PYRAMID_MIN_PIXELS_ACROSS pixels, so crater-scale discs stay at
+    full resolution. Discs sharing a level are computed from one window read.
+    Full-resolution windows that are still too large are summed from the
+    summed-area table (see `manage.py build_population_sat`) with a relative
+    error of at most POPULATION_SAT_MAX_ERROR. The pyramid takes precedence:
+    with one configured, discs left at full resolution are at most
+    PYRAMID_MIN_PIXELS_ACROSS times the level factor wide, so the SAT only
+    serves them if POPULATION_SAT_MIN_WINDOW_PIXELS is below that area.
+
+    Params:
+        latitude (float): impact latitude in degrees
+        longtitude (float): impact longtitude in degrees
+        radii_m (Sequence[float]): ring radii in meters (m), sorted ascending
+
+    Returns:
+        np.ndarray: population per disc, same length as radii_m and never
+        decreasing
+    """
+    radii = np.asarray(radii_m, dtype=np.float64)
+    if radii.ndim != 1 or radii.size == 0:
+        raise ValueError("radii_m must be a non-empty 1-D sequence.")
+    if not np.all(np.isfinite(radii)) or np.any(radii < 0):
+        raise ValueError("radii_m must be finite and >= 0.")
+    if np.any(np.diff(radii) < 0):
+        raise ValueError("radii_m must be sorted ascending.")
+
+    ghsl = get_population_dataset()
+    resolution_m = abs(ghsl.resolution[0])
+
+    # Discs smaller than a pixel are counted as the nearest pixel scaled down
+    # by radius / resolution
+    half_pixel_m = resolution_m / 2
+    multipliers = np.where(radii < half_pixel_m, radii / resolution_m, 1.0)
+    radii = np.maximum(radii, half_pixel_m)
+
+    grids = [ghsl]
+    pyramid = get_population_pyramid()
+    if pyramid is not None:
+        grids.extend(pyramid.levels)
+
+    # Coarsest level on which each disc is still PYRAMID_MIN_PIXELS_ACROSS wide
+    grid_resolutions = np.array([abs(grid.resolution[0]) for grid in grids])
+    pixels_across = 2 * radii[:, np.newaxis] / grid_resolutions[np.newaxis, :]
+    grid_levels = np.maximum(
+        np.sum(pixels_across >= PYRAMID_MIN_PIXELS_ACROSS, axis=1) - 1, 0
+    )
+
+    disc_populations = np.empty_like(radii)
+    for level in np.unique(grid_levels):
+        in_level = grid_levels == level
+        disc_populations[in_level] = _disc_populations(
+            grids[level], latitude, longtitude, radii[in_level], use_sat=level == 0
+        )
+
+    # Discs read from different levels can disagree slightly at their edges,
+    # never let a larger disc hold fewer people than a smaller one
+    disc_populations = np.maximum.accumulate(disc_populations)
+
+    return disc_populations * multipliers
+
+
+def get_radial_population_profile(
+    latitude: float, longtitude: float, max_radius_m: float, points: int = 256
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Disc populations on a radius grid out to max_radius_m, for interpolating
+    many disc queries around the same impact point from one raster read.
+
+    The grid is geometric from a hundredth of a pixel up (plus 0), so
+    sub-pixel and crater-scale discs stay resolved while the outer rings stay
+    cheap.
+
+    Params:
+        latitude (float): impact latitude in degrees
+        longtitude (float): impact longtitude in degrees
+        max_radius_m (float): largest radius needed in meters (m)
+        points (int): number of radii in the grid, 0 included
+
+    Returns:
+        tuple: (radii_m, disc_populations), both ascending and of length points
+    """
+    if not math.isfinite(max_radius_m) or max_radius_m < 0:
+        raise ValueError("max_radius_m must be finite and >= 0.")
+    if points < 2:
+        raise ValueError("points must be at least 2.")
+
+    smallest_m = abs(get_population_dataset().resolution[0]) / 100
+    radii = np.concatenate(
+        [[0.0], np.geomspace(smallest_m, max(max_radius_m, smallest_m), points - 1)]
+    )
+    return radii, get_disc_populations(latitude, longtitude, radii)
+
+
+def _disc_populations(
+    grid: PopulationGrid,
+    latitude: float,
+    longtitude: float,
+    radii: np.ndarray,
+    use_sat: bool,
+) -> np.ndarray:
+    """Disc populations on one grid, from the SAT if the window is too large."""
+    center_x, center_y = to_raster_xy(grid, latitude, longtitude)
+    window = window_around(
+        grid.transform,
+        grid.width,
+        grid.height,
+        center_x,
+        center_y,
+        radii[-1],
+        grid.wrap_columns,
+    )
+
+    sat = get_population_sat() if use_sat else None
+    if sat is not None and window.shape[0] * window.shape[1] > SAT_MIN_WINDOW_PIXELS:
+        sat_x, sat_y = to_raster_xy(sat, latitude, longtitude)
+        return np.array(
+            [_disc_population_sat(sat, sat_x, sat_y, r, SAT_MAX_ERROR) for r in radii]
+        )
+
+    return _disc_populations_exact(grid, window, center_x, center_y, radii)
+
+
+def _disc_populations_exact(
+    ghsl: PopulationGrid,
+    window: PixelWindow,
+    center_x: float,
+    center_y: float,
+    radii: np.ndarray,
+) -> np.ndarray:
+    """Disc populations for every radius by masking pixels of one window read."""
+    ghsl_values = read_pixel_window(ghsl, window)
+
+    # Squared distances by broadcasting the 1-D axes, no meshgrid
+    xs, ys = pixel_axes(ghsl.transform, window)
+    dx = xs - center_x
+    dy = ys - center_y
+    distances_sq = dy[:, np.newaxis] ** 2 + dx[np.newaxis, :] ** 2
+
+    # Pixel with radii[i - 1] < d <= radii[i] falls into annulus i, pixels
+    # outside the largest ring land in the overflow bucket len(radii)
+    annulus_idx = np.searchsorted(radii**2, distances_sq.ravel(), side="left")
+    annulus_sums = np.bincount(
+        annulus_idx, weights=ghsl_values.ravel(), minlength=radii.size + 1
+    )[: radii.size]
+
+    return np.cumsum(annulus_sums)
+
+
+def _disc_population_sat(
+    sat: SummedAreaTable,
+    center_x: float,
+    center_y: float,
+    radius_m: float,
+    max_error: float,
+) -> float:
+    """Disc population approximated by stacking row-band rectangles of the SAT.
+
+    Each band of rows becomes one rectangle as wide as the disc chord at the
+    band's middle row. Misassigned pixels can only lie between the band's
+    narrowest and widest chord, so the population there (read exactly from
+    the SAT) bounds the error. Bands start as tall as the misassigned area
+    allows for a uniform density and are halved until that population is
+    within `max_error` of the disc; with one row per band the result equals
+    exact masking.
+    """
+    transform = sat.transform
+    window = window_around(
+        transform,
+        sat.width,
+        sat.height,
+        center_x,
+        center_y,
+        radius_m,
+        sat.wrap_columns,
+    )
+    resolution_y = abs(transform.e)
+    band_rows = max(1, int(max_error * math.pi * radius_m / (2 * resolution_y)))
+
+    while True:
+        band_starts = np.arange(window.row_start, window.row_stop, band_rows)
+        band_stops = np.minimum(band_starts + band_rows, window.row_stop)
+        mid_y = transform.f + transform.e * ((band_starts + band_stops) / 2)
+        total = float(
+            np.sum(
+                _chord_sums(
+                    sat, band_starts, band_stops, mid_y - center_y, center_x, radius_m
+                )
+            )
+        )
+        if band_rows == 1:
+            return total
+
+        # Row centres of each band nearest to and farthest from the centre
+        first_dy = transform.f + transform.e * (band_starts + 0.5) - center_y
+        last_dy = transform.f + transform.e * (band_stops - 0.5) - center_y
+        near_dy = np.where(
+            first_dy * last_dy <= 0, 0.0, np.minimum(abs(first_dy), abs(last_dy))
+        )
+        far_dy = np.maximum(abs(first_dy), abs(last_dy))
+        boundary = float(
+            np.sum(
+                _chord_sums(sat, band_starts, band_stops, near_dy, center_x, radius_m)
+            )
+            - np.sum(
+                _chord_sums(sat, band_starts, band_stops, far_dy, center_x, radius_m)
+            )
+        )
+        # The exact disc holds at least total - boundary people
+        if boundary <= max_error * max(total - boundary, 0.0):
+            return total
+        band_rows //= 2
+
+
+def _chord_sums(
+    sat: SummedAreaTable,
+    band_starts: np.ndarray,
+    band_stops: np.ndarray,
+    dy: np.ndarray,
+    center_x: float,
+    radius_m: float,
+) -> np.ndarray:
+    """SAT sums of every band over the columns whose pixel centres fall within
+    the disc chord `dy` away from the centre."""
+    transform = sat.transform
+    chord_sq = radius_m**2 - dy**2
+    half_chord = np.sqrt(np.maximum(chord_sq, 0.0))
+    col_start = np.ceil((center_x - half_chord - transform.c) / transform.a - 0.5)
+    col_stop = np.floor((center_x + half_chord - transform.c) / transform.a - 0.5) + 1
+    col_start = col_start.astype(np.int64)
+    col_stop = np.where(chord_sq >= 0, col_stop, col_start).astype(np.int64)
+
+    count("sat_rects", len(band_starts))
+    if not sat.wrap_columns:
+        return sat.rect_sums(band_starts, band_stops, col_start, col_stop)
+
+    # Parts of a chord past the antimeridian of the band's middle row continue
+    # on the other side, one period (at that latitude) away
+    west, east = antimeridian_columns(sat, (band_starts + band_stops - 1) // 2)
+    period = east - west
+    col_stop = np.minimum(col_stop, col_start + period)
+    sums = sat.rect_sums(
+        band_starts,
+        band_stops,
+        np.maximum(col_start, west),
+        np.minimum(col_stop, east),
+    )
+    sums = sums + sat.rect_sums(
+        band_starts,
+        band_stops,
+        col_start + period,
+        np.minimum(col_stop, west) + period,
+    )
+    sums = sums + sat.rect_sums(
+        band_starts,
+        band_stops,
+        np.maximum(col_start, east) - period,
+        col_stop - period,
+    )
+    return sums
@@ -0,0 +1,240 @@
+import math
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from affine import Affine
+from pyproj import CRS, Transformer
+
+from .metrics import RASTER_PIXELS_READ
+from .timing import count
+
+
+class PixelWindow(NamedTuple):
+    """Half-open pixel window [row_start:row_stop, col_start:col_stop].
+
+    Rows are always inside the raster. Columns may run past either edge of a
+    raster that wraps around the antimeridian, see `read_pixel_window`.
+    """
+
+    row_start: int
+    row_stop: int
+    col_start: int
+    col_stop: int
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.row_stop - self.row_start, self.col_stop - self.col_start
+
+
+def _require_north_up(transform: Affine) -> None:
+    if transform.b != 0 or transform.d != 0:
+        raise ValueError("Rotated raster transforms are not supported.")
+
+
+def world_to_pixel(transform: Affine, x: float, y: float) -> Tuple[float, float]:
+    """Fractional (col, row) of world coordinate (x, y); pixel i spans [i, i + 1)."""
+    _require_north_up(transform)
+    return (x - transform.c) / transform.a, (y - transform.f) / transform.e
+
+
+def pixel_to_world(transform: Affine, col: float, row: float) -> Tuple[float, float]:
+    """World coordinate (x, y) of the centre of pixel (col, row)."""
+    _require_north_up(transform)
+    return (
+        transform.c + transform.a * (col + 0.5),
+        transform.f + transform.e * (row + 0.5),
+    )
+
+
+def pixel_index(
+    transform: Affine,
+    x: float,
+    y: float,
+    width: int,
+    height: int,
+    wrap_columns: Optional[int] = None,
+) -> Tuple[int, int]:
+    """(row, col) of the pixel containing (x, y).
+
+    Rows are clamped to the raster. Columns are wrapped by `wrap_columns`
+    pixels when the raster covers the whole globe, otherwise clamped.
+    """
+    col_f, row_f = world_to_pixel(transform, x, y)
+    row = min(max(math.floor(row_f), 0), height - 1)
+    col = math.floor(col_f)
+    if wrap_columns:
+        col %= wrap_columns
+    return row, min(max(col, 0), width - 1)
+
+
+def window_around(
+    transform: Affine,
+    width: int,
+    height: int,
+    x: float,
+    y: float,
+    radius: float,
+    wrap_columns: Optional[int] = None,
+) -> PixelWindow:
+    """Pixel window covering the disc of `radius` (raster units) around (x, y)."""
+    row, col = pixel_index(transform, x, y, width, height, wrap_columns)
+    radius_in_rows = int(np.ceil(radius / abs(transform.e))) + 1
+    radius_in_cols = int(np.ceil(radius / abs(transform.a))) + 1
+
+    col_start = col - radius_in_cols
+    col_stop = col + radius_in_cols
+    if not wrap_columns:
+        col_start = max(0, col_start)
+        col_stop = min(width, col_stop)
+    else:
+        # A disc wider than the globe would read columns twice
+        col_stop = min(col_stop, col_start + wrap_columns)
+
+    return PixelWindow(
+        max(0, row - radius_in_rows),
+        min(height, row + radius_in_rows),
+        col_start,
+        col_stop,
+    )
+
+
+def pixel_axes(transform: Affine, window: PixelWindow) -> Tuple[np.ndarray, np.ndarray]:
+    """1-D x and y pixel-centre coordinates of `window`.
+
+    Columns past the antimeridian keep extrapolated (unwrapped) coordinates so
+    distances measured across it stay continuous.
+    """
+    _require_north_up(transform)
+    xs = transform.c + transform.a * (
+        np.arange(window.col_start, window.col_stop) + 0.5
+    )
+    ys = transform.f + transform.e * (
+        np.arange(window.row_start, window.row_stop) + 0.5
+    )
+    return xs, ys
+
+
+def read_pixel_window(dataset, window: PixelWindow) -> np.ndarray:
+    """Read `window` from `dataset`, stitching columns across the antimeridian.
+
+    `dataset` must expose width, wrap_columns and read_window(), plus crs,
+    transform and height for `antimeridian_columns`. Columns past the
+    antimeridian of their row are read from the other side of the globe,
+    columns that fall outside the raster after wrapping are returned as 0.
+    """
+    pixels = window.shape[0] * window.shape[1]
+    count("pixels", pixels)
+    RASTER_PIXELS_READ.inc(pixels)
+
+    if not dataset.wrap_columns:
+        if 0 <= window.col_start and window.col_stop <= dataset.width:
+            return dataset.read_window(*window)
+        values = np.zeros(window.shape, dtype=np.float64)
+        src_lo = max(window.col_start, 0)
+        src_hi = min(window.col_stop, dataset.width)
+        if src_lo < src_hi:
+            values[:, src_lo - window.col_start : src_hi - window.col_start] = (
+                dataset.read_window(window.row_start, window.row_stop, src_lo, src_hi)
+            )
+        return values
+
+    rows = np.arange(window.row_start, window.row_stop)
+    west, east = antimeridian_columns(dataset, rows)
+    if (
+        0 <= window.col_start
+        and window.col_stop <= dataset.width
+        and window.col_start >= west.max(initial=0)
+        and window.col_stop <= east.min(initial=dataset.width)
+    ):
+        return dataset.read_window(*window)
+
+    # Source column of every window pixel: shifted by its row's period when it
+    # lies past that row's antimeridian
+    cols = np.arange(window.col_start, window.col_stop)[np.newaxis, :]
+    period = (east - west)[:, np.newaxis]
+    shift = np.where(
+        cols >= east[:, np.newaxis],
+        -period,
+        np.where(cols < west[:, np.newaxis], period, 0),
+    )
+    src_cols = cols + shift
+    row_idx = np.broadcast_to(np.arange(rows.size)[:, np.newaxis], src_cols.shape)
+
+    # One rectangle read per side, so a window at the edge never reads the
+    # whole width in between
+    values = np.zeros(window.shape, dtype=np.float64)
+    for side in (shift < 0, shift == 0, shift > 0):
+        side &= (src_cols >= 0) & (src_cols < dataset.width)
+        if not side.any():
+            continue
+        src_lo = int(src_cols[side].min())
+        src_hi = int(src_cols[side].max()) + 1
+        rect = dataset.read_window(window.row_start, window.row_stop, src_lo, src_hi)
+        values[side] = rect[row_idx[side], src_cols[side] - src_lo]
+
+    return values
+
+
+@lru_cache(maxsize=32)
+def _antimeridian_x_by_row(crs: str, transform: Affine, height: int) -> np.ndarray:
+    """|x| of longitude 180 at the centre of every row."""
+    if CRS.from_user_input(crs).is_geographic:
+        return np.full(height, 180.0)
+    ys = transform.f + transform.e * (np.arange(height) + 0.5)
+    to_lonlat = Transformer.from_crs(crs, "EPSG:4326", always_xy=True)
+    _, lats = to_lonlat.transform(np.zeros(height), ys)
+    from_lonlat = Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+    xs, _ = from_lonlat.transform(np.full(height, 180.0), lats)
+    # Rows beyond the poles have no longitudes at all
+    return np.nan_to_num(np.abs(xs), nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def antimeridian_columns(grid, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(west, east) columns per row: pixels west <= col < east have their centre
+    between longitude -180 and 180, `east - west` columns are 360 degrees.
+
+    For pseudo-cylindrical projections (e.g. Mollweide, ESRI:54009) the
+    antimeridian moves inwards away from the equator, so the wrap follows the
+    ellipse boundary at each row. `grid` exposes crs, transform, height and
+    wrap_columns; a grid without crs wraps every row at 0 and wrap_columns.
+    """
+    rows = np.asarray(rows)
+    if grid.crs is None:
+        return np.zeros(rows.shape, dtype=np.int64), np.full(
+            rows.shape, grid.wrap_columns, dtype=np.int64
+        )
+
+    transform = grid.transform
+    x = _antimeridian_x_by_row(grid.crs, transform, grid.height)[
+        np.clip(rows, 0, grid.height - 1)
+    ]
+    # First column whose centre is at or past -x / +x
+    west = np.ceil((-x - transform.c) / transform.a - 0.5).astype(np.int64)
+    east = np.ceil((x - transform.c) / transform.a - 0.5).astype(np.int64)
+    return west, east
+
+
+@lru_cache(maxsize=None)
+def _antimeridian_x(crs: str) -> float:
+    transformer = Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+    return transformer.transform(180.0, 0.0)[0]
+
+
+def wrap_period_in_columns(crs: str, transform: Affine, width: int) -> Optional[int]:
+    """Columns spanning 360 degrees of longitude if the raster covers them all.
+
+    For pseudo-cylindrical projections (e.g. Mollweide, ESRI:54009) the period
+    is measured at the equator, which is where the ellipse is widest; it
+    bounds window widths, the wrap itself follows `antimeridian_columns`.
+    Returns None for rasters that do not wrap.
+    """
+    if CRS.from_user_input(crs).is_geographic:
+        period = 360.0
+    else:
+        period = 2 * _antimeridian_x(crs)
+
+    period_in_columns = period / abs(transform.a)
+    if width < period_in_columns - 1:
+        return None
+    return int(round(period_in_columns))
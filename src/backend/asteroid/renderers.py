@@ -0,0 +1,163 @@
+import json
+import struct
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import msgpack
+import numpy as np
+from django.utils.http import parse_header_parameters
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+# Columns of every trajectory sample, in buffer order
+TRAJECTORY_FIELDS = ["t", "lon", "lat", "h"]
+# dtype= media type parameter -> little-endian sample type
+TRAJECTORY_DTYPES = {"float64": np.dtype("<f8"), "float32": np.dtype("<f4")}
+
+
+def _json_fallback(data: Any, renderer_context: Optional[dict]) -> bytes:
+    """Errors and other non-trajectory data are sent as plain JSON."""
+    response = (renderer_context or {}).get("response")
+    if response is not None:
+        response["Content-Type"] = "application/json"
+    return JSONRenderer().render(data)
+
+
+def _frame_header(header: Dict[str, Any]) -> bytes:
+    """uint32 LE length + JSON header, padded with trailing spaces so the
+    samples after it start 8-byte aligned (typed-array views need that)."""
+    encoded = json.dumps(header).encode("utf-8")
+    encoded += b" " * (-(4 + len(encoded)) % 8)
+    return struct.pack("<I", len(encoded)) + encoded
+
+
+class MsgPackRenderer(BaseRenderer):
+    """MessagePack encoding of the same data the JSON renderer sends."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data)
+
+    def stream(
+        self,
+        header: Dict[str, Any],
+        chunks: Iterable[np.ndarray],
+        accepted_media_type: str,
+    ) -> Iterator[bytes]:
+        """Header map, then one flat [t, lon, lat, h, ...] array per chunk;
+        msgpack.Unpacker reads the concatenation object by object."""
+        yield msgpack.packb(header)
+        for chunk in chunks:
+            yield msgpack.packb(chunk.ravel().tolist())
+
+    def content_type(self, accepted_media_type: str) -> str:
+        return self.media_type
+
+
+class NDJSONRenderer(BaseRenderer):
+    """One JSON document per line; errors are a single line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return JSONRenderer().render(data) + b"\n"
+
+    def stream(
+        self,
+        header: Dict[str, Any],
+        chunks: Iterable[np.ndarray],
+        accepted_media_type: str,
+    ) -> Iterator[bytes]:
+        """Header line, then one flat [t, lon, lat, h, ...] line per chunk."""
+        yield self.render(header)
+        for chunk in chunks:
+            yield (json.dumps(chunk.ravel().tolist()) + "\n").encode("utf-8")
+
+    def content_type(self, accepted_media_type: str) -> str:
+        return self.media_type
+
+
+class TrajectoryBinaryRenderer(BaseRenderer):
+    """
+    Trajectory samples as a raw little-endian float buffer behind a small
+    JSON header:
+
+        uint32 LE header length | JSON header | samples
+
+    The samples are row-major [t, lon, lat, h] in the dtype requested with
+    "Accept: application/vnd.asteroidsim.trajectory; dtype=float32" (float64
+    by default) and start 8-byte aligned. The header describes them under
+    "trajectory" ({"fields", "dtype", "samples"}); for a simulation payload
+    it also carries every output except asteroid_fall_coordinates.
+    """
+
+    media_type = "application/vnd.asteroidsim.trajectory"
+    format = "trajectory"
+    charset = None
+    render_style = "binary"
+
+    def dtype(self, accepted_media_type: Optional[str]) -> str:
+        _, params = parse_header_parameters(accepted_media_type or "")
+        dtype = params.get("dtype", "float64")
+        return dtype if dtype in TRAJECTORY_DTYPES else "float64"
+
+    def content_type(self, accepted_media_type: Optional[str]) -> str:
+        return f"{self.media_type}; dtype={self.dtype(accepted_media_type)}"
+
+    def _trajectory_header(self, samples: int, dtype: str) -> Dict[str, Any]:
+        return {"fields": TRAJECTORY_FIELDS, "dtype": dtype, "samples": samples}
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        outputs = data.get("data") if isinstance(data, dict) else None
+        if (
+            getattr(response, "exception", False)
+            or not isinstance(outputs, dict)
+            or "asteroid_fall_coordinates" not in outputs
+        ):
+            return _json_fallback(data, renderer_context)
+
+        dtype = self.dtype(accepted_media_type)
+        samples = np.asarray(
+            outputs["asteroid_fall_coordinates"][0], dtype=TRAJECTORY_DTYPES[dtype]
+        )
+        header = {k: v for k, v in outputs.items() if k != "asteroid_fall_coordinates"}
+        header["trajectory"] = self._trajectory_header(len(samples) // 4, dtype)
+        if response is not None:
+            response["Content-Type"] = self.content_type(accepted_media_type)
+        return _frame_header(header) + samples.tobytes()
+
+    def stream(
+        self,
+        header: Dict[str, Any],
+        chunks: Iterable[np.ndarray],
+        accepted_media_type: str,
+    ) -> Iterator[bytes]:
+        dtype = self.dtype(accepted_media_type)
+        yield _frame_header(
+            {**header, "trajectory": self._trajectory_header(header["samples"], dtype)}
+        )
+        for chunk in chunks:
+            yield chunk.astype(TRAJECTORY_DTYPES[dtype]).tobytes()
+
+
+def representation_tag(renderer: BaseRenderer, accepted_media_type: str) -> str:
+    """Short name of a negotiated representation, e.g. for per-format ETags."""
+    if isinstance(renderer, TrajectoryBinaryRenderer):
+        return f"{renderer.format}-{renderer.dtype(accepted_media_type)}"
+    return renderer.format
+
+
+# JSON stays the default, msgpack is served on "Accept: application/msgpack"
+SIMULATION_RENDERERS = [*api_settings.DEFAULT_RENDERER_CLASSES, MsgPackRenderer]
+SIMULATION_TRAJECTORY_RENDERERS = [*SIMULATION_RENDERERS, TrajectoryBinaryRenderer]
+STREAM_RENDERERS = [NDJSONRenderer, MsgPackRenderer, TrajectoryBinaryRenderer]
@@ -0,0 +1,389 @@
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import rasterio
+from affine import Affine
+from pyproj import Transformer
+
+from .batch_calculations import run_physics_batch
+from .constants import ENTRY_HEIGHT_M, KPA_FATALITY_RATE, RING_THRESHOLDS_KPA
+from .datasets import (get_population_dataset, get_population_pyramid,
+                       manifest_path)
+from .population import PYRAMID_MIN_PIXELS_ACROSS, PopulationGrid, to_raster_xy
+from .raster import PixelWindow, pixel_index, read_pixel_window, world_to_pixel
+
+# Worker processes convolving tiles, 1 runs everything in this process
+RISK_MAP_WORKERS = int(os.getenv("RISK_MAP_WORKERS", os.cpu_count() or 1))
+# Side of the square input tiles, bounds memory per worker together with the
+# kernel size
+RISK_MAP_TILE_SIZE = int(os.getenv("RISK_MAP_TILE_SIZE", 1024))
+
+# Set in every worker by _init_worker, the kernel FFT is computed once per process
+_kernel_fft: Optional[np.ndarray] = None
+_kernel_size = 0
+_fft_shape: Tuple[int, int] = (0, 0)
+
+
+def casualty_kernel(
+    radii_m: Sequence[float], fatality_rates: Sequence[float], resolution_m: float
+) -> np.ndarray:
+    """
+    Square kernel weighting every pixel by the fatality rate of the disc or
+    annulus its centre falls in.
+
+    Summing population times this kernel around a pixel gives the estimated
+    deaths of an impact at that pixel's centre, with the same pixel-centre
+    rule as the exact disc queries in population.py.
+
+    Params:
+        radii_m (Sequence[float]): nested disc radii in meters (m), ascending
+        fatality_rates (Sequence[float]): rate inside radii_m[0] and in every
+            annulus between consecutive radii
+        resolution_m (float): pixel size of the population grid in meters (m)
+
+    Returns:
+        np.ndarray: (2k + 1, 2k + 1) kernel centred on the impact pixel
+    """
+    radii = np.asarray(radii_m, dtype=np.float64)
+    rates = np.asarray(fatality_rates, dtype=np.float64)
+    if radii.ndim != 1 or radii.shape != rates.shape or radii.size == 0:
+        raise ValueError("radii_m and fatality_rates must be 1-D of equal length.")
+    if np.any(np.diff(radii) < 0) or radii[0] < 0:
+        raise ValueError("radii_m must be >= 0 and sorted ascending.")
+
+    half_size = int(radii[-1] // resolution_m)
+    offsets = np.arange(-half_size, half_size + 1) * resolution_m
+    distances = np.hypot(offsets[:, np.newaxis], offsets[np.newaxis, :])
+    # Rings are closed discs: a centre exactly on radii[k] belongs to ring k
+    ring = np.searchsorted(radii, distances, side="left")
+    return np.append(rates, 0.0)[ring]
+
+
+def impactor_casualty_rings(
+    diameter_m: float,
+    density_kg_m3: float,
+    entry_velocity_m_s: float,
+    material_type: str,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nested disc radii and fatality rates of one impactor, as run_simulation
+    uses them: the crater kills everyone, each blast ring KPA_FATALITY_RATE.
+
+    Returns:
+        tuple: (radii_m, fatality_rates), crater first
+    """
+    physics = run_physics_batch(
+        diameter_m,
+        density_kg_m3,
+        entry_velocity_m_s,
+        material_type,
+        fall_height_m=ENTRY_HEIGHT_M,
+    )
+    ring_names = [f"kpa_{kpa}" for kpa in RING_THRESHOLDS_KPA]
+    radii_m = np.maximum.accumulate(
+        [physics["crater_final_diameter_m"][0] / 2]
+        + [physics[name][0] for name in ring_names]
+    )
+    fatality_rates = np.array(
+        [1.0] + [KPA_FATALITY_RATE.get(name, 0) for name in ring_names]
+    )
+    return radii_m, fatality_rates
+
+
+def select_population_grid(
+    max_radius_m: float, level: Optional[int] = None
+) -> PopulationGrid:
+    """
+    Population grid to convolve: pyramid level `level` (0 is the source
+    raster), or by default the coarsest one on which the largest ring still
+    spans POPULATION_PYRAMID_MIN_PIXELS_ACROSS pixels.
+    """
+    grids = [get_population_dataset()]
+    pyramid = get_population_pyramid()
+    if pyramid is not None:
+        grids.extend(pyramid.levels)
+
+    if level is None:
+        level = 0
+        for i, grid in enumerate(grids):
+            if 2 * max_radius_m / abs(grid.resolution[0]) >= PYRAMID_MIN_PIXELS_ACROSS:
+                level = i
+    if not 0 <= level < len(grids):
+        raise ValueError(f"level must be between 0 and {len(grids) - 1}.")
+    return grids[level]
+
+
+def lonlat_window(
+    grid: PopulationGrid, west: float, south: float, east: float, north: float
+) -> PixelWindow:
+    """
+    Pixel window of `grid` covering a lon/lat bounding box.
+
+    The box edges are sampled densely since they are curved in projected
+    rasters such as Mollweide. Boxes crossing the antimeridian (west > east)
+    are not supported.
+    """
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise ValueError("Bounding box must satisfy west < east and south < north.")
+
+    edge = np.linspace(0.0, 1.0, 101)
+    lons = np.concatenate(
+        [west + (east - west) * edge, np.full(101, east)]
+        + [east - (east - west) * edge, np.full(101, west)]
+    )
+    lats = np.concatenate(
+        [np.full(101, south), south + (north - south) * edge]
+        + [np.full(101, north), north - (north - south) * edge]
+    )
+    xs, ys = Transformer.from_crs("EPSG:4326", grid.crs, always_xy=True).transform(
+        lons, lats
+    )
+    cols, rows = world_to_pixel(grid.transform, xs, ys)
+    return PixelWindow(
+        max(int(np.floor(rows.min())), 0),
+        min(int(np.ceil(rows.max())), grid.height),
+        max(int(np.floor(cols.min())), 0),
+        min(int(np.ceil(cols.max())), grid.width),
+    )
+
+
+def _fast_fft_length(n: int) -> int:
+    """Smallest 2^a * 3^b * 5^c >= n, FFT sizes numpy handles quickly."""
+    best = 2 ** int(np.ceil(np.log2(n)))
+    power_of_5 = 1
+    while power_of_5 < best:
+        power_of_3 = power_of_5
+        while power_of_3 < best:
+            length = power_of_3
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power_of_3 *= 3
+        power_of_5 *= 5
+    return best
+
+
+def _init_worker(kernel: np.ndarray, tile_size: int) -> None:
+    global _kernel_fft, _kernel_size, _fft_shape
+    _kernel_size = kernel.shape[0]
+    length = _fast_fft_length(tile_size + _kernel_size - 1)
+    _fft_shape = (length, length)
+    _kernel_fft = np.fft.rfft2(kernel, _fft_shape)
+
+
+def _convolve_tile(tile: Tuple[int, int, np.ndarray]) -> Tuple[int, int, np.ndarray]:
+    """Full linear convolution of one input tile with the worker's kernel."""
+    row, col, values = tile
+    full_shape = (
+        values.shape[0] + _kernel_size - 1,
+        values.shape[1] + _kernel_size - 1,
+    )
+    convolved = np.fft.irfft2(
+        np.fft.rfft2(values, _fft_shape) * _kernel_fft, _fft_shape
+    )
+    return row, col, convolved[: full_shape[0], : full_shape[1]]
+
+
+def _read_tiles(grid: PopulationGrid, window: PixelWindow, tile_size: int):
+    """Yield (row, col, values) tiles of `window`, offsets relative to it."""
+    for row in range(window.row_start, window.row_stop, tile_size):
+        row_stop = min(row + tile_size, window.row_stop)
+        for col in range(window.col_start, window.col_stop, tile_size):
+            col_stop = min(col + tile_size, window.col_stop)
+            values = read_pixel_window(grid, PixelWindow(row, row_stop, col, col_stop))
+            yield row - window.row_start, col - window.col_start, values
+
+
+def convolve_population(
+    grid: PopulationGrid,
+    kernel: np.ndarray,
+    window: PixelWindow,
+    out: np.ndarray,
+    tile_size: int = RISK_MAP_TILE_SIZE,
+    workers: int = RISK_MAP_WORKERS,
+) -> None:
+    """
+    Write the population of `grid` convolved with `kernel` over `window` into
+    `out` (window-shaped, zeroed), by FFT overlap-add.
+
+    The input window is `window` widened by the kernel radius and cut into
+    tile_size tiles. Each tile is convolved in full in a worker process and
+    added into `out` where its support overlaps it, so at most 2 * workers
+    tiles are held at once however large the window is.
+    """
+    if (
+        kernel.ndim != 2
+        or kernel.shape[0] != kernel.shape[1]
+        or not kernel.shape[0] % 2
+    ):
+        raise ValueError("kernel must be square with an odd side.")
+    if out.shape != window.shape:
+        raise ValueError(f"out has shape {out.shape}, window is {window.shape}.")
+    if tile_size <= 0 or workers <= 0:
+        raise ValueError("tile_size and workers must be positive.")
+
+    radius = kernel.shape[0] // 2
+    input_window = PixelWindow(
+        window.row_start - radius,
+        window.row_stop + radius,
+        window.col_start - radius,
+        window.col_stop + radius,
+    )
+    # Rows past the grid, and columns past the edges of non-wrapping grids,
+    # only hold zeros
+    input_window = input_window._replace(
+        row_start=max(input_window.row_start, 0),
+        row_stop=min(input_window.row_stop, grid.height),
+    )
+    if not grid.wrap_columns:
+        input_window = input_window._replace(
+            col_start=max(input_window.col_start, 0),
+            col_stop=min(input_window.col_stop, grid.width),
+        )
+    row_offset = input_window.row_start - (window.row_start - radius)
+    col_offset = input_window.col_start - (window.col_start - radius)
+    tiles = _read_tiles(grid, input_window, tile_size)
+
+    def add(row: int, col: int, convolved: np.ndarray) -> None:
+        # Full-convolution index a of a tile starting at input row `row` lands
+        # on output row row + a - 2 * radius (likewise for columns)
+        row0 = row + row_offset - 2 * radius
+        col0 = col + col_offset - 2 * radius
+        out_rows = slice(max(row0, 0), min(row0 + convolved.shape[0], out.shape[0]))
+        out_cols = slice(max(col0, 0), min(col0 + convolved.shape[1], out.shape[1]))
+        if out_rows.start < out_rows.stop and out_cols.start < out_cols.stop:
+            out[out_rows, out_cols] += convolved[
+                out_rows.start - row0 : out_rows.stop - row0,
+                out_cols.start - col0 : out_cols.stop - col0,
+            ]
+
+    if workers == 1:
+        _init_worker(kernel, tile_size)
+        for tile in tiles:
+            add(*_convolve_tile(tile))
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(kernel, tile_size)
+    ) as executor:
+        pending = set()
+        for tile in tiles:
+            pending.add(executor.submit(_convolve_tile, tile))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    add(*future.result())
+        for future in pending:
+            add(*future.result())
+
+
+@dataclass
+class CasualtyRiskMap:
+    """Memory-mapped estimated deaths per impact point for one impactor."""
+
+    path: str
+    values: np.ndarray
+    transform: Affine
+    resolution: Tuple[float, float]
+    crs: str
+    width: int
+    height: int
+    impactor: Dict[str, Any]
+
+    @classmethod
+    def open(cls, path: str) -> "CasualtyRiskMap":
+        """Memory-map a map written by write_casualty_risk_map."""
+        with open(manifest_path(path)) as f:
+            manifest = json.load(f)
+        transform = Affine(*manifest["transform"])
+        return cls(
+            path=path,
+            values=np.load(path, mmap_mode="r"),
+            transform=transform,
+            resolution=(transform.a, transform.e),
+            crs=manifest["crs"],
+            width=manifest["width"],
+            height=manifest["height"],
+            impactor=manifest["impactor"],
+        )
+
+    def expected_deaths(self, latitude: float, longtitude: float) -> float:
+        """Estimated deaths of an impact at (latitude, longtitude)."""
+        x, y = to_raster_xy(self, latitude, longtitude)
+        col, row = world_to_pixel(self.transform, x, y)
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise ValueError("Impact point lies outside the risk map.")
+        row, col = pixel_index(self.transform, x, y, self.width, self.height)
+        return float(self.values[row, col])
+
+    def export_geotiff(self, path: str, block_rows: int = 256) -> None:
+        """Write the map as a float32 GeoTIFF, streaming `block_rows` at a time."""
+        profile = {
+            "driver": "GTiff",
+            "height": self.height,
+            "width": self.width,
+            "count": 1,
+            "dtype": "float32",
+            "crs": self.crs,
+            "transform": self.transform,
+            "compress": "deflate",
+            "tiled": True,
+        }
+        with rasterio.open(path, "w", **profile) as dst:
+            for row in range(0, self.height, block_rows):
+                row_stop = min(row + block_rows, self.height)
+                dst.write(
+                    np.asarray(self.values[row:row_stop], dtype=np.float32),
+                    1,
+                    window=rasterio.windows.Window(0, row, self.width, row_stop - row),
+                )
+
+
+def write_casualty_risk_map(
+    grid: PopulationGrid,
+    kernel: np.ndarray,
+    path: str,
+    window: Optional[PixelWindow] = None,
+    impactor: Optional[Dict[str, Any]] = None,
+    tile_size: int = RISK_MAP_TILE_SIZE,
+    workers: int = RISK_MAP_WORKERS,
+) -> CasualtyRiskMap:
+    """
+    Convolve `grid` with `kernel` over `window` (default: the whole grid) into
+    a memory-mapped `.npy` file plus manifest, see convolve_population.
+
+    Returns:
+        CasualtyRiskMap: the written map, opened
+    """
+    if window is None:
+        window = PixelWindow(0, grid.height, 0, grid.width)
+    if window.shape[0] <= 0 or window.shape[1] <= 0:
+        raise ValueError("window is empty.")
+
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float64, shape=window.shape
+    )
+    out[:] = 0.0
+    convolve_population(grid, kernel, window, out, tile_size, workers)
+    # Rounding noise of the FFT can leave tiny negatives next to empty pixels
+    np.maximum(out, 0.0, out=out)
+    out.flush()
+    del out
+
+    transform = grid.transform * Affine.translation(window.col_start, window.row_start)
+    manifest = {
+        "source": getattr(grid, "path", None),
+        "transform": list(transform)[:6],
+        "crs": grid.crs,
+        "width": window.shape[1],
+        "height": window.shape[0],
+        "impactor": impactor or {},
+    }
+    with open(manifest_path(path), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return CasualtyRiskMap.open(path)
@@ -0,0 +1,355 @@
+import logging
+import math
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import connection
+from django.db.models import Count, Max
+
+from .models import Asteroid
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks whether the catalog changed since the index was built
+SEARCH_INDEX_REFRESH_S = float(os.getenv("SEARCH_INDEX_REFRESH_S", 300))
+# Fuzzy matches must share at least this fraction (Jaccard) of their trigrams
+FUZZY_MIN_SIMILARITY = 0.3
+# Only the rarest query trigrams are looked up, common ones ("20", " 19")
+# match most of the catalog and add little
+FUZZY_MAX_TRIGRAMS = 8
+
+_PROVISIONAL_DESIGNATION = re.compile(r"\(([^)]*)\)")
+
+
+def normalize_search_key(text: str) -> str:
+    """Search form of a name, number or designation: case folded, parentheses
+    dropped, whitespace collapsed. "(99942) Apophis" -> "99942 apophis"."""
+    return " ".join(text.replace("(", " ").replace(")", " ").split()).casefold()
+
+
+def search_keys(name: str, designation: str, full_name: str) -> List[str]:
+    """Distinct keys an object is found by: its name, its designation (its
+    number when numbered), its full name and any provisional designation in
+    the full name."""
+    keys = [name, designation, full_name]
+    keys.extend(_PROVISIONAL_DESIGNATION.findall(full_name))
+    return sorted({normalize_search_key(key) for key in keys} - {""})
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    if not a or not b or a[0] != b[0]:
+        return 0
+    length = 1
+    for x, y in zip(a[1:], b[1:]):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def trigrams(key: str) -> List[str]:
+    """Trigrams of a key padded with spaces, so short keys still have some."""
+    padded = f"  {key} "
+    return sorted({padded[i : i + 3] for i in range(len(padded) - 2)})
+
+
+class StringTable(Sequence):
+    """Immutable list of strings stored as one UTF-8 blob plus offsets,
+    about a tenth of the memory of a list of str objects."""
+
+    def __init__(self, strings: Iterable[str]):
+        encoded = [s.encode("utf-8") for s in strings]
+        self.blob = b"".join(encoded)
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter((len(b) for b in encoded), np.int64, len(encoded)),
+            out=self.offsets[1:],
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return self.blob[self.offsets[i] : self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode("utf-8")
+
+
+class _RawKeys(Sequence):
+    """Byte view of a sorted StringTable for bisect; UTF-8 bytes sort in the
+    same order as the code points they encode."""
+
+    def __init__(self, table: StringTable):
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.table.raw(i)
+
+
+@dataclass
+class SearchPage:
+    count: int
+    results: List[Dict[str, Any]]
+    fuzzy: bool
+
+
+class NameSearchIndex:
+    """
+    In-memory name/number/designation search over the asteroid catalog.
+
+    Prefix queries binary-search a sorted table of keys; fuzzy queries rank
+    keys by shared trigrams from posting lists in CSR layout. An object found
+    by several keys of one prefix is listed at the first of them: for every
+    key the index keeps the length of its common prefix with the object's
+    previous key, so later keys of the same object are skipped without
+    looking at the rest of the matching range. Objects are
+    stored column-wise (spkid array, string tables), never as model
+    instances.
+    """
+
+    def __init__(self, objects: Iterable[Tuple[int, str, str, str]]):
+        spkids: List[int] = []
+        names: List[str] = []
+        designations: List[str] = []
+        full_names: List[str] = []
+        keyed: List[Tuple[str, int]] = []
+        for row, (spkid, name, designation, full_name) in enumerate(objects):
+            spkids.append(spkid)
+            names.append(name)
+            designations.append(designation)
+            full_names.append(full_name)
+            keyed.extend(
+                (key, row) for key in search_keys(name, designation, full_name)
+            )
+        keyed.sort(key=lambda item: item[0].encode("utf-8"))
+
+        self.spkids = np.array(spkids, dtype=np.int64)
+        self.names = StringTable(names)
+        self.designations = StringTable(designations)
+        self.full_names = StringTable(full_names)
+        self.keys = StringTable(key for key, _ in keyed)
+        self.key_rows = np.array([row for _, row in keyed], dtype=np.int32)
+        # Keys sort between two keys sharing a prefix, so an object's earlier
+        # key starts with a query iff its nearest earlier one does
+        self.key_shared_prefix = np.zeros(len(keyed), dtype=np.uint16)
+        previous_keys: Dict[int, str] = {}
+        for position, (key, row) in enumerate(keyed):
+            previous = previous_keys.get(row)
+            if previous is not None:
+                self.key_shared_prefix[position] = _common_prefix_length(previous, key)
+            previous_keys[row] = key
+        self.max_keys_per_object = int(
+            np.bincount(self.key_rows).max() if len(keyed) else 1
+        )
+        self._raw_keys = _RawKeys(self.keys)
+        self._build_trigrams([key for key, _ in keyed])
+
+    def _build_trigrams(self, keys: List[str]) -> None:
+        trigram_ids: Dict[str, int] = {}
+        pairs_trigram: List[int] = []
+        pairs_key: List[int] = []
+        key_trigram_counts = np.zeros(len(keys), dtype=np.uint16)
+        for key_index, key in enumerate(keys):
+            grams = trigrams(key)
+            key_trigram_counts[key_index] = len(grams)
+            for gram in grams:
+                pairs_trigram.append(trigram_ids.setdefault(gram, len(trigram_ids)))
+                pairs_key.append(key_index)
+
+        pairs_trigram_array = np.array(pairs_trigram, dtype=np.int32)
+        order = np.argsort(pairs_trigram_array, kind="stable")
+        self.trigram_ids = trigram_ids
+        self.posting_keys = np.array(pairs_key, dtype=np.int32)[order]
+        self.posting_offsets = np.zeros(len(trigram_ids) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(pairs_trigram_array, minlength=len(trigram_ids)),
+            out=self.posting_offsets[1:],
+        )
+        self.key_trigram_counts = key_trigram_counts
+
+    def __len__(self) -> int:
+        return len(self.spkids)
+
+    def _object(self, row: int) -> Dict[str, Any]:
+        return {
+            "spkid": int(self.spkids[row]),
+            "name": self.names[row],
+            "designation": self.designations[row],
+            "full_name": self.full_names[row],
+        }
+
+    def _prefix_range(self, key: str) -> Tuple[int, int]:
+        prefix = key.encode("utf-8")
+        lo = bisect_left(self._raw_keys, prefix)
+        # 0xff never occurs in UTF-8, so it sorts after every continuation
+        hi = bisect_left(self._raw_keys, prefix + b"\xff", lo)
+        return lo, hi
+
+    def prefix(self, query: str, offset: int = 0, limit: int = 20) -> SearchPage:
+        """Objects with a key starting with query, in order of their first
+        such key.
+
+        An object matching through several keys is listed and counted once.
+        """
+        key = normalize_search_key(query)
+        if not key:
+            return SearchPage(0, [], fuzzy=False)
+        lo, hi = self._prefix_range(key)
+        # Keys repeating an object already matched by an earlier key
+        repeats = self.key_shared_prefix[lo:hi] >= len(key)
+
+        # Every object has at most max_keys_per_object keys in the range, so
+        # this many keys hold the first offset + limit objects
+        scan = (offset + limit) * self.max_keys_per_object
+        first = lo + np.flatnonzero(~repeats[:scan])[offset : offset + limit]
+        results = [self._object(row) for row in self.key_rows[first]]
+        return SearchPage(
+            hi - lo - int(np.count_nonzero(repeats)), results, fuzzy=False
+        )
+
+    def fuzzy(self, query: str, offset: int = 0, limit: int = 20) -> SearchPage:
+        """Objects ranked by trigram similarity of their best key to query."""
+        key = normalize_search_key(query)
+        grams = [self.trigram_ids[g] for g in trigrams(key) if g in self.trigram_ids]
+        if not grams:
+            return SearchPage(0, [], fuzzy=True)
+
+        sizes = self.posting_offsets[np.add(grams, 1)] - self.posting_offsets[grams]
+        rarest = np.array(grams)[np.argsort(sizes, kind="stable")][:FUZZY_MAX_TRIGRAMS]
+        candidates, shared = np.unique(
+            np.concatenate(
+                [
+                    self.posting_keys[
+                        self.posting_offsets[g] : self.posting_offsets[g + 1]
+                    ]
+                    for g in rarest
+                ]
+            ),
+            return_counts=True,
+        )
+
+        # Jaccard similarity, with the shared trigrams of the skipped common
+        # ones extrapolated from the looked-up ones
+        query_size = len(trigrams(key))
+        shared = np.minimum(
+            shared * (query_size / len(rarest)), self.key_trigram_counts[candidates]
+        )
+        similarity = shared / (
+            query_size + self.key_trigram_counts[candidates] - shared
+        )
+        good = similarity >= FUZZY_MIN_SIMILARITY
+        candidates, similarity = candidates[good], similarity[good]
+
+        # Best key per object, objects by descending similarity then key order
+        order = np.lexsort((candidates, -similarity))
+        rows = self.key_rows[candidates[order]]
+        _, first = np.unique(rows, return_index=True)
+        rows = rows[np.sort(first)]
+
+        results = [self._object(row) for row in rows[offset : offset + limit]]
+        return SearchPage(len(rows), results, fuzzy=True)
+
+    def search(
+        self, query: str, offset: int = 0, limit: int = 20, fuzzy: Optional[bool] = None
+    ) -> SearchPage:
+        """Prefix search, or fuzzy search when fuzzy=True or (fuzzy=None) when
+        no key starts with the query."""
+        if fuzzy:
+            return self.fuzzy(query, offset, limit)
+        page = self.prefix(query, offset, limit)
+        if fuzzy is None and page.count == 0:
+            return self.fuzzy(query, offset, limit)
+        return page
+
+
+def _catalog_version() -> Tuple[int, Any]:
+    stats = Asteroid.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+    return stats["count"], stats["updated"]
+
+
+def build_search_index() -> NameSearchIndex:
+    """Index every catalog object with an spkid."""
+    objects = (
+        Asteroid.objects.filter(spkid__isnull=False)
+        .order_by("spkid")
+        .values_list("spkid", "name", "designation", "full_name")
+        .iterator(chunk_size=10_000)
+    )
+    return NameSearchIndex(objects)
+
+
+class _SearchIndexHolder:
+    """
+    Serves the last built index and rebuilds it in a background thread when
+    the catalog has changed, checking at most every SEARCH_INDEX_REFRESH_S
+    seconds.
+
+    Requests never wait for a build: until the first one finishes (see
+    refresh_in_background(), started when the WSGI/ASGI app loads) they
+    search an empty index. A new index replaces the old one in a single
+    assignment, so a request sees either the whole old or the whole new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = NameSearchIndex([])
+        self._version: Any = None
+        self._checked_at = -math.inf
+        self._refreshing = False
+
+    def get(self) -> NameSearchIndex:
+        if time.monotonic() - self._checked_at >= SEARCH_INDEX_REFRESH_S:
+            self.refresh_in_background()
+        return self._index
+
+    def refresh(self) -> NameSearchIndex:
+        """Rebuild the index now if the catalog changed since the last build."""
+        version = _catalog_version()
+        if version != self._version:
+            index = build_search_index()
+            self._index, self._version = index, version
+        self._checked_at = time.monotonic()
+        return self._index
+
+    def refresh_in_background(self) -> Optional[threading.Thread]:
+        """Start refresh() in a daemon thread, unless one is running."""
+        with self._lock:
+            if self._refreshing:
+                return None
+            self._refreshing = True
+            # Requests arriving meanwhile must not start more threads
+            self._checked_at = time.monotonic()
+        thread = threading.Thread(
+            target=self._refresh_logged, name="search-index", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _refresh_logged(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("Search index not rebuilt: %s", e)
+        finally:
+            connection.close()
+            with self._lock:
+                self._refreshing = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = NameSearchIndex([])
+            self._version = None
+            self._checked_at = -math.inf
+
+
+search_index = _SearchIndexHolder()
@@ -0,0 +1,724 @@
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .batch_calculations import run_physics_batch
+from .calculations import (
+    caclulate_asteroid_impact_mass,
+    calculate_asteroid_fall_trajecotry_coordinates,
+    calculate_crater_depth_final,
+    calculate_crater_diameter_final,
+    calculate_crater_diameter_transient,
+    calculate_fall_time,
+    calculate_impact_energy,
+    calculate_rings,
+    fall_trajectory_samples,
+    iter_fall_trajectory_chunks,
+    select_fall_trajectory_times,
+)
+from .constants import ENTRY_HEIGHT_M, KPA_FATALITY_RATE, RING_THRESHOLDS_KPA
+from .entry import simulate_entry, simulate_entry_batch
+from .metrics import SIMULATION_CACHE_LOOKUPS
+from .models import Simulation
+from .physics_helpers import calculate_mass, calculate_volume
+from .population import get_annulus_populations, get_disc_populations
+from .timing import count, stage
+from .utils import RowValidationError, compute_simulation_id, raise_for_invalid_rows
+
+# Bump whenever a physics or output change alters results: stored simulations
+# from older versions are recomputed and their ETags change
+SIMULATION_VERSION = "5"
+
+# First meta note of a simulation, by entry.TERMINAL_TYPES
+TERMINAL_NOTES = {
+    "impact": "Impact case (surface crater formed).",
+    "airburst": "Airburst case (no surface crater).",
+    "skip_out": "Skip-out case (the body leaves the atmosphere).",
+    "unresolved": "Entry did not finish within the step limit.",
+}
+
+# Upper bound on scenarios per batch request
+BATCH_MAX_SCENARIOS = int(os.getenv("SIMULATION_BATCH_MAX_SCENARIOS", 1_000))
+# Physics argument names reported by batch validation -> request input names
+BATCH_INPUT_NAMES = {"entry_velocity_m_s": "entry_speed_m_s"}
+
+# Trajectory samples per streamed chunk, and per streamed trajectory
+TRAJECTORY_CHUNK_SAMPLES = int(os.getenv("TRAJECTORY_CHUNK_SAMPLES", 4_096))
+TRAJECTORY_MAX_SAMPLES = int(os.getenv("TRAJECTORY_MAX_SAMPLES", 10_000_000))
+# Trajectory samples of a computed (and stored) simulation result
+SIMULATION_TRAJECTORY_MAX_SAMPLES = int(
+    os.getenv("SIMULATION_TRAJECTORY_MAX_SAMPLES", 100_000)
+)
+# Dense samples adaptive resolutions choose their points from
+TRAJECTORY_ADAPTIVE_CANDIDATES = int(os.getenv("TRAJECTORY_ADAPTIVE_CANDIDATES", 4_096))
+
+
+def simulation_etag(simulation_id: str, representation: str = "json") -> str:
+    """Strong ETag of a simulation result in one representation (renderer
+    format), valid until SIMULATION_VERSION changes."""
+    if representation == "json":
+        return f'"{simulation_id}-v{SIMULATION_VERSION}"'
+    return f'"{simulation_id}-v{SIMULATION_VERSION}-{representation}"'
+
+
+def is_current_version(version: Optional[str]) -> bool:
+    """Whether a version a client sent, e.g. the ?v= of a fetch URL, is the
+    SIMULATION_VERSION results are computed with."""
+    return version == SIMULATION_VERSION
+
+
+def get_or_run_simulation(normalized_params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the stored result for these normalized params, computing and
+    storing it first if this scenario has never been run.
+
+    Params:
+        normalized_params (dict[str, Any]): output of normalize_params()
+
+    Returns:
+        dict[str, Any]: simulation result, "id" is the params hash
+    """
+    simulation_id = compute_simulation_id(normalized_params)
+
+    with stage("storage"):
+        stored_outputs = get_stored_simulation(simulation_id)
+        hit = stored_outputs is not None
+        count("cache_hits" if hit else "cache_misses")
+        SIMULATION_CACHE_LOOKUPS.labels("hit" if hit else "miss").inc()
+    if hit:
+        return stored_outputs
+
+    outputs = run_simulation(simulation_id, normalized_params)
+    # A concurrent request may have stored the same scenario meanwhile, both
+    # results are identical so the last write winning is fine
+    with stage("store"):
+        Simulation.objects.update_or_create(
+            id=simulation_id,
+            defaults={"inputs": normalized_params, "outputs": outputs},
+        )
+    return outputs
+
+
+def get_stored_simulation(simulation_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the stored result of simulation_id, None if it was never run.
+
+    Results computed by an older SIMULATION_VERSION are recomputed from the
+    stored inputs and saved back before being returned.
+    """
+    stored = (
+        Simulation.objects.filter(pk=simulation_id)
+        .values_list("inputs", "outputs")
+        .first()
+    )
+    if stored is None:
+        return None
+
+    inputs, outputs = stored
+    if outputs.get("meta", {}).get("version") != SIMULATION_VERSION:
+        outputs = run_simulation(simulation_id, inputs)
+        Simulation.objects.filter(pk=simulation_id).update(outputs=outputs)
+
+    return outputs
+
+
+def has_stored_simulation(simulation_id: str) -> bool:
+    """Whether simulation_id was ever run, without loading its result."""
+    return Simulation.objects.filter(pk=simulation_id).exists()
+
+
+def run_simulation(
+    simulation_id: str, normalized_params: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Compute every simulation output for one normalized scenario.
+
+    Params:
+        simulation_id (str): hash of normalized_params, echoed back as "id"
+        normalized_params (dict[str, Any]): output of normalize_params()
+
+    Returns:
+        dict[str, Any]: map, panel, trajectory and meta sections; the
+        trajectory is sampled at normalized_params["trajectory_resolution"]
+        (see with_trajectory_resolution), else every second
+
+    Raises:
+        ValueError: the trajectory resolution gives more than
+        SIMULATION_TRAJECTORY_MAX_SAMPLES samples
+    """
+    fall_height_m = ENTRY_HEIGHT_M
+
+    azimuth_angle_deg = normalized_params.get("azimuth_deg", 0)
+    asteroid_entry_angle_deg = normalized_params.get("entry_angle_deg", 0)
+    asteroid_composition = normalized_params.get("material_type", 0)
+    asteroid_density_kg_m3 = normalized_params.get("density_kg_m3", 0)
+    asteroid_diameter_m = normalized_params.get("diameter_m", 0)
+    lat = normalized_params["aim_point"].get("lat", 0)
+    lon = normalized_params["aim_point"].get("lon", 0)
+    entry_velocity_m_s = normalized_params.get("entry_speed_m_s", 0)
+
+    with stage("energy"):
+        fall_time_s = calculate_fall_time(fall_height_m, entry_velocity_m_s)
+
+        asteroid_volume_m3 = calculate_volume(asteroid_diameter_m)
+
+        asteroid_mass_kg = calculate_mass(asteroid_volume_m3, asteroid_density_kg_m3)
+
+        asteroid_mass_on_impact_kg = caclulate_asteroid_impact_mass(
+            asteroid_mass_kg, entry_velocity_m_s, fall_time_s, asteroid_density_kg_m3
+        )
+
+        impact_energy_Mt_tnt = calculate_impact_energy(
+            asteroid_mass_on_impact_kg, entry_velocity_m_s
+        )
+
+    with stage("crater"):
+        crater_diameter_trans_m = calculate_crater_diameter_transient(
+            impact_energy_Mt_tnt, asteroid_composition
+        )
+        crater_diameter_m = calculate_crater_diameter_final(crater_diameter_trans_m)
+        crater_depth_m = calculate_crater_depth_final(crater_diameter_m)
+
+    with stage("rings"):
+        rings = calculate_rings(
+            impact_energy_Mt_tnt, asteroid_diameter_m, asteroid_composition
+        )
+
+    with stage("entry"):
+        entry = simulate_entry(
+            asteroid_diameter_m,
+            asteroid_density_kg_m3,
+            entry_velocity_m_s,
+            asteroid_entry_angle_deg,
+            fall_height_m,
+        )
+    crater_formed = entry["terminal_type"] == "impact"
+
+    kpa_70_radius_m = rings.get("kpa_70", 0)
+    kpa_50_radius_m = rings.get("kpa_50", 0)
+    kpa_35_radius_m = rings.get("kpa_35", 0)
+    kpa_20_radius_m = rings.get("kpa_20", 0)
+    kpa_10_radius_m = rings.get("kpa_10", 0)
+    kpa_3_radius_m = rings.get("kpa_3", 0)
+
+    # Rings are nested discs; clamp so a crater wider than the 70 kPa ring
+    # yields an empty annulus instead of a negative population
+    ring_radii_m = np.maximum.accumulate(
+        [
+            crater_diameter_m / 2,
+            kpa_70_radius_m,
+            kpa_50_radius_m,
+            kpa_35_radius_m,
+            kpa_20_radius_m,
+            kpa_10_radius_m,
+            kpa_3_radius_m,
+        ]
+    )
+    with stage("population"):
+        (
+            crater_population,
+            kpa_70_population,
+            kpa_50_population,
+            kpa_35_population,
+            kpa_20_population,
+            kpa_10_population,
+            kpa_3_population,
+        ) = get_annulus_populations(lat, lon, ring_radii_m).tolist()
+
+    crater_casulties = crater_population
+    kpa_70_casulties = kpa_70_population * KPA_FATALITY_RATE.get("kpa_70", 0)
+    kpa_50_casulties = kpa_50_population * KPA_FATALITY_RATE.get("kpa_50", 0)
+    kpa_35_casulties = kpa_35_population * KPA_FATALITY_RATE.get("kpa_35", 0)
+    kpa_20_casulties = kpa_20_population * KPA_FATALITY_RATE.get("kpa_20", 0)
+    kpa_10_casulties = kpa_10_population * KPA_FATALITY_RATE.get("kpa_10", 0)
+    kpa_3_casulties = kpa_3_population * KPA_FATALITY_RATE.get("kpa_3", 0)
+
+    with stage("trajectory"):
+        resolution = normalized_params.get("trajectory_resolution")
+        if resolution is None:
+            asteroid_fall_coordinates = calculate_asteroid_fall_trajecotry_coordinates(
+                lat,
+                lon,
+                azimuth_angle_deg,
+                asteroid_entry_angle_deg,
+                entry_velocity_m_s,
+                fall_time_s,
+            )
+        else:
+            path = (
+                lat,
+                lon,
+                azimuth_angle_deg,
+                asteroid_entry_angle_deg,
+                entry_velocity_m_s,
+            )
+            step_s, times_s, samples = _trajectory_times(
+                path, fall_time_s, resolution, SIMULATION_TRAJECTORY_MAX_SAMPLES
+            )
+            if times_s is None:
+                times_s = np.arange(samples, dtype=float) * step_s
+            asteroid_fall_coordinates = (
+                fall_trajectory_samples(*path, fall_time_s, times_s).ravel().tolist()
+            )
+
+    total_casulties = (
+        crater_casulties
+        + kpa_70_casulties
+        + kpa_50_casulties
+        + kpa_35_casulties
+        + kpa_20_casulties
+        + kpa_10_casulties
+        + kpa_3_casulties
+    )
+
+    return_data = {
+        "id": simulation_id,
+        "map": {
+            "center": {"lat": lat, "lon": lon},
+            "crater_transient_diameter_m": crater_diameter_trans_m,
+            "crater_final_diameter_m": crater_diameter_m,
+            "rings": [
+                {"threshold_kpa": 70, "radius_m": kpa_70_radius_m},
+                {"threshold_kpa": 50, "radius_m": kpa_50_radius_m},
+                {"threshold_kpa": 35, "radius_m": kpa_35_radius_m},
+                {"threshold_kpa": 20, "radius_m": kpa_20_radius_m},
+                {"threshold_kpa": 10, "radius_m": kpa_10_radius_m},
+                {"threshold_kpa": 3, "radius_m": kpa_3_radius_m},
+            ],
+        },
+        "panel": {
+            "energy_released_megatons": impact_energy_Mt_tnt,
+            "crater_final": {
+                "formed": crater_formed,
+                "diameter_m": crater_diameter_m,
+                "depth_m": crater_depth_m,
+            },
+            "rings": [
+                {
+                    "threshold_kpa": 70,
+                    "radius_m": kpa_70_radius_m,
+                    "arrival_time_s": 5.9,
+                    "delta_to_next_s": 2.4,
+                    "population": kpa_70_population,
+                    "estimated_deaths": kpa_70_casulties,
+                    "blurb": "Severe structural damage (reinforced buildings fail).",
+                },
+                {
+                    "threshold_kpa": 50,
+                    "radius_m": kpa_50_radius_m,
+                    "arrival_time_s": 8.3,
+                    "delta_to_next_s": 2.7,
+                    "population": kpa_50_population,
+                    "estimated_deaths": kpa_50_casulties,
+                    "blurb": "Heavy damage; most buildings uninhabitable.",
+                },
+                {
+                    "threshold_kpa": 35,
+                    "radius_m": kpa_35_radius_m,
+                    "arrival_time_s": 11.0,
+                    "delta_to_next_s": 6.0,
+                    "population": kpa_35_population,
+                    "estimated_deaths": kpa_35_casulties,
+                    "blurb": "Moderate damage; walls collapse, serious injuries.",
+                },
+                {
+                    "threshold_kpa": 20,
+                    "radius_m": kpa_20_radius_m,
+                    "arrival_time_s": 17.0,
+                    "delta_to_next_s": 9.0,
+                    "population": kpa_20_population,
+                    "estimated_deaths": kpa_20_casulties,
+                    "blurb": "Light damage; roofs/doors blown in.",
+                },
+                {
+                    "threshold_kpa": 10,
+                    "radius_m": kpa_10_radius_m,
+                    "arrival_time_s": 26.0,
+                    "delta_to_next_s": 28.0,
+                    "population": kpa_10_population,
+                    "estimated_deaths": kpa_10_casulties,
+                    "blurb": "Minor damage; most windows shatter.",
+                },
+                {
+                    "threshold_kpa": 3,
+                    "radius_m": kpa_3_radius_m,
+                    "arrival_time_s": 54.0,
+                    "delta_to_next_s": None,
+                    "population": kpa_3_population,
+                    "estimated_deaths": kpa_3_casulties,
+                    "blurb": "Pressure wave felt; light glass damage.",
+                },
+            ],
+            "entry": {
+                "h1_breakup_begin_m": entry["breakup_altitude_m"],
+                "h2_peak_energy_m": entry["peak_energy_altitude_m"],
+                "h3_airburst_or_surface_m": entry["terminal_altitude_m"],
+                "terminal_type": entry["terminal_type"],
+                "impact_velocity_m_s": entry["impact_velocity_m_s"],
+                "impact_mass_kg": entry["impact_mass_kg"],
+                "deposited_energy_megatons": entry["deposited_energy_mt"],
+            },
+            "totals": {"total_estimated_deaths": total_casulties},
+        },
+        "asteroid_fall_coordinates": [
+            asteroid_fall_coordinates,
+        ],
+        "meta": {
+            "units": "SI; lat/lon degrees WGS-84",
+            "notes": [
+                TERMINAL_NOTES[entry["terminal_type"]],
+                "Crater and blast rings do not yet account for the entry outcome.",
+                "Arrival times measured from impact time.",
+                "Population and deaths are per annulus between rings.",
+            ],
+            "version": SIMULATION_VERSION,
+        },
+    }
+
+    return return_data
+
+
+def _numeric_column(rows: List[Dict[str, Any]], key: str) -> np.ndarray:
+    """Column of rows[i][key] as float64, NaN where missing or not a number."""
+    return np.array(
+        [
+            (
+                float(row[key])
+                if isinstance(row.get(key), (int, float))
+                and not isinstance(row.get(key), bool)
+                else np.nan
+            )
+            for row in rows
+        ]
+    )
+
+
+def _column_values(column: np.ndarray) -> List[Any]:
+    """Column as a JSON-ready list, NaN as None."""
+    if column.dtype.kind != "f" or not np.isnan(column).any():
+        return column.tolist()
+    return [None if np.isnan(value) else value for value in column.tolist()]
+
+
+def run_simulation_batch(
+    normalized_params_list: List[Dict[str, Any]], include_ids: bool = False
+) -> Dict[str, Any]:
+    """
+    Compute the panel outputs of many scenarios at once as columns.
+
+    Identical scenarios are computed once, the physics runs vectorized
+    (see batch_calculations.run_physics_batch) and every distinct impact
+    location reads its population discs in one query for all of its
+    scenarios. Values match run_simulation up to floating-point rounding of
+    the population sums. Trajectories are not computed and nothing is stored.
+
+    Params:
+        normalized_params_list (list[dict[str, Any]]): outputs of normalize_params()
+        include_ids (bool): also return the params hash of every scenario
+
+    Returns:
+        dict[str, Any]: "count", "columns" (name -> one value per scenario, in
+        request order), "meta" and, with include_ids, "ids"
+
+    Raises:
+        RowValidationError: listing every invalid scenario index per field
+    """
+    simulation_ids = [
+        compute_simulation_id(params) for params in normalized_params_list
+    ]
+
+    # unique_index[i] is the row of scenario i among the distinct scenarios
+    unique_rows: Dict[str, int] = {}
+    unique_params: List[Dict[str, Any]] = []
+    unique_index = np.empty(len(simulation_ids), dtype=np.intp)
+    for i, simulation_id in enumerate(simulation_ids):
+        if simulation_id not in unique_rows:
+            unique_rows[simulation_id] = len(unique_params)
+            unique_params.append(normalized_params_list[i])
+        unique_index[i] = unique_rows[simulation_id]
+
+    aim_points = [params["aim_point"] for params in unique_params]
+    lat = _numeric_column(aim_points, "lat")
+    lon = _numeric_column(aim_points, "lon")
+    diameter_m = _numeric_column(unique_params, "diameter_m")
+    density_kg_m3 = _numeric_column(unique_params, "density_kg_m3")
+    entry_velocity_m_s = _numeric_column(unique_params, "entry_speed_m_s")
+    entry_angle_deg = _numeric_column(unique_params, "entry_angle_deg")
+
+    try:
+        raise_for_invalid_rows(
+            {
+                "aim_point.lat": ~(np.abs(lat) <= 90),
+                "aim_point.lon": ~(np.abs(lon) <= 180),
+                "entry_angle_deg": ~((entry_angle_deg > 0) & (entry_angle_deg <= 90)),
+            }
+        )
+        with stage("energy"):
+            physics = run_physics_batch(
+                diameter_m,
+                density_kg_m3,
+                entry_velocity_m_s,
+                np.array(
+                    [str(params.get("material_type")) for params in unique_params]
+                ),
+                fall_height_m=ENTRY_HEIGHT_M,
+            )
+        with stage("entry"):
+            entry = simulate_entry_batch(
+                diameter_m,
+                density_kg_m3,
+                entry_velocity_m_s,
+                entry_angle_deg,
+                ENTRY_HEIGHT_M,
+            )
+    except RowValidationError as e:
+        # Report positions in the request, not among the distinct scenarios,
+        # under the input names of the request
+        raise RowValidationError(
+            {
+                BATCH_INPUT_NAMES.get(name, name): np.flatnonzero(
+                    np.isin(unique_index, rows)
+                ).tolist()
+                for name, rows in e.rows.items()
+            }
+        )
+
+    ring_names = [f"kpa_{kpa}" for kpa in RING_THRESHOLDS_KPA]
+    # Rings are nested discs, see run_simulation
+    ring_radii_m = np.maximum.accumulate(
+        np.column_stack(
+            [physics["crater_final_diameter_m"] / 2]
+            + [physics[name] for name in ring_names]
+        ),
+        axis=1,
+    )
+
+    # One population query per distinct location for all of its discs
+    locations: Dict[Any, List[int]] = {}
+    for row, location in enumerate(zip(lat.tolist(), lon.tolist())):
+        locations.setdefault(location, []).append(row)
+
+    disc_populations = np.empty_like(ring_radii_m)
+    with stage("population"):
+        for (location_lat, location_lon), rows in locations.items():
+            radii, radius_index = np.unique(ring_radii_m[rows], return_inverse=True)
+            discs = get_disc_populations(location_lat, location_lon, radii)
+            disc_populations[rows] = discs[radius_index].reshape(len(rows), -1)
+    populations = np.diff(disc_populations, axis=1, prepend=0.0)
+
+    columns: Dict[str, np.ndarray] = {
+        "energy_released_megatons": physics["energy_mt"],
+        "crater_transient_diameter_m": physics["crater_transient_diameter_m"],
+        "crater_final_diameter_m": physics["crater_final_diameter_m"],
+        "crater_depth_m": physics["crater_depth_m"],
+    }
+    for name in ring_names:
+        columns[f"{name}_radius_m"] = physics[name]
+    columns["crater_population"] = populations[:, 0]
+    columns["crater_estimated_deaths"] = populations[:, 0]
+    total_deaths = populations[:, 0]
+    for i, name in enumerate(ring_names, start=1):
+        deaths = populations[:, i] * KPA_FATALITY_RATE.get(name, 0)
+        columns[f"{name}_population"] = populations[:, i]
+        columns[f"{name}_estimated_deaths"] = deaths
+        total_deaths = total_deaths + deaths
+    columns["total_estimated_deaths"] = total_deaths
+    for name, column in entry.items():
+        if name == "deposited_energy_mt":
+            name = "deposited_energy_megatons"
+        columns[f"entry_{name}"] = column
+
+    return_data: Dict[str, Any] = {
+        "count": len(simulation_ids),
+        "columns": {
+            name: _column_values(column[unique_index])
+            for name, column in columns.items()
+        },
+        "meta": {
+            "units": "SI; lat/lon degrees WGS-84",
+            "notes": [
+                "Population and deaths are per annulus between rings.",
+                "Entry values are null where they do not apply, e.g. the "
+                "breakup altitude of a body that stays intact.",
+            ],
+            "unique_scenarios": len(unique_params),
+            "version": SIMULATION_VERSION,
+        },
+    }
+    if include_ids:
+        return_data["ids"] = simulation_ids
+    return return_data
+
+
+def _number(name: str, value: Any) -> float:
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, (int, float))
+        or not np.isfinite(value)
+        or value <= 0
+    ):
+        raise ValueError(f"{name} must be a finite number > 0.")
+    return value
+
+
+def parse_trajectory_resolution(resolution: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Validate a trajectory resolution: {"step_s": s} for a fixed step, or
+    {"max_points": n} and/or {"tolerance_m": m} for adaptive sampling
+    (see calculations.select_fall_trajectory_times). Default 1 s steps.
+
+    Raises:
+        ValueError: unknown keys, step_s mixed with adaptive keys, bad values
+    """
+    if resolution is None:
+        return {"step_s": 1.0}
+    if not isinstance(resolution, dict) or not resolution:
+        raise ValueError(
+            "resolution must be an object with step_s, or max_points and/or "
+            "tolerance_m."
+        )
+    unknown = set(resolution) - {"step_s", "max_points", "tolerance_m"}
+    if unknown:
+        raise ValueError(f"Unknown resolution keys: {sorted(unknown)}.")
+    if "step_s" in resolution and len(resolution) > 1:
+        raise ValueError("step_s cannot be combined with max_points or tolerance_m.")
+
+    parsed = {key: _number(key, value) for key, value in resolution.items()}
+    if "max_points" in parsed and (
+        not isinstance(parsed["max_points"], int) or parsed["max_points"] < 2
+    ):
+        raise ValueError("max_points must be an integer >= 2.")
+    # 2 and 2.0 are the same resolution, and must hash the same
+    return {
+        key: value if key == "max_points" else float(value)
+        for key, value in parsed.items()
+    }
+
+
+def with_trajectory_resolution(
+    normalized_params: Dict[str, Any], resolution: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    normalized_params with a trajectory resolution other than the default
+    1 s steps added as "trajectory_resolution", so it is part of the
+    simulation id and of the stored inputs.
+
+    Raises:
+        ValueError: see parse_trajectory_resolution()
+    """
+    resolution = parse_trajectory_resolution(resolution)
+    if resolution == parse_trajectory_resolution(None):
+        return normalized_params
+    return {**normalized_params, "trajectory_resolution": resolution}
+
+
+def _trajectory_path(normalized_params: Dict[str, Any]) -> Tuple[float, ...]:
+    """
+    (lat, lon, azimuth, entry angle, entry speed) of a scenario, checked
+    against the same ranges as run_simulation_batch.
+
+    Raises:
+        ValueError: a value is missing, not a finite number or out of range
+    """
+    aim_point = normalized_params["aim_point"]
+    values = {
+        "aim_point.lat": aim_point.get("lat"),
+        "aim_point.lon": aim_point.get("lon"),
+        "azimuth_deg": normalized_params.get("azimuth_deg"),
+        "entry_angle_deg": normalized_params.get("entry_angle_deg"),
+        "entry_speed_m_s": normalized_params.get("entry_speed_m_s"),
+    }
+    for name, value in values.items():
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or not np.isfinite(value)
+        ):
+            raise ValueError(f"{name} must be a finite number.")
+
+    lat, lon, azimuth_deg, entry_angle_deg, entry_speed_m_s = values.values()
+    if abs(lat) > 90:
+        raise ValueError("aim_point.lat must be between -90 and 90.")
+    if abs(lon) > 180:
+        raise ValueError("aim_point.lon must be between -180 and 180.")
+    if not 0 < entry_angle_deg <= 90:
+        raise ValueError("entry_angle_deg must be > 0 and <= 90.")
+    if entry_speed_m_s <= 0:
+        raise ValueError("entry_speed_m_s must be > 0.")
+    return lat, lon, azimuth_deg, entry_angle_deg, entry_speed_m_s
+
+
+def _trajectory_times(
+    path: Tuple[float, ...],
+    fall_time_s: float,
+    resolution: Dict[str, Any],
+    max_samples: int,
+) -> Tuple[float, Optional[np.ndarray], int]:
+    """
+    (step_s, times_s, samples) of a parsed resolution: a fixed step_s with
+    times_s None, or the adaptively selected times_s.
+
+    Raises:
+        ValueError: a fixed step gives more than max_samples samples
+    """
+    if "step_s" in resolution:
+        step_s = resolution["step_s"]
+        samples = int(np.ceil((fall_time_s + step_s) / step_s))
+        if samples > max_samples:
+            raise ValueError(
+                f"step_s={step_s} gives {samples} samples, more than the "
+                f"{max_samples} allowed."
+            )
+        return step_s, None, samples
+
+    times_s = select_fall_trajectory_times(
+        *path,
+        fall_time_s,
+        tolerance_m=resolution.get("tolerance_m"),
+        max_points=resolution.get("max_points"),
+        candidates=TRAJECTORY_ADAPTIVE_CANDIDATES,
+    )
+    return 1.0, times_s, len(times_s)
+
+
+def stream_trajectory(
+    normalized_params: Dict[str, Any],
+    resolution: Optional[Dict[str, Any]] = None,
+    chunk_samples: Optional[int] = None,
+) -> Tuple[Dict[str, Any], Iterator[np.ndarray]]:
+    """
+    The fall trajectory of one scenario as a lazily computed chunk stream.
+
+    Inputs are validated before returning, so errors surface before the
+    first chunk is sent. The samples are those of run_simulation's
+    "asteroid_fall_coordinates" at the same resolution.
+
+    Params:
+        normalized_params (dict[str, Any]): output of normalize_params()
+        resolution (dict[str, Any] | None): see parse_trajectory_resolution()
+        chunk_samples (int): samples per chunk, default TRAJECTORY_CHUNK_SAMPLES
+
+    Returns:
+        tuple: header {"fall_time_s", "samples", "resolution"} and an
+        iterator of (n, 4) [t, lon, lat, h] arrays
+
+    Raises:
+        ValueError: invalid inputs, or more than TRAJECTORY_MAX_SAMPLES samples
+    """
+    resolution = parse_trajectory_resolution(resolution)
+    path = _trajectory_path(normalized_params)
+    fall_time_s = calculate_fall_time(ENTRY_HEIGHT_M, path[-1])
+
+    step_s, times_s, samples = _trajectory_times(
+        path, fall_time_s, resolution, TRAJECTORY_MAX_SAMPLES
+    )
+    chunks = iter_fall_trajectory_chunks(
+        *path,
+        fall_time_s,
+        step_s=step_s,
+        chunk_samples=chunk_samples or TRAJECTORY_CHUNK_SAMPLES,
+        times_s=times_s,
+    )
+    header = {"fall_time_s": fall_time_s, "samples": samples, "resolution": resolution}
+    return header, chunks
@@ -0,0 +1,322 @@
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+# GHSL population grids (GHS_POP, ESRI:54009): World Mollweide on WGS84,
+# nodata -200, the whole ellipse covered from this upper-left corner
+GHSL_CRS = "ESRI:54009"
+GHSL_NODATA = -200.0
+GHSL_ORIGIN_M = (-18_041_000.0, 9_000_000.0)
+GHSL_EXTENT_M = (36_082_000.0, 18_000_000.0)
+# Mollweide radius of ESRI:54009; x spans +-2 sqrt(2) R, y +-sqrt(2) R
+MOLLWEIDE_RADIUS_M = 6_378_137.0
+
+PATTERNS = ("uniform", "cities", "ocean")
+COMPRESSIONS = ("none", "lzw", "deflate", "zstd")
+DTYPES = ("float32", "float64")
+# GeoTIFF tag holding the SyntheticPopulation a file was generated from
+SYNTHETIC_POPULATION_TAG = "SYNTHETIC_POPULATION"
+
+# Cities are only evaluated within this many sigmas, farther pixels would
+# hold less than 1e-15 of their population
+_CITY_CUTOFF_SIGMAS = 8.0
+
+
+@dataclass(frozen=True)
+class City:
+    """Gaussian population cluster: `population` people spread with
+    standard deviation `sigma_m` around (x_m, y_m)."""
+
+    x_m: float
+    y_m: float
+    population: float
+    sigma_m: float
+
+
+@dataclass(frozen=True)
+class SyntheticPopulation:
+    """
+    Population density with exactly known integrals: a uniform density plus
+    Gaussian cities, or nothing at all (ocean, every pixel nodata).
+
+    Pixel values are exact integrals of the density over the pixel, so the
+    raster sum over a pixel-aligned rectangle inside the Mollweide ellipse
+    equals population_in_rect(). Pixels whose centre is outside the ellipse
+    are nodata, as in GHSL, and the integrals do not leave them out: compare
+    them with rasters only on windows (and discs) inside the ellipse.
+    """
+
+    density_per_km2: float = 0.0
+    cities: Tuple[City, ...] = field(default_factory=tuple)
+    ocean: bool = False
+
+    def population_in_rect(
+        self, x_min_m: float, x_max_m: float, y_min_m: float, y_max_m: float
+    ) -> float:
+        """People inside a rectangle of projected coordinates, ignoring the
+        Mollweide ellipse."""
+        if self.ocean:
+            return 0.0
+        area_km2 = (x_max_m - x_min_m) * (y_max_m - y_min_m) / 1e6
+        total = self.density_per_km2 * area_km2
+        for city in self.cities:
+            total += (
+                city.population
+                * _gaussian_mass(x_min_m, x_max_m, city.x_m, city.sigma_m)
+                * _gaussian_mass(y_min_m, y_max_m, city.y_m, city.sigma_m)
+            )
+        return total
+
+    def population_in_disc(self, x_m: float, y_m: float, radius_m: float) -> float:
+        """People inside a disc of projected coordinates, ignoring the
+        Mollweide ellipse."""
+        if self.ocean:
+            return 0.0
+        total = self.density_per_km2 * math.pi * radius_m**2 / 1e6
+        for city in self.cities:
+            offset_m = math.hypot(city.x_m - x_m, city.y_m - y_m)
+            total += city.population * _gaussian_disc_mass(
+                offset_m, radius_m, city.sigma_m
+            )
+        return total
+
+    def pixel_values(
+        self, transform: Any, row_start: int, row_stop: int, width: int
+    ) -> np.ndarray:
+        """Population of rows [row_start, row_stop) of a raster, nodata
+        outside the Mollweide ellipse (and everywhere for ocean)."""
+        rows = row_stop - row_start
+        if self.ocean:
+            return np.full((rows, width), GHSL_NODATA)
+
+        x_edges = transform.c + transform.a * np.arange(width + 1)
+        y_edges = transform.f + transform.e * np.arange(row_start, row_stop + 1)
+        pixel_area_km2 = abs(transform.a * transform.e) / 1e6
+        values = np.full((rows, width), self.density_per_km2 * pixel_area_km2)
+
+        for city in self.cities:
+            reach_m = _CITY_CUTOFF_SIGMAS * city.sigma_m
+            cols = np.flatnonzero(
+                (x_edges[1:] > city.x_m - reach_m) & (x_edges[:-1] < city.x_m + reach_m)
+            )
+            rows_in = np.flatnonzero(
+                (np.minimum(y_edges[:-1], y_edges[1:]) < city.y_m + reach_m)
+                & (np.maximum(y_edges[:-1], y_edges[1:]) > city.y_m - reach_m)
+            )
+            if not len(cols) or not len(rows_in):
+                continue
+            fx = _gaussian_bins(x_edges[cols[0] : cols[-1] + 2], city.x_m, city.sigma_m)
+            fy = _gaussian_bins(
+                y_edges[rows_in[0] : rows_in[-1] + 2], city.y_m, city.sigma_m
+            )
+            values[
+                rows_in[0] : rows_in[-1] + 1, cols[0] : cols[-1] + 1
+            ] += city.population * np.outer(fy, fx)
+
+        x_centres = (x_edges[:-1] + x_edges[1:]) / 2
+        y_centres = (y_edges[:-1] + y_edges[1:]) / 2
+        outside = (
+            x_centres[np.newaxis, :] / (2 * math.sqrt(2) * MOLLWEIDE_RADIUS_M)
+        ) ** 2 + (
+            y_centres[:, np.newaxis] / (math.sqrt(2) * MOLLWEIDE_RADIUS_M)
+        ) ** 2 > 1
+        values[outside] = GHSL_NODATA
+        return values
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text: str) -> "SyntheticPopulation":
+        spec = json.loads(text)
+        return cls(
+            density_per_km2=spec["density_per_km2"],
+            cities=tuple(City(**city) for city in spec["cities"]),
+            ocean=spec["ocean"],
+        )
+
+
+def _erf(values: np.ndarray) -> np.ndarray:
+    return np.array([math.erf(value) for value in np.ravel(values)]).reshape(
+        np.shape(values)
+    )
+
+
+def _gaussian_bins(edges_m: np.ndarray, centre_m: float, sigma_m: float) -> np.ndarray:
+    """Share of a 1-D Gaussian between consecutive edges (either order)."""
+    cdf = 0.5 * _erf((edges_m - centre_m) / (math.sqrt(2) * sigma_m))
+    return np.abs(np.diff(cdf))
+
+
+def _gaussian_mass(
+    low_m: float, high_m: float, centre_m: float, sigma_m: float
+) -> float:
+    return float(_gaussian_bins(np.array([low_m, high_m]), centre_m, sigma_m)[0])
+
+
+def _scaled_i0(z: np.ndarray) -> np.ndarray:
+    """I0(z) * exp(-z) without overflow."""
+    z = np.asarray(z, dtype=np.float64)
+    small = z < 500
+    scaled = np.empty_like(z)
+    scaled[small] = np.i0(z[small]) * np.exp(-z[small])
+    large = z[~small]
+    scaled[~small] = (1 + 1 / (8 * large)) / np.sqrt(2 * math.pi * large)
+    return scaled
+
+
+def _gaussian_disc_mass(offset_m: float, radius_m: float, sigma_m: float) -> float:
+    """
+    Share of an isotropic 2-D Gaussian inside a disc whose centre is
+    offset_m from the Gaussian's, 1 - Q1(offset / sigma, radius / sigma) in
+    terms of the Marcum Q-function. Concentric discs are closed form, others
+    integrate the Rice density over the radius by Gauss-Legendre quadrature.
+    """
+    if offset_m == 0:
+        return -math.expm1(-(radius_m**2) / (2 * sigma_m**2))
+
+    # The Rice density is negligible farther than the cutoff from the offset
+    low_m = max(0.0, offset_m - _CITY_CUTOFF_SIGMAS * sigma_m)
+    high_m = min(radius_m, offset_m + _CITY_CUTOFF_SIGMAS * sigma_m)
+    if high_m <= low_m:
+        return 0.0
+
+    nodes, weights = np.polynomial.legendre.leggauss(256)
+    rho = low_m + (nodes + 1) * (high_m - low_m) / 2
+    density = (
+        rho
+        / sigma_m**2
+        * np.exp(-((rho - offset_m) ** 2) / (2 * sigma_m**2))
+        * _scaled_i0(rho * offset_m / sigma_m**2)
+    )
+    mass = float(np.sum(weights * density) * (high_m - low_m) / 2)
+    return min(mass, 1.0)
+
+
+def random_cities(
+    seed: int,
+    count: int,
+    bounds_m: Tuple[float, float, float, float],
+    population: float = 1e6,
+    sigma_m: float = 5_000.0,
+) -> Tuple[City, ...]:
+    """
+    Deterministic cities inside (x_min, x_max, y_min, y_max), kept
+    far enough from the edges that the raster holds all of their people.
+    Populations are log-normal around `population`, sizes scale with their
+    square root around `sigma_m`.
+    """
+    rng = np.random.default_rng(seed)
+    x_min, x_max, y_min, y_max = bounds_m
+    margin_m = 2 * _CITY_CUTOFF_SIGMAS * sigma_m
+    if x_max - x_min <= 2 * margin_m or y_max - y_min <= 2 * margin_m:
+        raise ValueError("The raster is too small for cities of this size.")
+
+    populations = population * rng.lognormal(0.0, 1.0, count)
+    sigmas = np.clip(
+        sigma_m * np.sqrt(populations / population), sigma_m / 2, 2 * sigma_m
+    )
+    xs = rng.uniform(x_min + margin_m, x_max - margin_m, count)
+    ys = rng.uniform(y_min + margin_m, y_max - margin_m, count)
+    return tuple(
+        City(float(x), float(y), float(p), float(s))
+        for x, y, p, s in zip(xs, ys, populations, sigmas)
+    )
+
+
+def write_synthetic_population(
+    path: str,
+    population: SyntheticPopulation,
+    width: int,
+    height: int,
+    resolution_m: float = 1_000.0,
+    origin_m: Optional[Tuple[float, float]] = None,
+    tile_size: int = 256,
+    compress: str = "lzw",
+    dtype: str = "float32",
+) -> Dict[str, Any]:
+    """
+    Write `population` as a single-band GeoTIFF laid out like the GHSL
+    population grids (ESRI:54009, nodata -200, tiled).
+
+    Rows are generated and written one tile row at a time, so memory stays
+    at width * tile_size pixels even for full-globe rasters. The population
+    spec is stored in the SYNTHETIC_POPULATION tag, see
+    read_synthetic_population().
+
+    Params:
+        path (str): output .tif path
+        population (SyntheticPopulation): the pattern to rasterize
+        width (int): columns
+        height (int): rows
+        resolution_m (float): pixel size in meters (m)
+        origin_m (tuple | None): upper-left corner (x, y) in meters, centred on
+            (0, 0) when None
+        tile_size (int): tile edge in pixels (multiple of 16), 0 for strips
+        compress (str): one of COMPRESSIONS
+        dtype (str): one of DTYPES
+
+    Returns:
+        dict[str, Any]: the rasterio profile written
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError("width and height must be positive.")
+    if not math.isfinite(resolution_m) or resolution_m <= 0:
+        raise ValueError("resolution_m must be finite and > 0.")
+    if tile_size < 0 or tile_size % 16:
+        raise ValueError("tile_size must be a multiple of 16, or 0 for strips.")
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"compress must be one of: {', '.join(COMPRESSIONS)}.")
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of: {', '.join(DTYPES)}.")
+
+    if origin_m is None:
+        origin_m = (-width * resolution_m / 2, height * resolution_m / 2)
+    transform = from_origin(origin_m[0], origin_m[1], resolution_m, resolution_m)
+
+    profile: Dict[str, Any] = {
+        "driver": "GTiff",
+        "width": width,
+        "height": height,
+        "count": 1,
+        "dtype": dtype,
+        "crs": GHSL_CRS,
+        "transform": transform,
+        "nodata": GHSL_NODATA,
+        "BIGTIFF": "IF_SAFER",
+    }
+    if compress != "none":
+        profile["compress"] = compress
+    if tile_size:
+        profile.update(tiled=True, blockxsize=tile_size, blockysize=tile_size)
+
+    block_rows = tile_size or 256
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.update_tags(
+            AREA_OR_POINT="Area",
+            **{SYNTHETIC_POPULATION_TAG: population.to_json()},
+        )
+        for row_start in range(0, height, block_rows):
+            row_stop = min(row_start + block_rows, height)
+            values = population.pixel_values(transform, row_start, row_stop, width)
+            dst.write(
+                values.astype(dtype),
+                1,
+                window=Window(0, row_start, width, row_stop - row_start),
+            )
+    return profile
+
+
+def read_synthetic_population(path: str) -> SyntheticPopulation:
+    """The SyntheticPopulation a write_synthetic_population() file holds."""
+    with rasterio.open(path) as src:
+        tag = src.tags().get(SYNTHETIC_POPULATION_TAG)
+    if tag is None:
+        raise ValueError(f"{path} was not written by write_synthetic_population.")
+    return SyntheticPopulation.from_json(tag)
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+import pytest
+import rasterio
+from django.conf import settings
+from rasterio.transform import from_origin
+
+# DJANGO_SECRET_KEY is only provided through .env
+if not os.environ.get("DJANGO_SECRET_KEY"):
+    settings.SECRET_KEY = "test-secret-key"
+
+
+@pytest.fixture
+def write_raster():
+    """Return a helper writing a single-band float32 GeoTIFF in ESRI:54009."""
+
+    def _write(path, values, resolution=250.0, origin=(-1000.0, 1000.0), nodata=None):
+        transform = from_origin(origin[0], origin[1], resolution, resolution)
+        with rasterio.open(
+            path,
+            "w",
+            driver="GTiff",
+            height=values.shape[0],
+            width=values.shape[1],
+            count=1,
+            dtype="float32",
+            crs="ESRI:54009",
+            transform=transform,
+            nodata=nodata,
+        ) as dst:
+            dst.write(np.asarray(values, dtype="float32"), 1)
+        return path
+
+    return _write
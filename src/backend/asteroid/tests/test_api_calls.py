@@ -0,0 +1,234 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from django.urls import reverse
+from requests.adapters import BaseAdapter
+
+from asteroid import api_calls
+from asteroid.api_calls import SBDBClient, SBDBError, set_sbdb_client
+
+APOPHIS = {"object": {"fullname": "99942 Apophis (2004 MN4)", "spkid": "20099942"}}
+NOT_FOUND = {"message": "specified object was not found"}
+
+
+class FakeSBDB(BaseAdapter):
+    """Transport answering from a dict of search string -> payload."""
+
+    def __init__(self, payloads, status_code=200, delay_s=0.0):
+        super().__init__()
+        self.payloads = payloads
+        self.status_code = status_code
+        self.delay_s = delay_s
+        self.searches = []
+
+    def send(self, request, timeout=None, **kwargs):
+        search = parse_qs(urlparse(request.url).query)["sstr"][0]
+        self.searches.append(search)
+        if self.delay_s > timeout[1]:
+            raise requests.ReadTimeout("read timed out")
+
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = json.dumps(self.payloads.get(search, NOT_FOUND)).encode()
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_sbdb():
+    return FakeSBDB({"Apophis": APOPHIS, "apophis": APOPHIS})
+
+
+@pytest.fixture
+def client_on(fake_sbdb):
+    return SBDBClient(transport=fake_sbdb, cache_dir=None)
+
+
+def test_lookup_returns_payload(client_on, fake_sbdb):
+    assert client_on.lookup("Apophis") == APOPHIS
+    assert fake_sbdb.searches == ["Apophis"]
+
+
+def test_repeated_lookups_are_cached_by_normalized_name(client_on, fake_sbdb):
+    for name in ["Apophis", "apophis", "  APOPHIS "]:
+        assert client_on.lookup(name) == APOPHIS
+    assert fake_sbdb.searches == ["Apophis"]
+
+
+def test_not_found_is_cached_with_its_own_ttl(fake_sbdb):
+    client = SBDBClient(transport=fake_sbdb, cache_dir=None, not_found_ttl_s=0)
+
+    client.lookup("nothing")
+    client.lookup("nothing")
+    client.lookup("Apophis")
+    client.lookup("Apophis")
+
+    assert fake_sbdb.searches == ["nothing", "nothing", "Apophis"]
+
+
+def test_cache_entries_expire(fake_sbdb, monkeypatch):
+    client = SBDBClient(transport=fake_sbdb, cache_dir=None, cache_ttl_s=60)
+    client.lookup("Apophis")
+
+    now = time.time()
+    monkeypatch.setattr(api_calls.time, "time", lambda: now + 61)
+    client.lookup("Apophis")
+
+    assert len(fake_sbdb.searches) == 2
+
+
+def test_lru_evicts_least_recently_used(fake_sbdb):
+    client = SBDBClient(transport=fake_sbdb, cache_dir=None, cache_size=2)
+    for name in ["a", "b", "a", "c", "a", "b"]:
+        client.lookup(name)
+    assert fake_sbdb.searches == ["a", "b", "c", "b"]
+
+
+def test_disk_cache_is_shared_between_clients(fake_sbdb, tmp_path):
+    SBDBClient(transport=fake_sbdb, cache_dir=str(tmp_path)).lookup("Apophis")
+
+    other = FakeSBDB({})
+    assert (
+        SBDBClient(transport=other, cache_dir=str(tmp_path)).lookup("apophis")
+        == APOPHIS
+    )
+    assert other.searches == []
+
+
+def test_timeout_maps_to_504():
+    client = SBDBClient(transport=FakeSBDB({}, delay_s=60), cache_dir=None)
+    with pytest.raises(SBDBError) as excinfo:
+        client.lookup("Apophis")
+    assert excinfo.value.http_status == 504
+
+
+def test_upstream_errors_are_not_cached():
+    fake = FakeSBDB({}, status_code=500)
+    client = SBDBClient(transport=fake, cache_dir=None)
+    for _ in range(2):
+        with pytest.raises(SBDBError):
+            client.lookup("Apophis")
+    assert len(fake.searches) == 2
+
+
+def serve_sbdb(respond):
+    """Start a local SBDB stand-in answering the n-th request (from 1) with
+    respond(n) -> (status code, headers, body)."""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests_seen.append(self.client_address)
+            status_code, headers, body = respond(len(requests_seen))
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}/sbdb.api", requests_seen
+
+
+@pytest.fixture
+def local_sbdb_server():
+    """Local SBDB stand-in failing its first request with 503, then answering."""
+    server, url, requests_seen = serve_sbdb(
+        lambda n: (
+            (503, {}, b"{}") if n == 1 else (200, {}, json.dumps(APOPHIS).encode())
+        )
+    )
+    yield url, requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def throttling_sbdb_server():
+    """Local SBDB stand-in answering every request 429 Retry-After: 3600."""
+    server, url, requests_seen = serve_sbdb(
+        lambda n: (429, {"Retry-After": "3600"}, b"{}")
+    )
+    yield url, requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_retries_5xx_over_pooled_connection(local_sbdb_server):
+    url, requests_seen = local_sbdb_server
+    client = SBDBClient(base_url=url, backoff_factor=0, cache_dir=None)
+
+    assert client.lookup("Apophis") == APOPHIS
+    assert client.lookup("Ceres") == APOPHIS
+
+    assert len(requests_seen) == 3
+    # Keep-alive: every request after the first reuses the same connection
+    assert len(set(requests_seen)) == 1
+
+
+def test_retry_after_is_clamped(throttling_sbdb_server):
+    url, requests_seen = throttling_sbdb_server
+    client = SBDBClient(base_url=url, max_retry_after_s=0.01, cache_dir=None)
+
+    start = time.monotonic()
+    with pytest.raises(SBDBError) as excinfo:
+        client.lookup("Apophis")
+    assert time.monotonic() - start < 1
+    assert excinfo.value.http_status == 429
+    assert len(requests_seen) == 4
+
+
+def test_no_retry_starts_past_the_deadline(throttling_sbdb_server):
+    url, requests_seen = throttling_sbdb_server
+    client = SBDBClient(
+        base_url=url, max_retry_after_s=0.3, deadline_s=0.8, cache_dir=None
+    )
+
+    start = time.monotonic()
+    with pytest.raises(SBDBError) as excinfo:
+        client.lookup("Apophis")
+    assert time.monotonic() - start < 0.8
+    assert excinfo.value.http_status == 429
+    # Waits from 0.0 and 0.3 s fit in the deadline, the one from 0.6 s does not
+    assert len(requests_seen) == 3
+
+
+@pytest.mark.django_db
+def test_neo_id_view_serves_repeated_names_from_cache(client, fake_sbdb):
+    set_sbdb_client(SBDBClient(transport=fake_sbdb, cache_dir=None))
+    try:
+        for _ in range(3):
+            response = client.get(reverse("neo_id_view"), {"name": "Apophis"})
+            assert response.json() == {"neo_id": 20099942}
+    finally:
+        set_sbdb_client(None)
+
+    assert fake_sbdb.searches == ["Apophis"]
+
+
+@pytest.mark.django_db
+def test_neo_id_view_reports_upstream_errors(client):
+    set_sbdb_client(SBDBClient(transport=FakeSBDB({}, delay_s=60), cache_dir=None))
+    try:
+        response = client.get(reverse("neo_id_view"), {"name": "Apophis"})
+    finally:
+        set_sbdb_client(None)
+
+    assert response.status_code == 504
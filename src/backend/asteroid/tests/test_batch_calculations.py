@@ -0,0 +1,226 @@
+import numpy as np
+import pytest
+
+from asteroid.batch_calculations import (
+    KERNEL_RTOL,
+    calculate_asteroid_impact_mass_batch,
+    calculate_crater_depth_final_batch,
+    calculate_crater_diameter_final_batch,
+    calculate_crater_diameter_transient_batch,
+    calculate_fall_time_batch,
+    calculate_impact_energy_batch,
+    calculate_rings_batch,
+    calculate_volume_batch,
+    run_physics_batch,
+)
+from asteroid.calculations import (
+    caclulate_asteroid_impact_mass,
+    calculate_crater_depth_final,
+    calculate_crater_diameter_final,
+    calculate_crater_diameter_transient,
+    calculate_fall_time,
+    calculate_impact_energy,
+    calculate_rings,
+)
+from asteroid.constants import (
+    EARTH_GRAVITATIONAL_CONSTANT,
+    ENTRY_HEIGHT_M,
+    RING_THRESHOLDS_KPA,
+)
+from asteroid.physics_helpers import calculate_mass, calculate_volume
+from asteroid.utils import RowValidationError
+
+MATERIALS = np.array(["sedimentary", "crystalline", "water"])
+
+
+@pytest.fixture
+def scenarios():
+    rng = np.random.default_rng(0)
+    n = 500
+    return {
+        "diameter_m": rng.uniform(1.0, 2_000.0, n),
+        "density_kg_m3": rng.uniform(500.0, 8_000.0, n),
+        "entry_velocity_m_s": rng.uniform(11_000.0, 72_000.0, n),
+        "material_type": rng.choice(MATERIALS, n),
+    }
+
+
+def scalar_chain(got, i, diameter_m, density_kg_m3, entry_velocity_m_s, material_type):
+    """The scalar call chain of simulations.run_simulation, each step fed the
+    batch's own columns for its inputs."""
+    return {
+        "fall_time_s": calculate_fall_time(ENTRY_HEIGHT_M, entry_velocity_m_s),
+        "volume_m3": calculate_volume(diameter_m),
+        "mass_kg": calculate_mass(float(got["volume_m3"][i]), density_kg_m3),
+        "impact_mass_kg": caclulate_asteroid_impact_mass(
+            float(got["mass_kg"][i]),
+            entry_velocity_m_s,
+            float(got["fall_time_s"][i]),
+            density_kg_m3,
+        ),
+        "energy_mt": calculate_impact_energy(
+            float(got["impact_mass_kg"][i]), entry_velocity_m_s
+        ),
+        "crater_transient_diameter_m": calculate_crater_diameter_transient(
+            float(got["energy_mt"][i]), material_type
+        ),
+        "crater_final_diameter_m": calculate_crater_diameter_final(
+            float(got["crater_transient_diameter_m"][i])
+        ),
+        "crater_depth_m": calculate_crater_depth_final(
+            float(got["crater_final_diameter_m"][i])
+        ),
+        **calculate_rings(float(got["energy_mt"][i]), diameter_m, material_type),
+    }
+
+
+def assert_within_kernel_rtol(got, expected, scale=None):
+    """The bound stated in the batch_calculations header: KERNEL_RTOL of
+    the expected value, or of `scale` where a kernel subtracts."""
+    got, expected = np.asarray(got), np.asarray(expected)
+    scale = np.abs(expected) if scale is None else np.asarray(scale)
+    assert np.all(np.abs(got - expected) <= KERNEL_RTOL * scale)
+
+
+def test_batch_matches_scalar_chain(scenarios):
+    got = run_physics_batch(**scenarios)
+
+    for i in range(len(scenarios["diameter_m"])):
+        entry_velocity_m_s = float(scenarios["entry_velocity_m_s"][i])
+        expected = scalar_chain(
+            got,
+            i,
+            float(scenarios["diameter_m"][i]),
+            float(scenarios["density_kg_m3"][i]),
+            entry_velocity_m_s,
+            str(scenarios["material_type"][i]),
+        )
+        assert list(got) == list(expected)
+        scales = {
+            "fall_time_s": entry_velocity_m_s / EARTH_GRAVITATIONAL_CONSTANT,
+            "impact_mass_kg": got["mass_kg"][i],
+        }
+        for name, value in expected.items():
+            assert_within_kernel_rtol(got[name][i], value, scales.get(name))
+
+
+def test_subtracting_kernels_are_bounded_by_their_larger_term():
+    rng = np.random.default_rng(1)
+    n = 10_000
+    velocity_m_s = rng.uniform(1_000.0, 1_000_000.0, n)
+    fall_time_s = calculate_fall_time_batch(ENTRY_HEIGHT_M, velocity_m_s)
+    assert_within_kernel_rtol(
+        fall_time_s,
+        [calculate_fall_time(ENTRY_HEIGHT_M, v) for v in velocity_m_s.tolist()],
+        velocity_m_s / EARTH_GRAVITATIONAL_CONSTANT,
+    )
+
+    # Bodies around the size that burns up completely
+    density_kg_m3 = rng.uniform(500.0, 8_000.0, n)
+    mass_kg = density_kg_m3 * calculate_volume_batch(rng.uniform(1.0, 100.0, n))
+    impact_mass_kg = calculate_asteroid_impact_mass_batch(
+        mass_kg, velocity_m_s, fall_time_s, density_kg_m3
+    )
+    assert_within_kernel_rtol(
+        impact_mass_kg,
+        [
+            caclulate_asteroid_impact_mass(*row)
+            for row in zip(
+                mass_kg.tolist(),
+                velocity_m_s.tolist(),
+                fall_time_s.tolist(),
+                density_kg_m3.tolist(),
+            )
+        ],
+        mass_kg,
+    )
+
+
+def test_batch_covers_burnt_up_impactors():
+    # Small, slow, light impactors lose all their mass before impact
+    got = run_physics_batch([1.0, 500.0], 500.0, 11_000.0, "water")
+
+    assert got["impact_mass_kg"][0] == 0.0
+    assert got["energy_mt"][0] == 0.0
+    assert got["crater_depth_m"][0] == 0.0
+    assert all(got[f"kpa_{kpa}"][0] == 0.0 for kpa in RING_THRESHOLDS_KPA)
+    assert got["energy_mt"][1] > 0.0
+
+
+def test_scalar_arguments_broadcast(scenarios):
+    got = run_physics_batch(scenarios["diameter_m"], 3_000.0, 20_000.0, "crystalline")
+    assert all(len(column) == len(scenarios["diameter_m"]) for column in got.values())
+
+
+def test_invalid_rows_are_reported_together():
+    with pytest.raises(RowValidationError) as excinfo:
+        run_physics_batch(
+            [10.0, -1.0, 10.0, np.nan],
+            [3_000.0, 3_000.0, 0.0, 3_000.0],
+            20_000.0,
+            ["water", "water", "water", "lava"],
+        )
+
+    assert excinfo.value.rows == {
+        "diameter_m": [1, 3],
+        "density_kg_m3": [2],
+        "material_type": [3],
+    }
+
+
+def test_zero_and_negative_inputs_short_circuit_like_scalar():
+    values = [-np.inf, -1.0, 0.0, 2.0]
+
+    energy = calculate_impact_energy_batch(values, [1.0, 1.0, 1.0, 1.0])
+    assert energy.tolist() == [calculate_impact_energy(v, 1.0) for v in values]
+
+    depth = calculate_crater_depth_final_batch(values)
+    assert depth.tolist() == [calculate_crater_depth_final(v) for v in values]
+
+    final = calculate_crater_diameter_final_batch(values)
+    assert final.tolist() == [calculate_crater_diameter_final(v) for v in values]
+
+    transient = calculate_crater_diameter_transient_batch(values, "water")
+    assert_within_kernel_rtol(
+        transient, [calculate_crater_diameter_transient(v, "water") for v in values]
+    )
+
+
+def test_velocity_only_validated_where_mass_is_positive():
+    # The scalar function returns 0 before looking at the velocity
+    energy = calculate_impact_energy_batch([0.0, 1.0], [-5.0, 1_000.0])
+    assert energy[0] == 0.0
+
+    with pytest.raises(RowValidationError) as excinfo:
+        calculate_impact_energy_batch([1.0, 1.0], [-5.0, 1_000.0])
+    assert excinfo.value.rows == {"velocity_m_s": [0]}
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf])
+def test_non_finite_values_are_rejected(bad):
+    with pytest.raises(RowValidationError) as excinfo:
+        calculate_crater_depth_final_batch([1.0, bad])
+    assert excinfo.value.rows == {"D_f_m": [1]}
+
+
+def test_rings_are_columns_per_threshold():
+    rings = calculate_rings_batch([0.0, 1.0], 50.0, ["lava", "crystalline"])
+
+    assert list(rings) == [f"kpa_{kpa}" for kpa in RING_THRESHOLDS_KPA]
+    # No energy: no ring, and the material is never looked up
+    assert all(column[0] == 0.0 for column in rings.values())
+    expected = calculate_rings(1.0, 50.0, "crystalline")
+    assert_within_kernel_rtol(
+        [column[1] for column in rings.values()], list(expected.values())
+    )
+
+
+@pytest.mark.parametrize("bad", [[True, False], ["1.0"], [None]])
+def test_non_numeric_arrays_raise_type_error(bad):
+    with pytest.raises(TypeError):
+        calculate_volume_batch(bad)
+
+
+def test_mismatched_lengths_raise_value_error():
+    with pytest.raises(ValueError):
+        run_physics_batch([1.0, 2.0], [3_000.0] * 3, 20_000.0, "water")
@@ -1,14 +1,17 @@
 import math
 
+import numpy as np
 import pytest
 
-from asteroid.calculations import (calculate_crater_depth_final,
-                                   calculate_crater_diameter_final,
-                                   calculate_crater_diameter_transient,
-                                   calculate_impact_energy)
+from asteroid.calculations import (
+    calculate_asteroid_fall_trajecotry_coordinates,
+    calculate_crater_depth_final, calculate_crater_diameter_final,
+    calculate_crater_diameter_transient, calculate_fall_time,
+    calculate_impact_energy, fall_trajectory_samples, geodetic_to_ecef,
+    iter_fall_trajectory_chunks, select_fall_trajectory_times)
 from asteroid.constants import (CRATER_A, CRATER_B, CRATER_MATERIAL_SF,
                                 J_PER_MT, SIMPLE_CRATER_DEPTH_FACTOR,
-                                SIMPLE_TRANSIENT_TO_FINAL_FACTOR)
+                                SIMPLE_TRANSIENT_TO_FINAL_FACTOR, WGS84)
 
 # ---------------------------------------------
 # calculate_impact_energy
@@ -213,3 +216,148 @@ def test_depth_final_tiny_positive(tiny: float) -> None:
     got = calculate_crater_depth_final(tiny)
     assert 0.0 < got < 1.0
     assert math.isfinite(got)
+
+
+# ---------------------------------------------
+# calculate_asteroid_fall_trajecotry_coordinates
+# ---------------------------------------------
+
+
+@pytest.mark.parametrize("entry_angle_deg", [15.0, 45.0, 80.0])
+@pytest.mark.parametrize("azimuth_deg", [0.0, 90.0, 225.0])
+def test_trajectory_ends_at_aim_point(
+    entry_angle_deg: float, azimuth_deg: float
+) -> None:
+    lat, lon = 54.687, 25.279
+    fall_time_s = calculate_fall_time(120_000.0, 20_000.0)
+    coords = calculate_asteroid_fall_trajecotry_coordinates(
+        lat, lon, azimuth_deg, entry_angle_deg, 20_000.0, fall_time_s
+    )
+
+    assert len(coords) % 4 == 0
+    samples = np.array(coords).reshape(-1, 4)
+    assert samples[0, 0] == 0
+    np.testing.assert_array_equal(np.diff(samples[:, 0]), 1)
+    assert samples[0, 3] == pytest.approx(120_000.0, abs=1.0)
+
+    # Last sample is on the ground at the aim point
+    assert samples[-1, 3] == 0
+    np.testing.assert_allclose(samples[-1, 1:3], [lon, lat])
+
+
+def test_trajectory_comes_from_behind_the_azimuth() -> None:
+    # Travelling east means the path starts west of the aim point
+    coords = calculate_asteroid_fall_trajecotry_coordinates(
+        0.0, 10.0, 90.0, 45.0, 20_000.0, 5.0
+    )
+    samples = np.array(coords).reshape(-1, 4)
+    assert np.all(np.diff(samples[:, 1]) > 0)
+    np.testing.assert_allclose(samples[:, 2], 0.0, atol=1e-9)
+
+
+def test_trajectory_ground_distance_follows_height() -> None:
+    lat, lon = -33.9, 151.2
+    coords = calculate_asteroid_fall_trajecotry_coordinates(
+        lat, lon, 30.0, 30.0, 15_000.0, 7.0
+    )
+    samples = np.array(coords).reshape(-1, 4)
+    azimuth_from_aim, _, distance_m = WGS84.inv(
+        np.full(len(samples), lon),
+        np.full(len(samples), lat),
+        samples[:, 1],
+        samples[:, 2],
+    )
+    np.testing.assert_allclose(
+        distance_m, samples[:, 3] / math.tan(math.radians(30.0)), atol=1.0
+    )
+    np.testing.assert_allclose(np.asarray(azimuth_from_aim)[:-1], -150.0, atol=1e-6)
+
+
+@pytest.mark.parametrize("chunk_samples", [2, 5, 4096])
+def test_trajectory_chunks_concatenate_to_whole_path(chunk_samples: int) -> None:
+    args = (
+        54.687,
+        25.279,
+        30.0,
+        45.0,
+        11_000.0,
+        calculate_fall_time(120_000.0, 11_000.0),
+    )
+    chunks = list(iter_fall_trajectory_chunks(*args, chunk_samples=chunk_samples))
+
+    assert all(len(chunk) <= chunk_samples for chunk in chunks)
+    assert np.concatenate(chunks).ravel().tolist() == (
+        calculate_asteroid_fall_trajecotry_coordinates(*args)
+    )
+
+
+def test_trajectory_chunks_fine_step() -> None:
+    fall_time_s = calculate_fall_time(120_000.0, 20_000.0)
+    samples = np.concatenate(
+        list(
+            iter_fall_trajectory_chunks(
+                0.0, 0.0, 0.0, 45.0, 20_000.0, fall_time_s, step_s=0.01
+            )
+        )
+    )
+    np.testing.assert_allclose(np.diff(samples[:, 0]), 0.01)
+    assert samples[0, 3] == pytest.approx(120_000.0, abs=1.0)
+    assert samples[-1, 3] == 0
+
+
+# ---------------------------------------------
+# select_fall_trajectory_times
+# ---------------------------------------------
+
+PATH = (54.687, 25.279, 30.0, 20.0, 15_000.0)
+
+
+def _max_interpolation_error_m(times_s: np.ndarray, fall_time_s: float) -> float:
+    dense_s = np.linspace(0.0, fall_time_s, 20_001)
+    exact = fall_trajectory_samples(*PATH, fall_time_s, dense_s)
+    chosen = fall_trajectory_samples(*PATH, fall_time_s, times_s)
+    exact_m = geodetic_to_ecef(exact[:, 1], exact[:, 2], exact[:, 3])
+    chosen_m = geodetic_to_ecef(chosen[:, 1], chosen[:, 2], chosen[:, 3])
+    interpolated_m = np.column_stack(
+        [np.interp(dense_s, times_s, chosen_m[:, axis]) for axis in range(3)]
+    )
+    return float(np.linalg.norm(exact_m - interpolated_m, axis=1).max())
+
+
+@pytest.mark.parametrize("tolerance_m", [5.0, 50.0, 500.0])
+def test_adaptive_times_stay_within_tolerance(tolerance_m: float) -> None:
+    fall_time_s = calculate_fall_time(120_000.0, PATH[-1])
+    times_s = select_fall_trajectory_times(*PATH, fall_time_s, tolerance_m=tolerance_m)
+
+    assert times_s[0] == 0 and times_s[-1] == fall_time_s
+    assert np.all(np.diff(times_s) > 0)
+    # Candidate spacing and metre rounding of h add a little on top
+    assert _max_interpolation_error_m(times_s, fall_time_s) <= tolerance_m + 2.0
+
+
+def test_adaptive_times_shrink_with_tolerance() -> None:
+    fall_time_s = calculate_fall_time(120_000.0, PATH[-1])
+    counts = [
+        len(select_fall_trajectory_times(*PATH, fall_time_s, tolerance_m=tol))
+        for tol in (5.0, 50.0, 500.0)
+    ]
+    assert counts[0] > counts[1] > counts[2] >= 2
+
+
+def test_adaptive_times_max_points() -> None:
+    fall_time_s = calculate_fall_time(120_000.0, PATH[-1])
+    few = select_fall_trajectory_times(*PATH, fall_time_s, max_points=4)
+    more = select_fall_trajectory_times(*PATH, fall_time_s, max_points=8)
+
+    assert len(few) == 4 and len(more) == 8
+    assert _max_interpolation_error_m(more, fall_time_s) < (
+        _max_interpolation_error_m(few, fall_time_s)
+    )
+
+
+@pytest.mark.parametrize(
+    "options", [{}, {"tolerance_m": 0.0}, {"max_points": 1}, {"max_points": 2.5}]
+)
+def test_adaptive_times_reject_bad_options(options) -> None:
+    with pytest.raises(ValueError):
+        select_fall_trajectory_times(*PATH, 10.0, **options)
@@ -0,0 +1,214 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from asteroid import views
+from asteroid.catalog import find_spkid, upsert_catalog
+from asteroid.models import Asteroid
+
+pytestmark = pytest.mark.django_db
+
+SBDB_FIELDS = [
+    "spkid",
+    "full_name",
+    "pdes",
+    "name",
+    "neo",
+    "pha",
+    "H",
+    "diameter",
+    "albedo",
+    "e",
+    "a",
+    "i",
+]
+SBDB_ROWS = [
+    [
+        "20099942",
+        "99942 Apophis (2004 MN4)",
+        "99942",
+        "Apophis",
+        "Y",
+        "Y",
+        "19.09",
+        "0.34",
+        "0.35",
+        "0.191",
+        "0.922",
+        "3.34",
+    ],
+    [
+        "20000433",
+        "433 Eros (A898 PA)",
+        "433",
+        "Eros",
+        "Y",
+        "N",
+        "10.38",
+        "16.84",
+        "0.25",
+        "0.223",
+        "1.458",
+        "10.83",
+    ],
+    [
+        "54520000",
+        "(2024 YR4)",
+        "2024 YR4",
+        None,
+        "Y",
+        "N",
+        "23.9",
+        None,
+        None,
+        "0.662",
+        "2.516",
+        "3.41",
+    ],
+]
+
+
+@pytest.fixture
+def sbdb_json(tmp_path):
+    path = tmp_path / "sbdb.json"
+    path.write_text(json.dumps({"fields": SBDB_FIELDS, "data": SBDB_ROWS}))
+    return str(path)
+
+
+@pytest.fixture
+def sbdb_csv(tmp_path):
+    path = tmp_path / "sbdb.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SBDB_FIELDS)
+        writer.writerows([["" if v is None else v for v in row] for row in SBDB_ROWS])
+    return str(path)
+
+
+@pytest.mark.parametrize("dump", ["sbdb_json", "sbdb_csv"])
+def test_command_loads_catalog(dump, request):
+    call_command("load_neo_catalog", request.getfixturevalue(dump), stdout=StringIO())
+
+    apophis = Asteroid.objects.get(spkid=20099942)
+    assert apophis.name == "Apophis"
+    assert apophis.designation == "99942"
+    assert apophis.normalized_name == "apophis"
+    assert apophis.pha and apophis.neo
+    assert apophis.h_mag == 19.09
+    assert apophis.diameter_km == 0.34
+    assert apophis.semi_major_axis_au == 0.922
+
+    unnamed = Asteroid.objects.get(spkid=54520000)
+    assert unnamed.name == ""
+    assert unnamed.normalized_name == "2024 yr4"
+    assert unnamed.diameter_km is None
+
+
+def test_reload_upserts_idempotently(sbdb_json, tmp_path):
+    call_command("load_neo_catalog", sbdb_json, stdout=StringIO())
+    call_command("load_neo_catalog", sbdb_json, batch_size=2, stdout=StringIO())
+    assert Asteroid.objects.count() == 3
+
+    updated = [SBDB_ROWS[0][:6] + ["19.2"] + SBDB_ROWS[0][7:]]
+    path = tmp_path / "update.json"
+    path.write_text(json.dumps({"fields": SBDB_FIELDS, "data": updated}))
+    call_command("load_neo_catalog", str(path), stdout=StringIO())
+
+    assert Asteroid.objects.count() == 3
+    assert Asteroid.objects.get(spkid=20099942).h_mag == 19.2
+
+
+def test_duplicate_rows_in_one_batch_keep_the_last():
+    rows = [
+        {"spkid": "1", "name": "First"},
+        {"spkid": "1", "name": "Second"},
+    ]
+    assert upsert_catalog(rows) == 1
+    assert Asteroid.objects.get(spkid=1).name == "Second"
+
+
+def test_mpc_rows_take_spkid_from_number():
+    upsert_catalog(
+        [{"Number": "(99942)", "Name": "Apophis", "H": 19.09, "NEO_flag": 1}]
+    )
+
+    apophis = Asteroid.objects.get(spkid=20099942)
+    assert apophis.designation == "99942"
+    assert apophis.neo
+
+
+def test_bad_row_rolls_back_whole_load():
+    with pytest.raises(ValueError):
+        upsert_catalog([{"spkid": "1", "name": "Ok"}, {"name": "No id"}], batch_size=1)
+    assert not Asteroid.objects.exists()
+
+
+def test_command_reports_bad_format(tmp_path):
+    path = tmp_path / "catalog.txt"
+    path.write_text("")
+    with pytest.raises(Exception, match="Unsupported catalog format"):
+        call_command("load_neo_catalog", str(path), stdout=StringIO())
+
+
+@pytest.mark.parametrize(
+    "search, spkid",
+    [
+        ("Apophis", 20099942),
+        ("  APOPHIS ", 20099942),
+        ("99942", 20099942),
+        ("(433)", 20000433),
+        ("2024 YR4", 54520000),
+        ("2024 yr4", 54520000),
+        ("Ceres", None),
+    ],
+)
+def test_find_spkid(sbdb_json, search, spkid):
+    call_command("load_neo_catalog", sbdb_json, stdout=StringIO())
+    assert find_spkid(search) == spkid
+
+
+def test_find_spkid_matches_designation_in_any_case():
+    # Named, so normalized_name holds "halley" and only the designation matches
+    upsert_catalog(
+        [{"spkid": "1000036", "full_name": "1P/Halley", "pdes": "1P", "name": "Halley"}]
+    )
+    assert find_spkid("1p") == 1000036
+    assert find_spkid(" 1P ") == 1000036
+
+
+def test_find_spkid_uses_indexes(sbdb_json):
+    call_command("load_neo_catalog", sbdb_json, stdout=StringIO())
+    with CaptureQueriesContext(connection) as queries:
+        find_spkid("2024 yr4")
+    (query,) = queries.captured_queries
+
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+        plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+    # One index search per alternative, not a walk of the spkid index
+    assert "MULTI-INDEX OR" in plan
+    assert "(normalized_name=?)" in plan and "(normalized_designation=?)" in plan
+
+
+def test_neo_id_view_prefers_local_catalog(client, sbdb_json, monkeypatch):
+    call_command("load_neo_catalog", sbdb_json, stdout=StringIO())
+    looked_up = []
+
+    def fake_lookup(name):
+        looked_up.append(name)
+        return {"object": {"spkid": "2000001"}}
+
+    monkeypatch.setattr(views, "call_sbdb_lookup", fake_lookup)
+
+    local = client.get(reverse("neo_id_view"), {"name": "apophis"}).json()
+    remote = client.get(reverse("neo_id_view"), {"name": "Ceres"}).json()
+
+    assert local == {"neo_id": 20099942}
+    assert remote == {"neo_id": 2000001}
+    assert looked_up == ["Ceres"]
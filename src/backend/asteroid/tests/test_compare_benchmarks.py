@@ -0,0 +1,59 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+def write_run(path, medians):
+    path.write_text(
+        json.dumps(
+            {
+                "benchmarks": [
+                    {"fullname": name, "stats": {"median": median, "min": median}}
+                    for name, median in medians.items()
+                ]
+            }
+        )
+    )
+    return str(path)
+
+
+def compare(tmp_path, baseline, current, **options):
+    out = StringIO()
+    call_command(
+        "compare_benchmarks",
+        write_run(tmp_path / "baseline.json", baseline),
+        write_run(tmp_path / "current.json", current),
+        stdout=out,
+        **options,
+    )
+    return out.getvalue()
+
+
+def test_within_threshold_passes(tmp_path):
+    out = compare(
+        tmp_path,
+        {"a": 1e-3, "b": 2e-6, "gone": 1.0},
+        {"a": 1.05e-3, "b": 1e-6, "added": 1.0},
+    )
+    assert "+5.0%" in out and "-50.0%" in out
+    assert "missing  gone" in out and "new  added" in out
+    assert "No regressions." in out
+
+
+def test_regression_fails(tmp_path):
+    with pytest.raises(CommandError, match="1 benchmarks are more than 10%"):
+        compare(tmp_path, {"a": 1e-3, "b": 1e-3}, {"a": 1.2e-3, "b": 1e-3})
+
+
+def test_threshold_option(tmp_path):
+    out = compare(tmp_path, {"a": 1e-3}, {"a": 1.2e-3}, threshold=25)
+    assert "No regressions." in out
+
+
+def test_rejects_non_benchmark_json(tmp_path):
+    path = tmp_path / "other.json"
+    path.write_text(json.dumps({"data": []}))
+    with pytest.raises(CommandError, match="not a pytest-benchmark"):
+        call_command("compare_benchmarks", str(path), str(path), stdout=StringIO())
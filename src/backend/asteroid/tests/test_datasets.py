@@ -0,0 +1,257 @@
+import os
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from asteroid.datasets import (
+    GHS_POP_TILES_ENV,
+    DatasetError,
+    DatasetManager,
+    PopulationPyramid,
+    RasterDataset,
+    SummedAreaTable,
+    TiledRaster,
+    dataset_manager,
+    get_population_dataset,
+    write_population_pyramid,
+    write_summed_area_table,
+    write_tiled_raster,
+)
+
+NODATA = -200.0
+
+
+@pytest.fixture
+def raster_path(tmp_path, write_raster):
+    path = str(tmp_path / "pop.tif")
+    values = np.arange(64, dtype="float32").reshape(8, 8)
+    values[0, 0] = NODATA
+    write_raster(path, values, nodata=NODATA)
+    return path
+
+
+def test_open_captures_metadata(raster_path):
+    dataset = RasterDataset.open(raster_path)
+    assert dataset.width == 8
+    assert dataset.height == 8
+    assert dataset.resolution == (250.0, -250.0)
+    assert dataset.nodata == NODATA
+    assert dataset.transform.c == -1000.0
+    assert dataset.transform.f == 1000.0
+
+
+def test_read_window_zeroes_nodata(raster_path):
+    dataset = RasterDataset.open(raster_path)
+    window = dataset.read_window(0, 2, 0, 3)
+    assert window.dtype == np.float64
+    assert window.tolist() == [[0.0, 1.0, 2.0], [8.0, 9.0, 10.0]]
+
+
+def test_manager_reuses_handle(raster_path):
+    manager = DatasetManager()
+    first = manager.get("pop", raster_path)
+    second = manager.get("pop", raster_path)
+    assert first is second
+
+
+def test_manager_reopens_on_mtime_change(raster_path, write_raster):
+    manager = DatasetManager()
+    first = manager.get("pop", raster_path)
+
+    write_raster(raster_path, np.ones((4, 4), dtype="float32"))
+    stat = os.stat(raster_path)
+    os.utime(raster_path, (stat.st_atime, first.mtime + 10))
+
+    second = manager.get("pop", raster_path)
+    assert second is not first
+    assert second.width == 4
+
+
+def test_manager_reopens_on_path_change(raster_path, tmp_path, write_raster):
+    other_path = str(tmp_path / "other.tif")
+    write_raster(other_path, np.ones((2, 2), dtype="float32"))
+
+    manager = DatasetManager()
+    first = manager.get("pop", raster_path)
+    second = manager.get("pop", other_path)
+    assert second is not first
+    assert second.path == other_path
+
+
+def test_manager_requires_path():
+    with pytest.raises(DatasetError):
+        DatasetManager().get("pop", None)
+
+
+@pytest.fixture
+def sat_path(raster_path, tmp_path):
+    path = str(tmp_path / "pop_sat.npy")
+    write_summed_area_table(RasterDataset.open(raster_path), path, block_rows=3)
+    return path
+
+
+def test_summed_area_table_matches_cumulative_sums(raster_path, sat_path):
+    values = RasterDataset.open(raster_path).read_window(0, 8, 0, 8)
+    sat = SummedAreaTable.open(sat_path)
+
+    assert sat.table.shape == (9, 9)
+    np.testing.assert_allclose(sat.table[1:, 1:], values.cumsum(0).cumsum(1))
+    assert sat.transform == RasterDataset.open(raster_path).transform
+    assert sat.crs == "ESRI:54009"
+
+
+def test_summed_area_table_rect_sums(raster_path, sat_path):
+    values = RasterDataset.open(raster_path).read_window(0, 8, 0, 8)
+    sat = SummedAreaTable.open(sat_path)
+
+    got = sat.rect_sums(
+        np.array([0, 2, 5]), np.array([8, 5, 5]), 1, np.array([3, 8, 7])
+    )
+    expected = [values[0:8, 1:3].sum(), values[2:5, 1:8].sum(), 0.0]
+    np.testing.assert_allclose(got, expected)
+
+
+def test_summed_area_table_rect_sums_clip_to_raster(raster_path, sat_path):
+    values = RasterDataset.open(raster_path).read_window(0, 8, 0, 8)
+    sat = SummedAreaTable.open(sat_path)
+    assert sat.rect_sums(-3, 20, -1, 4) == pytest.approx(values[:, :4].sum())
+
+
+def test_build_population_sat_command(raster_path, tmp_path):
+    output = str(tmp_path / "cmd_sat.npy")
+    call_command(
+        "build_population_sat", source=raster_path, output=output, stdout=StringIO()
+    )
+
+    sat = SummedAreaTable.open(output)
+    assert sat.table[-1, -1] == pytest.approx(np.arange(64).sum())
+
+
+def test_population_pyramid_conserves_population(raster_path, tmp_path):
+    source = RasterDataset.open(raster_path)
+    manifest = write_population_pyramid(
+        source, str(tmp_path / "pyramid"), factor=3, levels=2, block_rows=4
+    )
+    pyramid = PopulationPyramid.open(manifest)
+
+    total = source.read_window(0, 8, 0, 8).sum()
+    assert [level.factor for level in pyramid.levels] == [3, 9]
+    assert [level.values.shape for level in pyramid.levels] == [(3, 3), (1, 1)]
+    for level in pyramid.levels:
+        assert level.read_window(0, level.height, 0, level.width).sum() == total
+
+    level_1 = pyramid.levels[0]
+    assert level_1.resolution == (750.0, -750.0)
+    assert level_1.read_window(0, 1, 0, 1)[0, 0] == source.read_window(0, 3, 0, 3).sum()
+
+
+def test_build_population_pyramid_command(raster_path, tmp_path):
+    output_dir = str(tmp_path / "cmd_pyramid")
+    call_command(
+        "build_population_pyramid",
+        source=raster_path,
+        output_dir=output_dir,
+        levels=1,
+        stdout=StringIO(),
+    )
+
+    pyramid = PopulationPyramid.open(os.path.join(output_dir, "manifest.json"))
+    assert pyramid.levels[0].values.shape == (2, 2)
+
+
+@pytest.fixture
+def sparse_raster_path(tmp_path, write_raster):
+    """10x11 raster whose top-right corner is all nodata or empty."""
+    path = str(tmp_path / "sparse.tif")
+    values = np.arange(110, dtype="float32").reshape(10, 11)
+    values[:4, 4:] = 0.0
+    values[0, 8] = NODATA
+    write_raster(path, values, nodata=NODATA)
+    return path
+
+
+def test_tiled_raster_matches_source_windows(sparse_raster_path, tmp_path):
+    source = RasterDataset.open(sparse_raster_path)
+    tiled = TiledRaster.open(
+        write_tiled_raster(source, str(tmp_path / "tiles"), tile_size=4)
+    )
+
+    assert tiled.index.shape == (3, 3)
+    # Tile (0, 1) is all zeros and tile (0, 2) only zeros and nodata
+    assert tiled.index[0, 1] == tiled.index[0, 2] == -1
+    assert tiled.tiles.shape == (7, 4, 4)
+    assert tiled.tiles.dtype == np.float32
+    assert tiled.transform == source.transform
+    assert (tiled.width, tiled.height, tiled.crs) == (11, 10, "ESRI:54009")
+
+    for window in [(0, 10, 0, 11), (1, 3, 1, 3), (0, 4, 4, 8), (3, 9, 2, 11)]:
+        np.testing.assert_array_equal(
+            tiled.read_window(*window), source.read_window(*window)
+        )
+
+
+def test_tiled_raster_window_inside_one_tile_is_a_view(sparse_raster_path, tmp_path):
+    tiled = TiledRaster.open(
+        write_tiled_raster(
+            RasterDataset.open(sparse_raster_path), str(tmp_path / "tiles"), 4
+        )
+    )
+
+    window = tiled.read_window(5, 7, 1, 4)
+    assert np.shares_memory(window, tiled.tiles)
+    assert not window.flags.writeable
+    assert not np.shares_memory(tiled.read_window(3, 5, 1, 4), tiled.tiles)
+
+
+def test_rewriting_tiled_store_leaves_open_stores_intact(sparse_raster_path, tmp_path):
+    source = RasterDataset.open(sparse_raster_path)
+    directory = str(tmp_path / "tiles")
+    first = TiledRaster.open(write_tiled_raster(source, directory, 4))
+    first_files = set(os.listdir(directory))
+
+    # A new store never writes to the files an open (or just read) one uses
+    manifest = write_tiled_raster(source, directory, 2)
+    assert first_files - {"manifest.json"} <= set(os.listdir(directory))
+    second = TiledRaster.open(manifest)
+    assert second.tiles.shape[1:] == (2, 2)
+    np.testing.assert_array_equal(
+        first.read_window(0, 10, 0, 11), source.read_window(0, 10, 0, 11)
+    )
+
+    # Only the current and the replaced store are kept
+    write_tiled_raster(source, directory, 4)
+    assert len(os.listdir(directory)) == 5
+    assert not (first_files - {"manifest.json"}) & set(os.listdir(directory))
+
+
+def test_population_dataset_prefers_tiled_store(
+    sparse_raster_path, tmp_path, monkeypatch
+):
+    manifest = write_tiled_raster(
+        RasterDataset.open(sparse_raster_path), str(tmp_path / "tiles"), 4
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_URL", sparse_raster_path)
+    monkeypatch.setenv(GHS_POP_TILES_ENV, str(tmp_path / "missing.json"))
+    try:
+        assert isinstance(get_population_dataset(), RasterDataset)
+        monkeypatch.setenv(GHS_POP_TILES_ENV, manifest)
+        assert isinstance(get_population_dataset(), TiledRaster)
+    finally:
+        dataset_manager.clear()
+
+
+def test_prepare_population_command(raster_path, tmp_path):
+    output_dir = str(tmp_path / "cmd_tiles")
+    call_command(
+        "prepare_population",
+        source=raster_path,
+        output_dir=output_dir,
+        tile_size=3,
+        stdout=StringIO(),
+    )
+
+    tiled = TiledRaster.open(os.path.join(output_dir, "manifest.json"))
+    assert tiled.index.shape == (3, 3)
+    assert tiled.read_window(0, 8, 0, 8).sum() == np.arange(64).sum()
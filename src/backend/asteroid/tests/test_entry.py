@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+import pytest
+
+from asteroid.entry import (TERMINAL_TYPES, simulate_entry,
+                            simulate_entry_batch, yield_strength_pa)
+from asteroid.utils import RowValidationError
+
+
+def test_yield_strength():
+    # Collins et al. 2005: a few hundred kPa for stone, far more for iron
+    assert yield_strength_pa(3000.0) == pytest.approx(3.35e5, rel=0.01)
+    assert yield_strength_pa(7800.0) > 100 * yield_strength_pa(3000.0)
+
+
+def test_large_body_impacts():
+    got = simulate_entry(1000.0, 3000.0, 20_000.0, 45.0)
+
+    assert got["terminal_type"] == "impact"
+    assert got["terminal_altitude_m"] == 0.0
+    assert 0.9 * 20_000.0 < got["impact_velocity_m_s"] < 20_000.0
+    assert got["breakup_altitude_m"] > got["peak_energy_altitude_m"]
+
+
+def test_small_stony_body_bursts():
+    # Chelyabinsk-like: ~20 m, 19 km/s, 18 degrees
+    got = simulate_entry(19.0, 3300.0, 19_000.0, 18.0)
+
+    assert got["terminal_type"] == "airburst"
+    assert 20_000.0 < got["terminal_altitude_m"] < 60_000.0
+    assert got["breakup_altitude_m"] > got["terminal_altitude_m"]
+    assert got["impact_velocity_m_s"] is None and got["impact_mass_kg"] is None
+    assert got["deposited_energy_mt"] == pytest.approx(
+        0.5 * 3300.0 * (4 / 3) * np.pi * 9.5**3 * 19_000.0**2 / 4.184e15, rel=1e-6
+    )
+
+
+def test_dense_body_bursts_lower():
+    stone = simulate_entry(20.0, 3000.0, 15_000.0, 60.0)
+    iron = simulate_entry(20.0, 7800.0, 15_000.0, 60.0)
+    assert iron["breakup_altitude_m"] < stone["breakup_altitude_m"]
+    assert iron["terminal_altitude_m"] < stone["terminal_altitude_m"]
+
+
+def test_grazing_body_skips_out():
+    got = simulate_entry(10.0, 3000.0, 15_000.0, 3.0)
+    assert got["terminal_type"] == "skip_out"
+    assert got["terminal_altitude_m"] is None
+
+
+def test_batch_matches_single_bodies():
+    # The scalar path takes the same steps, only rounding differs
+    rng = np.random.default_rng(0)
+    n = 20
+    columns = (
+        rng.uniform(5.0, 500.0, n),
+        rng.uniform(1_500.0, 8_000.0, n),
+        rng.uniform(11_000.0, 40_000.0, n),
+        rng.uniform(3.0, 90.0, n),
+    )
+
+    batch = simulate_entry_batch(*columns)
+
+    assert set(batch["terminal_type"]) <= set(TERMINAL_TYPES)
+    assert "unresolved" not in batch["terminal_type"]
+    for i in range(n):
+        single = simulate_entry(*(float(column[i]) for column in columns))
+        for name, column in batch.items():
+            if name == "terminal_type":
+                assert column[i] == single[name]
+            elif single[name] is None:
+                assert np.isnan(column[i])
+            else:
+                assert column[i] == pytest.approx(single[name], rel=1e-9)
+
+
+def test_invalid_rows_raise():
+    with pytest.raises(RowValidationError) as error:
+        simulate_entry_batch(
+            [10.0, -1.0, 10.0, 10.0],
+            [3000.0, 3000.0, 3000.0, np.nan],
+            [20_000.0, 20_000.0, 20_000.0, 20_000.0],
+            [45.0, 45.0, 95.0, 0.0],
+        )
+    assert error.value.rows == {
+        "diameter_m": [1],
+        "density_kg_m3": [3],
+        "entry_angle_deg": [2, 3],
+    }
+
+
+def test_invalid_single_body_raises():
+    with pytest.raises(RowValidationError) as error:
+        simulate_entry(10.0, 3000.0, 20_000.0, 95.0)
+    assert error.value.rows == {"entry_angle_deg": [0]}
+
+
+def test_thousand_bodies_run_in_seconds():
+    rng = np.random.default_rng(1)
+    n = 1_000
+    start = time.perf_counter()
+    simulate_entry_batch(
+        rng.uniform(5.0, 500.0, n),
+        rng.uniform(1_500.0, 8_000.0, n),
+        rng.uniform(11_000.0, 40_000.0, n),
+        rng.uniform(10.0, 90.0, n),
+    )
+    assert time.perf_counter() - start < 5.0
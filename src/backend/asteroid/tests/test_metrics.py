@@ -0,0 +1,218 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import requests
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from requests.adapters import BaseAdapter
+
+from asteroid import metrics
+from asteroid.api_calls import SBDBClient, SBDBError
+from asteroid.datasets import (GHS_POP_SAT_DATASET, RasterDataset,
+                               dataset_manager, get_population_sat,
+                               write_summed_area_table)
+
+INPUTS = {
+    "diameter_m": 50.0,
+    "density_kg_m3": 3000.0,
+    "material_type": "crystalline",
+    "entry_speed_m_s": 20000.0,
+    "entry_angle_deg": 45.0,
+    "azimuth_deg": 90.0,
+    "aim_point": {"lat": 0.1, "lon": 0.1},
+}
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeSBDB(BaseAdapter):
+    """Transport answering every search with one status, or timing out."""
+
+    def __init__(self, status_code=200, timeout=False):
+        super().__init__()
+        self.status_code = status_code
+        self.timeout = timeout
+
+    def send(self, request, **kwargs):
+        if self.timeout:
+            raise requests.ReadTimeout("read timed out")
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = b'{"object": {"spkid": "20099942"}}'
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def population_raster(tmp_path, monkeypatch, write_raster):
+    path = write_raster(
+        str(tmp_path / "pop.tif"),
+        np.ones((400, 400)),
+        origin=(-50_000.0, 50_000.0),
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    yield path
+    dataset_manager.clear()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def post_simulation(client):
+    return client.post(
+        reverse("simulations_compute_view"),
+        {"inputs": INPUTS},
+        content_type="application/json",
+    )
+
+
+def test_compute_records_latency_stages_and_cache(client):
+    endpoint = {"endpoint": "simulations_compute_view", "method": "POST"}
+    before = {
+        "requests": sample(
+            "asteroidsim_http_request_duration_seconds_count", **endpoint
+        ),
+        "ok": sample("asteroidsim_http_requests_total", status="200", **endpoint),
+        "population": sample(
+            "asteroidsim_stage_duration_seconds_count", stage="population"
+        ),
+        "hits": sample("asteroidsim_simulation_cache_lookups_total", result="hit"),
+        "misses": sample("asteroidsim_simulation_cache_lookups_total", result="miss"),
+        "pixels": sample("asteroidsim_raster_pixels_read_total"),
+    }
+
+    post_simulation(client)
+    post_simulation(client)
+
+    assert (
+        sample("asteroidsim_http_request_duration_seconds_count", **endpoint)
+        == before["requests"] + 2
+    )
+    assert (
+        sample("asteroidsim_http_requests_total", status="200", **endpoint)
+        == before["ok"] + 2
+    )
+    # Only the first request runs the pipeline, the second is a cache hit
+    assert (
+        sample("asteroidsim_stage_duration_seconds_count", stage="population")
+        == before["population"] + 1
+    )
+    assert (
+        sample("asteroidsim_simulation_cache_lookups_total", result="miss")
+        == before["misses"] + 1
+    )
+    assert (
+        sample("asteroidsim_simulation_cache_lookups_total", result="hit")
+        == before["hits"] + 1
+    )
+    assert sample("asteroidsim_raster_pixels_read_total") > before["pixels"]
+
+
+def test_metrics_endpoint(client):
+    post_simulation(client)
+    response = client.get(reverse("metrics_view"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert 'asteroidsim_stage_duration_seconds_bucket{le="0.001",stage="energy"}' in (
+        body
+    )
+    assert "asteroidsim_simulation_cache_lookups_total" in body
+
+
+def test_metrics_endpoint_can_be_disabled(client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    assert client.get(reverse("metrics_view")).status_code == 404
+
+
+def test_unmatched_paths_share_one_series(client):
+    before = sample(
+        "asteroidsim_http_requests_total",
+        endpoint="unmatched",
+        method="GET",
+        status="404",
+    )
+    client.get("/no/such/page/")
+    client.get("/another/missing/page/")
+    assert (
+        sample(
+            "asteroidsim_http_requests_total",
+            endpoint="unmatched",
+            method="GET",
+            status="404",
+        )
+        == before + 2
+    )
+
+
+def test_sbdb_calls_errors_and_latency():
+    calls = sample("asteroidsim_sbdb_requests_total")
+    timeouts = sample("asteroidsim_sbdb_errors_total", reason="timeout")
+    http_errors = sample("asteroidsim_sbdb_errors_total", reason="http")
+    latencies = sample("asteroidsim_sbdb_request_duration_seconds_count")
+
+    SBDBClient(transport=FakeSBDB(), cache_dir=None).lookup("Apophis")
+    with pytest.raises(SBDBError):
+        SBDBClient(transport=FakeSBDB(timeout=True), cache_dir=None).lookup("slow")
+    with pytest.raises(SBDBError):
+        SBDBClient(transport=FakeSBDB(503), cache_dir=None).lookup("down")
+
+    assert sample("asteroidsim_sbdb_requests_total") == calls + 3
+    assert sample("asteroidsim_sbdb_errors_total", reason="timeout") == timeouts + 1
+    assert sample("asteroidsim_sbdb_errors_total", reason="http") == http_errors + 1
+    assert sample("asteroidsim_sbdb_request_duration_seconds_count") == latencies + 3
+
+
+def test_mapped_bytes_follow_dataset_cache(tmp_path, monkeypatch, population_raster):
+    sat_path = str(tmp_path / "pop_sat.npy")
+    write_summed_area_table(RasterDataset.open(population_raster), sat_path)
+    monkeypatch.setenv("DATASET_GHS_POP_SAT_URL", sat_path)
+
+    get_population_sat()
+    assert sample(
+        "asteroidsim_raster_mapped_bytes", dataset=GHS_POP_SAT_DATASET
+    ) == pytest.approx(401 * 401 * 8)
+
+    dataset_manager.clear()
+    assert sample("asteroidsim_raster_mapped_bytes", dataset=GHS_POP_SAT_DATASET) == 0
+
+
+def test_scrape_merges_worker_files(tmp_path, monkeypatch):
+    # A worker process records into the shared directory, this process
+    # (standing in for the one answering the scrape) only reads the files
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    worker = (
+        "from asteroid import metrics; "
+        "metrics.SIMULATION_CACHE_LOOKUPS.labels('hit').inc(3); "
+        "metrics.STAGE_SECONDS.labels('population').observe(0.02)"
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", worker], env=env, cwd=backend_dir, check=True
+        )
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    registry = metrics.metrics_registry()
+    assert registry is not REGISTRY
+    assert (
+        registry.get_sample_value(
+            "asteroidsim_simulation_cache_lookups_total", {"result": "hit"}
+        )
+        == 6
+    )
+    assert (
+        registry.get_sample_value(
+            "asteroidsim_stage_duration_seconds_count", {"stage": "population"}
+        )
+        == 2
+    )
+    assert b"asteroidsim_stage_duration_seconds_bucket" in metrics.render_metrics()
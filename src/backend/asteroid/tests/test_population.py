@@ -0,0 +1,283 @@
+import numpy as np
+import pytest
+from pyproj import Transformer
+
+from asteroid import population
+from asteroid.datasets import (RasterDataset, write_population_pyramid,
+                               write_summed_area_table, write_tiled_raster)
+from asteroid.population import (get_annulus_populations,
+                                 get_population_in_radius)
+
+RESOLUTION_M = 250.0
+
+
+@pytest.fixture
+def population_raster(tmp_path, monkeypatch, write_raster):
+    """16x16 raster centred on (0, 0) in ESRI:54009 with pixel value = 1."""
+    path = str(tmp_path / "pop.tif")
+    write_raster(
+        path,
+        np.ones((16, 16)),
+        resolution=RESOLUTION_M,
+        origin=(-8 * RESOLUTION_M, 8 * RESOLUTION_M),
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    return path
+
+
+def brute_force_disc(radius_m: float) -> float:
+    centres = (np.arange(16) - 7.5) * RESOLUTION_M
+    xx, yy = np.meshgrid(centres, centres)
+    return float(np.sum(np.sqrt(xx**2 + yy**2) <= radius_m))
+
+
+@pytest.mark.parametrize("radius_m", [200.0, 400.0, 750.0, 1_000.0, 1_500.0])
+def test_population_in_radius_matches_brute_force(population_raster, radius_m):
+    assert get_population_in_radius(0.0, 0.0, radius_m) == brute_force_disc(radius_m)
+
+
+@pytest.mark.parametrize("radius_m", [200.0, 750.0, 1_500.0])
+def test_tiled_store_matches_brute_force(
+    population_raster, tmp_path, monkeypatch, radius_m
+):
+    manifest = write_tiled_raster(
+        RasterDataset.open(population_raster), str(tmp_path / "tiles"), tile_size=5
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_TILES_URL", manifest)
+    assert get_population_in_radius(0.0, 0.0, radius_m) == brute_force_disc(radius_m)
+
+
+def test_annuli_match_differences_of_discs(population_raster):
+    radii = [200.0, 400.0, 750.0, 1_000.0, 1_500.0]
+    got = get_annulus_populations(0.0, 0.0, radii)
+
+    discs = [brute_force_disc(r) for r in radii]
+    expected = np.diff(discs, prepend=0.0)
+    np.testing.assert_allclose(got, expected)
+    assert got.sum() == pytest.approx(discs[-1])
+
+
+def test_annuli_repeated_radius_is_empty(population_raster):
+    got = get_annulus_populations(0.0, 0.0, [500.0, 500.0, 1_000.0])
+    assert got[1] == 0.0
+
+
+def test_sub_pixel_radius_is_scaled(population_raster):
+    # Smaller than half a pixel: nearest pixels scaled by radius / resolution
+    radius_m = 25.0
+    expected = brute_force_disc(RESOLUTION_M / 2) * radius_m / RESOLUTION_M
+    assert get_population_in_radius(0.0, 0.0, radius_m) == pytest.approx(expected)
+
+
+def test_zero_radius_has_no_population(population_raster):
+    got = get_annulus_populations(0.0, 0.0, [0.0, 500.0])
+    assert got[0] == 0.0
+    assert got[1] == brute_force_disc(500.0)
+
+
+@pytest.mark.parametrize(
+    "bad_radii",
+    [[], [[1.0, 2.0]], [2.0, 1.0], [-1.0, 1.0], [1.0, float("nan")]],
+)
+def test_annuli_reject_bad_radii(population_raster, bad_radii):
+    with pytest.raises(ValueError):
+        get_annulus_populations(0.0, 0.0, bad_radii)
+
+
+def test_population_in_radius_raises_instead_of_returning_none(
+    population_raster, monkeypatch
+):
+    with pytest.raises(ValueError):
+        get_population_in_radius(0.0, 0.0, -1.0)
+
+    monkeypatch.setenv("DATASET_GHS_POP_URL", str(population_raster) + ".missing")
+    with pytest.raises(OSError):
+        get_population_in_radius(0.0, 0.0, 500.0)
+
+
+@pytest.fixture
+def random_population_sat(tmp_path, monkeypatch, write_raster):
+    """64x64 random raster plus its summed-area table, SAT used for every query."""
+    values = np.random.default_rng(0).uniform(0, 100, size=(64, 64))
+    path = write_raster(
+        str(tmp_path / "random.tif"),
+        values,
+        resolution=RESOLUTION_M,
+        origin=(-32 * RESOLUTION_M, 32 * RESOLUTION_M),
+    )
+    sat_path = str(tmp_path / "random_sat.npy")
+    write_summed_area_table(RasterDataset.open(path), sat_path)
+
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    monkeypatch.setenv("DATASET_GHS_POP_SAT_URL", sat_path)
+    return path
+
+
+def exact_annuli(radii, monkeypatch):
+    monkeypatch.setattr(population, "SAT_MIN_WINDOW_PIXELS", np.inf)
+    return get_annulus_populations(0.0, 0.0, radii)
+
+
+def test_sat_single_row_bands_match_exact_masking(random_population_sat, monkeypatch):
+    radii = [300.0, 1_000.0, 2_500.0, 6_000.0]
+    expected = exact_annuli(radii, monkeypatch)
+
+    monkeypatch.setattr(population, "SAT_MIN_WINDOW_PIXELS", 0)
+    monkeypatch.setattr(population, "SAT_MAX_ERROR", 0.0)
+    got = get_annulus_populations(0.0, 0.0, radii)
+
+    np.testing.assert_allclose(got, expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize("max_error", [0.05, 0.2])
+def test_sat_banded_discs_stay_within_error_bound(
+    random_population_sat, monkeypatch, max_error
+):
+    radius_m = 7_000.0
+    expected = exact_annuli([radius_m], monkeypatch)[0]
+
+    monkeypatch.setattr(population, "SAT_MIN_WINDOW_PIXELS", 0)
+    monkeypatch.setattr(population, "SAT_MAX_ERROR", max_error)
+    got = get_annulus_populations(0.0, 0.0, [radius_m])[0]
+
+    assert got == pytest.approx(expected, rel=max_error)
+
+
+def test_sat_is_skipped_for_small_windows(random_population_sat, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("SAT path used for a small query")
+
+    monkeypatch.setattr(population, "_disc_population_sat", fail)
+    get_annulus_populations(0.0, 0.0, [500.0])
+
+
+@pytest.mark.parametrize("max_error", [0.01, 0.05, 0.2])
+def test_sat_error_bound_holds_for_people_on_the_disc_edge(
+    tmp_path, monkeypatch, write_raster, max_error
+):
+    # Everyone lives in a thin ring around the disc boundary, where the bands
+    # misassign pixels, and nobody inside it
+    radius_m = 7_000.0
+    centres = (np.arange(64) - 31.5) * RESOLUTION_M
+    distances = np.hypot(*np.meshgrid(centres, centres))
+    values = np.where(abs(distances - radius_m) < 2 * RESOLUTION_M, 1_000.0, 0.0)
+    path = write_raster(
+        str(tmp_path / "ring.tif"),
+        values,
+        resolution=RESOLUTION_M,
+        origin=(-32 * RESOLUTION_M, 32 * RESOLUTION_M),
+    )
+    sat_path = str(tmp_path / "ring_sat.npy")
+    write_summed_area_table(RasterDataset.open(path), sat_path)
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    monkeypatch.setenv("DATASET_GHS_POP_SAT_URL", sat_path)
+    expected = exact_annuli([radius_m], monkeypatch)[0]
+
+    monkeypatch.setattr(population, "SAT_MIN_WINDOW_PIXELS", 0)
+    monkeypatch.setattr(population, "SAT_MAX_ERROR", max_error)
+    got = get_annulus_populations(0.0, 0.0, [radius_m])[0]
+
+    assert got == pytest.approx(expected, rel=max_error)
+
+
+@pytest.fixture
+def global_population_sat(tmp_path, monkeypatch, write_raster):
+    """Global 50 km Mollweide raster, 1 per pixel inside the ellipse, plus SAT."""
+    resolution_m = 50_000.0
+    origin = (-18_041_000.0, 9_000_000.0)
+    xs = origin[0] + (np.arange(722) + 0.5) * resolution_m
+    ys = origin[1] - (np.arange(360) + 0.5) * resolution_m
+    xx, yy = np.meshgrid(xs, ys)
+    to_lonlat = Transformer.from_crs("ESRI:54009", "EPSG:4326", always_xy=True)
+    lons, _ = to_lonlat.transform(xx, yy)
+    values = (np.abs(lons) <= 180.0).astype(np.float64)
+
+    path = write_raster(
+        str(tmp_path / "global.tif"), values, resolution=resolution_m, origin=origin
+    )
+    sat_path = str(tmp_path / "global_sat.npy")
+    write_summed_area_table(RasterDataset.open(path), sat_path)
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    monkeypatch.setenv("DATASET_GHS_POP_SAT_URL", sat_path)
+    return path
+
+
+@pytest.mark.parametrize("latitude", [0.0, -17.0, 45.0, 65.0])
+def test_discs_across_the_dateline_count_both_sides(
+    global_population_sat, monkeypatch, latitude
+):
+    radius_m = 200_000.0
+    monkeypatch.setattr(population, "SAT_MIN_WINDOW_PIXELS", np.inf)
+    inland = get_population_in_radius(latitude, 0.0, radius_m)
+    exact = get_population_in_radius(latitude, 179.9, radius_m)
+
+    monkeypatch.setattr(population, "SAT_MIN_WINDOW_PIXELS", 0)
+    monkeypatch.setattr(population, "SAT_MAX_ERROR", 0.0)
+    sat = get_population_in_radius(latitude, 179.9, radius_m)
+
+    # Half of the disc lies across the antimeridian of its own latitude
+    assert exact == pytest.approx(inland, rel=0.1)
+    assert sat == pytest.approx(exact, rel=0.1)
+
+
+@pytest.fixture
+def population_pyramid(tmp_path, monkeypatch, write_raster):
+    """128x128 uniform raster plus a 4x / 16x pyramid."""
+    path = write_raster(
+        str(tmp_path / "uniform.tif"),
+        np.ones((128, 128)),
+        resolution=RESOLUTION_M,
+        origin=(-64 * RESOLUTION_M, 64 * RESOLUTION_M),
+    )
+    manifest = write_population_pyramid(
+        RasterDataset.open(path), str(tmp_path / "pyramid"), factor=4, levels=2
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    monkeypatch.setenv("DATASET_GHS_POP_PYRAMID_URL", manifest)
+    monkeypatch.setattr(population, "PYRAMID_MIN_PIXELS_ACROSS", 8)
+    return manifest
+
+
+def test_pyramid_level_selection(population_pyramid, monkeypatch):
+    calls = []
+    disc_populations = population._disc_populations
+
+    def record(grid, latitude, longtitude, radii, use_sat):
+        calls.append((abs(grid.resolution[0]), radii.tolist()))
+        return disc_populations(grid, latitude, longtitude, radii, use_sat)
+
+    monkeypatch.setattr(population, "_disc_populations", record)
+    get_annulus_populations(0.0, 0.0, [500.0, 1_000.0, 5_000.0, 20_000.0])
+
+    # 8 pixels across: 4 km radius needed for 1 km pixels, 16 km for 4 km ones
+    assert calls == [
+        (250.0, [500.0, 1_000.0]),
+        (1_000.0, [5_000.0]),
+        (4_000.0, [20_000.0]),
+    ]
+
+
+def test_pyramid_populations_close_to_full_resolution(population_pyramid, monkeypatch):
+    radii = [400.0, 3_000.0, 12_000.0]
+    got = get_annulus_populations(0.0, 0.0, radii)
+
+    monkeypatch.delenv("DATASET_GHS_POP_PYRAMID_URL")
+    expected = get_annulus_populations(0.0, 0.0, radii)
+
+    assert got[0] == expected[0]
+    assert np.all(got >= 0)
+    assert got.sum() == pytest.approx(expected.sum(), rel=0.1)
+
+
+def test_pyramid_takes_precedence_over_sat(population_pyramid, tmp_path, monkeypatch):
+    sat_path = str(tmp_path / "uniform_sat.npy")
+    write_summed_area_table(RasterDataset.open(str(tmp_path / "uniform.tif")), sat_path)
+    monkeypatch.setenv("DATASET_GHS_POP_SAT_URL", sat_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("SAT path used although the pyramid serves the disc")
+
+    # Windows at full resolution stay below 8 px across times the factor 4
+    monkeypatch.setattr(population, "SAT_MIN_WINDOW_PIXELS", 32 * 32)
+    monkeypatch.setattr(population, "_disc_population_sat", fail)
+    get_annulus_populations(0.0, 0.0, [500.0, 3_000.0, 12_000.0])
@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+from affine import Affine
+from pyproj import Transformer
+
+from asteroid.raster import (PixelWindow, antimeridian_columns, pixel_axes,
+                             pixel_index, pixel_to_world, read_pixel_window,
+                             window_around, world_to_pixel,
+                             wrap_period_in_columns)
+
+# 10 x 8 raster of 250 m pixels, top-left corner at (-1000, 1000)
+TRANSFORM = Affine(250.0, 0.0, -1000.0, 0.0, -250.0, 1000.0)
+WIDTH = 10
+HEIGHT = 8
+
+
+# Global 50 km Mollweide grid laid out like GHSL
+MOLLWEIDE_TRANSFORM = Affine(50_000.0, 0.0, -18_041_000.0, 0.0, -50_000.0, 9_000_000.0)
+MOLLWEIDE_WIDTH = 722
+MOLLWEIDE_HEIGHT = 360
+
+
+class ArrayDataset:
+    def __init__(self, values, wrap_columns=None, crs=None, transform=TRANSFORM):
+        self.values = values
+        self.height, self.width = values.shape
+        self.wrap_columns = wrap_columns
+        self.crs = crs
+        self.transform = transform
+
+    def read_window(self, row_start, row_stop, col_start, col_stop):
+        return self.values[row_start:row_stop, col_start:col_stop].astype(np.float64)
+
+
+def test_world_to_pixel_origin_and_centre():
+    assert world_to_pixel(TRANSFORM, -1000.0, 1000.0) == (0.0, 0.0)
+    assert world_to_pixel(TRANSFORM, -875.0, 875.0) == (0.5, 0.5)
+
+
+@pytest.mark.parametrize("col, row", [(0, 0), (3, 5), (9, 7)])
+def test_pixel_to_world_round_trip(col, row):
+    x, y = pixel_to_world(TRANSFORM, col, row)
+    assert world_to_pixel(TRANSFORM, x, y) == (col + 0.5, row + 0.5)
+    assert pixel_index(TRANSFORM, x, y, WIDTH, HEIGHT) == (row, col)
+
+
+def test_pixel_index_clamps_outside_points():
+    assert pixel_index(TRANSFORM, -5_000.0, 5_000.0, WIDTH, HEIGHT) == (0, 0)
+    assert pixel_index(TRANSFORM, 5_000.0, -5_000.0, WIDTH, HEIGHT) == (7, 9)
+
+
+def test_pixel_index_wraps_columns():
+    # One pixel past the right edge of a globe 10 columns wide
+    assert pixel_index(TRANSFORM, 1_600.0, 0.0, WIDTH, HEIGHT, wrap_columns=10) == (
+        4,
+        0,
+    )
+
+
+def test_rotated_transform_is_rejected():
+    with pytest.raises(ValueError):
+        world_to_pixel(Affine(250.0, 1.0, 0.0, 0.0, -250.0, 0.0), 0.0, 0.0)
+
+
+def test_window_around_is_clamped_without_wrap():
+    window = window_around(TRANSFORM, WIDTH, HEIGHT, -900.0, 900.0, 500.0)
+    assert window == PixelWindow(0, 3, 0, 3)
+
+
+def test_window_around_crosses_edge_with_wrap():
+    window = window_around(TRANSFORM, WIDTH, HEIGHT, -900.0, 0.0, 500.0, 10)
+    assert window.col_start == -3
+    assert window.col_stop == 3
+
+
+def test_pixel_axes_are_pixel_centres():
+    xs, ys = pixel_axes(TRANSFORM, PixelWindow(1, 3, -1, 2))
+    np.testing.assert_allclose(xs, [-1125.0, -875.0, -625.0])
+    np.testing.assert_allclose(ys, [625.0, 375.0])
+
+
+def test_read_pixel_window_inside_raster():
+    values = np.arange(HEIGHT * WIDTH).reshape(HEIGHT, WIDTH)
+    got = read_pixel_window(ArrayDataset(values), PixelWindow(1, 3, 2, 5))
+    np.testing.assert_array_equal(got, values[1:3, 2:5])
+
+
+def test_read_pixel_window_stitches_antimeridian():
+    values = np.arange(HEIGHT * WIDTH).reshape(HEIGHT, WIDTH)
+    dataset = ArrayDataset(values, wrap_columns=WIDTH)
+
+    left = read_pixel_window(dataset, PixelWindow(0, 2, -2, 2))
+    np.testing.assert_array_equal(left, values[0:2, [8, 9, 0, 1]])
+
+    right = read_pixel_window(dataset, PixelWindow(0, 2, 8, 12))
+    np.testing.assert_array_equal(right, values[0:2, [8, 9, 0, 1]])
+
+
+def test_read_pixel_window_pads_columns_missing_after_wrap():
+    # Period longer than the raster: wrapped columns beyond it read as 0
+    values = np.ones((HEIGHT, WIDTH))
+    dataset = ArrayDataset(values, wrap_columns=12)
+    got = read_pixel_window(dataset, PixelWindow(0, 1, -3, 1))
+    # Columns -3..0 map to 9, 10, 11, 0 and the raster has no columns 10, 11
+    np.testing.assert_array_equal(got, [[1.0, 0.0, 0.0, 1.0]])
+
+
+def test_wrap_period_geographic_global_raster():
+    transform = Affine(0.5, 0.0, -180.0, 0.0, -0.5, 90.0)
+    assert wrap_period_in_columns("EPSG:4326", transform, 720) == 720
+    assert wrap_period_in_columns("EPSG:4326", transform, 100) is None
+
+
+def test_wrap_period_mollweide_global_raster():
+    # GHSL 250 m grid: 36 082 000 m wide, Mollweide equator ~36 080 191 m
+    transform = Affine(250.0, 0.0, -18_041_000.0, 0.0, -250.0, 9_000_000.0)
+    assert wrap_period_in_columns("ESRI:54009", transform, 144_328) == 144_321
+    assert wrap_period_in_columns("ESRI:54009", transform, 400) is None
+
+
+def mollweide_dataset():
+    """Global ESRI:54009 grid whose pixel values are their flat index."""
+    values = np.arange(MOLLWEIDE_HEIGHT * MOLLWEIDE_WIDTH, dtype=np.float64)
+    values = values.reshape(MOLLWEIDE_HEIGHT, MOLLWEIDE_WIDTH)
+    wrap_columns = wrap_period_in_columns(
+        "ESRI:54009", MOLLWEIDE_TRANSFORM, MOLLWEIDE_WIDTH
+    )
+    return ArrayDataset(values, wrap_columns, "ESRI:54009", MOLLWEIDE_TRANSFORM)
+
+
+def test_antimeridian_columns_move_inwards_off_the_equator():
+    dataset = mollweide_dataset()
+    equator, fiji, north = 180, 214, 35  # rows at about 0, -17 and 65 degrees
+    west, east = antimeridian_columns(dataset, np.array([equator, fiji, north]))
+
+    assert east[0] - west[0] == dataset.wrap_columns
+    assert list(east[1:] - west[1:]) < [dataset.wrap_columns] * 2
+    assert east[2] - west[2] < east[1] - west[1]
+    # Pixel centres of the last column before the antimeridian are within it
+    to_lonlat = Transformer.from_crs("ESRI:54009", "EPSG:4326", always_xy=True)
+    for row, col in zip([equator, fiji, north], east - 1):
+        x, y = pixel_to_world(MOLLWEIDE_TRANSFORM, col, row)
+        lon, _ = to_lonlat.transform(x, y)
+        assert 170.0 < lon <= 180.0
+
+
+@pytest.mark.parametrize("latitude", [0.0, -17.0, 45.0, 65.0])
+def test_read_pixel_window_wraps_at_the_rows_antimeridian(latitude):
+    dataset = mollweide_dataset()
+    to_xy = Transformer.from_crs("EPSG:4326", "ESRI:54009", always_xy=True)
+    center_x, center_y = to_xy.transform(179.9, latitude)
+    far_x, far_y = to_xy.transform(-179.9, latitude)
+    window = window_around(
+        MOLLWEIDE_TRANSFORM,
+        MOLLWEIDE_WIDTH,
+        MOLLWEIDE_HEIGHT,
+        center_x,
+        center_y,
+        150_000.0,
+        dataset.wrap_columns,
+    )
+
+    values = read_pixel_window(dataset, window)
+
+    # The pixel just across the dateline is read next to the centre, from the
+    # other edge of the ellipse at that latitude
+    row, far_col = pixel_index(
+        MOLLWEIDE_TRANSFORM, far_x, far_y, MOLLWEIDE_WIDTH, MOLLWEIDE_HEIGHT
+    )
+    _, center_col = pixel_index(
+        MOLLWEIDE_TRANSFORM, center_x, center_y, MOLLWEIDE_WIDTH, MOLLWEIDE_HEIGHT
+    )
+    near = values[row - window.row_start, center_col - window.col_start :][:3]
+    assert dataset.values[row, far_col] in near
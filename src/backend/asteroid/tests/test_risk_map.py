@@ -0,0 +1,136 @@
+from io import StringIO
+
+import numpy as np
+import pytest
+import rasterio
+from django.core.management import call_command
+from pyproj import Transformer
+
+from asteroid.datasets import RasterDataset
+from asteroid.population import get_disc_populations
+from asteroid.raster import PixelWindow, pixel_to_world
+from asteroid.risk_map import (CasualtyRiskMap, casualty_kernel,
+                               convolve_population, write_casualty_risk_map)
+
+RESOLUTION_M = 250.0
+# Off the pixel-distance lattice, so no pixel centre sits exactly on a ring
+RADII_M = [320.0, 640.0, 1_030.0]
+RATES = [1.0, 0.5, 0.1]
+
+
+@pytest.fixture
+def grid(tmp_path, monkeypatch, write_raster):
+    """40x50 random raster centred on (0, 0) in ESRI:54009."""
+    values = np.random.default_rng(0).uniform(0, 100, size=(40, 50))
+    path = write_raster(
+        str(tmp_path / "pop.tif"),
+        values,
+        resolution=RESOLUTION_M,
+        origin=(-25 * RESOLUTION_M, 20 * RESOLUTION_M),
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    return RasterDataset.open(path)
+
+
+def direct_convolution(values, kernel):
+    radius = kernel.shape[0] // 2
+    padded = np.pad(values, radius)
+    out = np.zeros_like(values)
+    for dr in range(kernel.shape[0]):
+        for dc in range(kernel.shape[1]):
+            out += (
+                kernel[dr, dc]
+                * padded[dr : dr + values.shape[0], dc : dc + values.shape[1]]
+            )
+    return out
+
+
+def test_kernel_weights_rings_by_pixel_centre():
+    kernel = casualty_kernel(RADII_M, RATES, RESOLUTION_M)
+
+    assert kernel.shape == (9, 9)
+    assert kernel[4, 4] == 1.0
+    assert kernel[4, 5] == 1.0  # 250 m
+    assert kernel[4, 6] == 0.5  # 500 m
+    assert kernel[4, 8] == 0.1  # 1000 m
+    assert kernel[0, 0] == 0.0  # corner, outside
+    np.testing.assert_array_equal(kernel, kernel.T)
+
+
+@pytest.mark.parametrize("tile_size, workers", [(7, 1), (16, 1), (1024, 1), (9, 2)])
+def test_overlap_add_matches_direct_convolution(grid, tile_size, workers):
+    kernel = casualty_kernel(RADII_M, RATES, RESOLUTION_M)
+    window = PixelWindow(0, grid.height, 0, grid.width)
+    out = np.zeros(window.shape)
+
+    convolve_population(grid, kernel, window, out, tile_size, workers)
+
+    expected = direct_convolution(grid.read_window(*window), kernel)
+    np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_map_matches_exact_disc_queries(grid, tmp_path):
+    risk_map = write_casualty_risk_map(
+        grid, casualty_kernel(RADII_M, RATES, RESOLUTION_M), str(tmp_path / "m.npy")
+    )
+
+    row, col = 17, 23
+    x, y = pixel_to_world(grid.transform, col, row)
+    lon, lat = Transformer.from_crs(grid.crs, "EPSG:4326", always_xy=True).transform(
+        x, y
+    )
+    discs = get_disc_populations(lat, lon, RADII_M)
+    expected = float(np.diff(discs, prepend=0.0) @ RATES)
+
+    assert risk_map.values[row, col] == pytest.approx(expected, rel=1e-9)
+    assert risk_map.expected_deaths(lat, lon) == pytest.approx(expected, rel=1e-9)
+
+
+def test_window_is_a_slice_of_the_full_map(grid, tmp_path):
+    kernel = casualty_kernel(RADII_M, RATES, RESOLUTION_M)
+    full = write_casualty_risk_map(grid, kernel, str(tmp_path / "full.npy"))
+
+    window = PixelWindow(5, 30, 10, 22)
+    part = write_casualty_risk_map(
+        grid, kernel, str(tmp_path / "part.npy"), window=window, tile_size=8
+    )
+
+    np.testing.assert_allclose(part.values, full.values[5:30, 10:22], rtol=1e-9)
+    assert part.transform.c == full.transform.c + 10 * RESOLUTION_M
+    assert part.transform.f == full.transform.f - 5 * RESOLUTION_M
+
+
+def test_query_outside_map_raises(grid, tmp_path):
+    kernel = casualty_kernel(RADII_M, RATES, RESOLUTION_M)
+    risk_map = write_casualty_risk_map(grid, kernel, str(tmp_path / "m.npy"))
+
+    with pytest.raises(ValueError):
+        risk_map.expected_deaths(45.0, 0.0)
+
+
+def test_export_geotiff(grid, tmp_path):
+    kernel = casualty_kernel(RADII_M, RATES, RESOLUTION_M)
+    risk_map = write_casualty_risk_map(grid, kernel, str(tmp_path / "m.npy"))
+
+    risk_map.export_geotiff(str(tmp_path / "m.tif"), block_rows=7)
+
+    with rasterio.open(tmp_path / "m.tif") as src:
+        assert src.transform == risk_map.transform
+        np.testing.assert_allclose(src.read(1), risk_map.values, rtol=1e-6)
+
+
+def test_build_casualty_map_command(grid, tmp_path):
+    output = str(tmp_path / "cmd.npy")
+    call_command(
+        "build_casualty_map",
+        diameter=50.0,
+        output=output,
+        bbox=[-0.02, -0.02, 0.02, 0.02],
+        workers=1,
+        stdout=StringIO(),
+    )
+
+    risk_map = CasualtyRiskMap.open(output)
+    assert risk_map.impactor["diameter_m"] == 50.0
+    assert 0 < risk_map.height < grid.height
+    assert np.all(risk_map.values >= 0)
@@ -0,0 +1,197 @@
+import threading
+
+import pytest
+from django.urls import reverse
+
+from asteroid import search
+from asteroid.catalog import upsert_catalog
+from asteroid.search import (
+    NameSearchIndex,
+    StringTable,
+    normalize_search_key,
+    search_keys,
+)
+
+OBJECTS = [
+    (20000433, "Eros", "433", "433 Eros (A898 PA)"),
+    (20099942, "Apophis", "99942", "99942 Apophis (2004 MN4)"),
+    (20101955, "Bennu", "101955", "101955 Bennu (1999 RQ36)"),
+    (54520000, "", "2024 YR4", "(2024 YR4)"),
+    (54000001, "", "2024 YA", "(2024 YA)"),
+    (20002101, "Adonis", "2101", "2101 Adonis (1936 CA)"),
+]
+
+
+@pytest.fixture
+def index():
+    return NameSearchIndex(OBJECTS)
+
+
+def spkids(page):
+    return [result["spkid"] for result in page.results]
+
+
+def test_normalize_search_key():
+    assert normalize_search_key("  (99942)  Apophis ") == "99942 apophis"
+    assert normalize_search_key("2024 YR4") == "2024 yr4"
+
+
+def test_search_keys_include_provisional_designation():
+    assert search_keys("Apophis", "99942", "99942 Apophis (2004 MN4)") == [
+        "2004 mn4",
+        "99942",
+        "99942 apophis 2004 mn4",
+        "apophis",
+    ]
+    assert search_keys("", "2024 YR4", "(2024 YR4)") == ["2024 yr4"]
+
+
+def test_string_table_round_trips_unicode():
+    table = StringTable(["Eros", "", "Šteflová"])
+    assert len(table) == 3
+    assert list(table) == ["Eros", "", "Šteflová"]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("apoph", [20099942]),
+        ("APOPHIS", [20099942]),
+        ("99942", [20099942]),
+        ("(99942)", [20099942]),
+        ("2004 mn", [20099942]),
+        ("2024 y", [54000001, 54520000]),
+        ("2024 yr", [54520000]),
+        ("ceres", []),
+    ],
+)
+def test_prefix(index, query, expected):
+    page = index.prefix(query)
+    assert spkids(page) == expected
+    assert not page.fuzzy
+
+
+def test_prefix_lists_and_counts_object_once(index):
+    # "1" prefixes Bennu's number and full name, and Adonis' provisional
+    # designation "1936 ca"
+    page = index.prefix("1")
+    assert spkids(page) == [20101955, 20002101]
+    assert page.count == 2
+
+
+def test_prefix_pages_over_objects_not_keys():
+    # Both objects match "9994" through their number and their full name
+    index = NameSearchIndex(OBJECTS[1:2] + [(20099943, "", "99943", "99943 (2000 AA)")])
+    pages = [index.prefix("9994", offset=offset, limit=1) for offset in range(3)]
+    assert [spkids(page) for page in pages] == [[20099942], [20099943], []]
+    assert {page.count for page in pages} == {2}
+
+
+def test_prefix_pagination(index):
+    everything = index.prefix("2", limit=100)
+    first, second = index.prefix("2", limit=2), index.prefix("2", offset=2, limit=2)
+    assert first.count == second.count == everything.count
+    assert spkids(first) + spkids(second) == spkids(everything)[:4]
+
+
+def test_prefix_matches_every_prefix_of_every_key(index):
+    keys = {key: spkid for spkid, *names in OBJECTS for key in search_keys(*names)}
+    for key in keys:
+        for end in range(1, len(key) + 1):
+            expected = sorted(
+                {spkid for other, spkid in keys.items() if other.startswith(key[:end])}
+            )
+            page = index.prefix(key[:end], limit=100)
+            assert page.count == len(expected)
+            assert sorted(spkids(page)) == expected
+
+
+def test_fuzzy(index):
+    page = index.fuzzy("apofis")
+    assert page.fuzzy
+    assert spkids(page)[0] == 20099942
+    assert index.fuzzy("xyzzy").count == 0
+
+
+def test_search_falls_back_to_fuzzy(index):
+    assert spkids(index.search("benu")) == [20101955]
+    assert index.search("benu").fuzzy
+    assert index.search("benu", fuzzy=False).count == 0
+    assert index.search("bennu", fuzzy=True).fuzzy
+
+
+@pytest.mark.django_db
+def test_holder_rebuilds_when_catalog_changes():
+    holder = search._SearchIndexHolder()
+    upsert_catalog([{"spkid": "20000433", "name": "Eros", "pdes": "433"}])
+
+    first = holder.refresh()
+    assert holder.refresh() is first
+    assert len(first) == 1
+
+    upsert_catalog([{"spkid": "20099942", "name": "Apophis", "pdes": "99942"}])
+    assert len(holder.refresh()) == 2
+    assert holder.get() is not first
+
+
+def test_holder_never_builds_on_the_request_thread(monkeypatch):
+    holder = search._SearchIndexHolder()
+    started, release = threading.Event(), threading.Event()
+    built_on = []
+
+    def slow_refresh():
+        built_on.append(threading.current_thread())
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(holder, "refresh", slow_refresh)
+
+    # Requests get the (empty) current index while one build runs
+    assert len(holder.get()) == 0
+    assert holder.refresh_in_background() is None
+    assert len(holder.get()) == 0
+    assert started.wait(5)
+    release.set()
+
+    assert len(built_on) == 1 and built_on[0] is not threading.current_thread()
+
+
+@pytest.mark.django_db
+def test_search_view(client, monkeypatch):
+    monkeypatch.setattr(search, "search_index", search._SearchIndexHolder())
+    monkeypatch.setattr("asteroid.views.search_index", search.search_index)
+    upsert_catalog(
+        [
+            {"spkid": str(spkid), "name": name, "pdes": des, "full_name": full}
+            for spkid, name, des, full in OBJECTS
+        ]
+    )
+    search.search_index.refresh()
+
+    response = client.get(reverse("asteroid_search_view"), {"q": "apoph"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "count": 1,
+        "offset": 0,
+        "limit": 20,
+        "fuzzy": False,
+        "results": [
+            {
+                "spkid": 20099942,
+                "name": "Apophis",
+                "designation": "99942",
+                "full_name": "99942 Apophis (2004 MN4)",
+            }
+        ],
+    }
+
+    fuzzy = client.get(reverse("asteroid_search_view"), {"q": "apofis"}).json()
+    assert fuzzy["fuzzy"] and fuzzy["results"][0]["spkid"] == 20099942
+
+
+@pytest.mark.parametrize(
+    "params", [{}, {"q": " "}, {"q": "a", "limit": 0}, {"q": "a", "offset": "x"}]
+)
+def test_search_view_rejects_bad_params(client, params):
+    response = client.get(reverse("asteroid_search_view"), params)
+    assert response.status_code == 400
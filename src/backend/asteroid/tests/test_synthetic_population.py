@@ -0,0 +1,178 @@
+import math
+from io import StringIO
+
+import numpy as np
+import pytest
+import rasterio
+from django.core.management import CommandError, call_command
+
+from asteroid.datasets import GHS_POP_ENV, dataset_manager
+from asteroid.population import _lonlat_transformer, get_disc_populations
+from asteroid.synthetic_population import (GHSL_NODATA, GHSL_ORIGIN_M,
+                                           MOLLWEIDE_RADIUS_M, City,
+                                           SyntheticPopulation,
+                                           _gaussian_disc_mass, random_cities,
+                                           read_synthetic_population,
+                                           write_synthetic_population)
+
+CITIES = SyntheticPopulation(
+    density_per_km2=10.0,
+    cities=(
+        City(0.0, 0.0, 1e6, 4_000.0),
+        City(30_000.0, -20_000.0, 2e5, 2_000.0),
+    ),
+)
+
+
+def raster_sum(path, rows=slice(None), cols=slice(None)):
+    with rasterio.open(path) as src:
+        values = src.read(1).astype(np.float64)[rows, cols]
+        return values[values != src.nodata].sum()
+
+
+@pytest.fixture
+def cities_raster(tmp_path, monkeypatch):
+    path = str(tmp_path / "cities.tif")
+    write_synthetic_population(path, CITIES, 200, 160, resolution_m=500.0)
+    monkeypatch.setenv(GHS_POP_ENV, path)
+    yield path
+    dataset_manager.clear()
+
+
+def test_raster_sums_match_rectangle_integrals(cities_raster):
+    # 200x160 pixels of 500 m centred on (0, 0)
+    assert raster_sum(cities_raster) == pytest.approx(
+        CITIES.population_in_rect(-50_000.0, 50_000.0, -40_000.0, 40_000.0),
+        rel=1e-6,
+    )
+    # Rows 80-119 / columns 100-139 span x 0..20 km, y -20..0 km
+    assert raster_sum(cities_raster, slice(80, 120), slice(100, 140)) == pytest.approx(
+        CITIES.population_in_rect(0.0, 20_000.0, -20_000.0, 0.0), rel=1e-6
+    )
+
+
+@pytest.mark.parametrize("radius_m", [5_000.0, 10_000.0, 35_000.0])
+def test_disc_populations_match_disc_integrals(cities_raster, radius_m):
+    lon, lat = _lonlat_transformer("ESRI:54009").transform(
+        0.0, 0.0, direction="INVERSE"
+    )
+    got = get_disc_populations(lat, lon, [radius_m])[0]
+    # Pixel-centre masking differs from the exact disc by part of the rim
+    assert got == pytest.approx(CITIES.population_in_disc(0.0, 0.0, radius_m), rel=0.02)
+
+
+def test_gaussian_disc_mass():
+    assert _gaussian_disc_mass(0.0, 1.0, 1.0) == pytest.approx(1 - math.exp(-0.5))
+    # A disc through the centre of a far-off wide Gaussian holds about half
+    # of it, a disc far away none
+    assert _gaussian_disc_mass(1e6, 1e6, 1.0) == pytest.approx(0.5, abs=1e-3)
+    assert _gaussian_disc_mass(1e3, 10.0, 1.0) == 0.0
+    assert _gaussian_disc_mass(5.0, 100.0, 1.0) == pytest.approx(1.0)
+
+
+def test_uniform_pattern(tmp_path):
+    path = str(tmp_path / "uniform.tif")
+    write_synthetic_population(
+        path, SyntheticPopulation(density_per_km2=250.0), 64, 32, resolution_m=250.0
+    )
+    with rasterio.open(path) as src:
+        values = src.read(1)
+    assert np.all(values == pytest.approx(250.0 * 0.0625))
+
+
+def test_ocean_is_nodata(tmp_path):
+    path = str(tmp_path / "ocean.tif")
+    write_synthetic_population(path, SyntheticPopulation(ocean=True), 32, 32)
+    with rasterio.open(path) as src:
+        assert np.all(src.read(1) == GHSL_NODATA)
+    assert SyntheticPopulation(ocean=True).population_in_disc(0, 0, 1e5) == 0
+
+
+def test_ghsl_metadata_tiling_and_compression(tmp_path):
+    path = str(tmp_path / "tiled.tif")
+    write_synthetic_population(
+        path, CITIES, 100, 80, tile_size=32, compress="deflate", dtype="float64"
+    )
+    with rasterio.open(path) as src:
+        assert src.crs.to_string() == "ESRI:54009"
+        assert src.nodata == GHSL_NODATA
+        assert src.dtypes == ("float64",)
+        assert src.block_shapes == [(32, 32)]
+        assert src.compression.value == "DEFLATE"
+    assert read_synthetic_population(path) == CITIES
+
+
+def test_outside_mollweide_ellipse_is_nodata(tmp_path):
+    path = str(tmp_path / "corner.tif")
+    # 10 km pixels at the upper-left corner of the GHSL extent
+    write_synthetic_population(
+        path,
+        SyntheticPopulation(density_per_km2=1.0),
+        10,
+        10,
+        resolution_m=10_000.0,
+        origin_m=(-18_041_000.0, 9_000_000.0),
+    )
+    with rasterio.open(path) as src:
+        assert np.all(src.read(1) == GHSL_NODATA)
+
+
+def test_integrals_only_match_windows_inside_the_ellipse(tmp_path):
+    path = str(tmp_path / "globe.tif")
+    uniform = SyntheticPopulation(density_per_km2=1.0)
+    # The whole GHSL extent in 100 km pixels
+    write_synthetic_population(
+        path, uniform, 361, 180, resolution_m=100_000.0, origin_m=GHSL_ORIGIN_M
+    )
+
+    # Mollweide is equal-area, the ellipse holds 4 pi R^2 of the sphere
+    sphere_km2 = 4 * math.pi * (MOLLWEIDE_RADIUS_M / 1e3) ** 2
+    assert raster_sum(path) == pytest.approx(sphere_km2, rel=1e-2)
+    x_min, y_max = GHSL_ORIGIN_M
+    extent = uniform.population_in_rect(
+        x_min, x_min + 361 * 100_000.0, y_max - 180 * 100_000.0, y_max
+    )
+    assert extent > 1.2 * raster_sum(path)
+
+    # Rows 60-119 / columns 120-239 are well inside the ellipse
+    assert raster_sum(path, slice(60, 120), slice(120, 240)) == pytest.approx(
+        uniform.population_in_rect(
+            x_min + 120 * 100_000.0,
+            x_min + 240 * 100_000.0,
+            y_max - 120 * 100_000.0,
+            y_max - 60 * 100_000.0,
+        ),
+        rel=1e-6,
+    )
+
+
+def test_random_cities_are_deterministic_and_inside():
+    bounds_m = (-1e6, 1e6, -5e5, 5e5)
+    cities = random_cities(3, 20, bounds_m)
+    assert cities == random_cities(3, 20, bounds_m)
+    assert cities != random_cities(4, 20, bounds_m)
+    assert all(-1e6 < city.x_m < 1e6 and -5e5 < city.y_m < 5e5 for city in cities)
+    with pytest.raises(ValueError):
+        random_cities(0, 1, (0.0, 1e4, 0.0, 1e4))
+
+
+def test_command(tmp_path):
+    path = str(tmp_path / "cmd.tif")
+    call_command(
+        "make_synthetic_population",
+        path,
+        width=256,
+        height=256,
+        cities=5,
+        seed=1,
+        stdout=StringIO(),
+    )
+    population = read_synthetic_population(path)
+    assert len(population.cities) == 5
+    assert raster_sum(path) == pytest.approx(
+        population.population_in_rect(-128_000.0, 128_000.0, -128_000.0, 128_000.0),
+        rel=1e-6,
+    )
+
+    with pytest.raises(CommandError):
+        call_command("make_synthetic_population", path, tile_size=20, stdout=StringIO())
@@ -0,0 +1,119 @@
+import json
+import logging
+
+import numpy as np
+import pytest
+from django.urls import reverse
+
+from asteroid import metrics, timing
+from asteroid.datasets import dataset_manager
+
+INPUTS = {
+    "diameter_m": 50.0,
+    "density_kg_m3": 3000.0,
+    "material_type": "crystalline",
+    "entry_speed_m_s": 20000.0,
+    "entry_angle_deg": 45.0,
+    "azimuth_deg": 90.0,
+    "aim_point": {"lat": 0.1, "lon": 0.1},
+}
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def population_raster(tmp_path, monkeypatch, write_raster):
+    path = write_raster(
+        str(tmp_path / "pop.tif"),
+        np.ones((400, 400)),
+        origin=(-50_000.0, 50_000.0),
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    yield path
+    dataset_manager.clear()
+
+
+@pytest.fixture
+def timing_on():
+    timing.set_timing_enabled(True)
+    yield
+    timing.set_timing_enabled(False)
+
+
+def post_simulation(client, inputs=INPUTS):
+    return client.post(
+        reverse("simulations_compute_view"),
+        {"inputs": inputs},
+        content_type="application/json",
+    )
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+def test_disabled_sends_no_header(client):
+    response = post_simulation(client)
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
+
+
+def test_stage_and_count_outside_requests_are_noops(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    with timing.stage("energy") as stage:
+        timing.count("pixels", 10)
+    assert stage is timing._NULL_STAGE
+
+
+def test_compute_reports_stages_and_counters(client, timing_on):
+    metrics = parse_server_timing(post_simulation(client)["Server-Timing"])
+
+    for name in ("normalize", "storage", "energy", "population", "store", "total"):
+        assert float(metrics[name]["dur"]) >= 0
+    assert float(metrics["total"]["dur"]) >= float(metrics["population"]["dur"])
+    assert "cache_misses=1" in metrics["storage"]["desc"]
+    assert "pixels=" in metrics["population"]["desc"]
+
+    # The second request is served from storage without running the pipeline
+    metrics = parse_server_timing(post_simulation(client)["Server-Timing"])
+    assert "cache_hits=1" in metrics["storage"]["desc"]
+    assert "population" not in metrics
+
+
+def test_compute_logs_json_summary(client, timing_on, caplog):
+    with caplog.at_level(logging.INFO, logger="asteroid.timing"):
+        post_simulation(client)
+
+    (record,) = [r for r in caplog.records if r.name == "asteroid.timing"]
+    line = json.loads(record.getMessage())
+    assert line["event"] == "server_timing"
+    assert line["path"] == reverse("simulations_compute_view")
+    assert line["status"] == 200
+    assert line["stages"]["population"]["pixels"] > 0
+    assert line["stages"]["population"]["count"] == 1
+
+
+def test_stages_nest_and_sum():
+    timings = timing.RequestTimings()
+    token = timing._timings.set(timings)
+    try:
+        for _ in range(2):
+            with timing.stage("population"):
+                timing.count("pixels", 100)
+                with timing.stage("sat"):
+                    timing.count("sat_rects", 3)
+    finally:
+        timing._timings.reset(token)
+
+    summary = timings.summary()
+    assert summary["population"]["count"] == 2
+    assert summary["population"]["pixels"] == 200
+    assert summary["sat"]["sat_rects"] == 6
+    assert "sat_rects" not in summary["population"]
+    header = timings.server_timing_header(1.0)
+    assert header.endswith("total;dur=1.000")
+    assert "population;dur=" in header and 'desc="pixels=200"' in header
@@ -0,0 +1,157 @@
+import time
+
+import numpy as np
+import pytest
+
+from asteroid import uncertainty
+from asteroid.population import get_disc_populations
+from asteroid.simulations import run_simulation
+from asteroid.uncertainty import Distribution, run_uncertainty_simulation
+from asteroid.utils import normalize_params
+
+INPUTS = normalize_params(
+    {
+        "diameter_m": 50.0,
+        "density_kg_m3": 3000.0,
+        "material_type": "crystalline",
+        "entry_speed_m_s": 20000.0,
+        "entry_angle_deg": 45.0,
+        "aim_point": {"lat": 0.1, "lon": 0.1},
+    }
+)
+
+DISTRIBUTIONS = {
+    "diameter_m": {"type": "lognormal", "median": 50.0, "sigma": 0.3},
+    "density_kg_m3": {"type": "uniform", "low": 2_000.0, "high": 4_000.0},
+    "entry_speed_m_s": {"type": "normal", "mean": 20_000.0, "std": 3_000.0},
+}
+
+
+@pytest.fixture(autouse=True)
+def population_raster(tmp_path, monkeypatch, write_raster):
+    values = np.random.default_rng(0).uniform(0, 10, size=(400, 400))
+    path = write_raster(str(tmp_path / "pop.tif"), values, origin=(-50_000.0, 50_000.0))
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    return path
+
+
+def test_same_seed_reproduces_run():
+    first = run_uncertainty_simulation(INPUTS, DISTRIBUTIONS, samples=1_000, seed=7)
+    second = run_uncertainty_simulation(INPUTS, DISTRIBUTIONS, samples=1_000, seed=7)
+    other = run_uncertainty_simulation(INPUTS, DISTRIBUTIONS, samples=1_000, seed=8)
+
+    assert first == second
+    assert first["outputs"] != other["outputs"]
+
+
+def test_missing_seed_is_returned_for_replay():
+    first = run_uncertainty_simulation(INPUTS, DISTRIBUTIONS, samples=100)
+    replay = run_uncertainty_simulation(
+        INPUTS, DISTRIBUTIONS, samples=100, seed=first["seed"]
+    )
+    assert replay == first
+
+
+def test_fixed_inputs_collapse_to_single_simulation():
+    got = run_uncertainty_simulation(INPUTS, {}, samples=10, seed=0)["outputs"]
+    single = run_simulation("id", INPUTS)["panel"]
+
+    for p in ("p5", "p50", "p95"):
+        assert got["energy_released_megatons"][p] == single["energy_released_megatons"]
+        for ring, expected in zip(got["rings"], single["rings"]):
+            assert ring["radius_m"][p] == expected["radius_m"]
+        assert got["total_estimated_deaths"][p] == pytest.approx(
+            single["totals"]["total_estimated_deaths"], rel=0.02
+        )
+
+
+def test_percentiles_are_ordered_and_follow_inputs():
+    data = run_uncertainty_simulation(INPUTS, DISTRIBUTIONS, samples=5_000, seed=1)
+
+    diameter = data["inputs"]["diameter_m"]
+    assert diameter["p50"] == pytest.approx(50.0, rel=0.05)
+    assert diameter["p5"] == pytest.approx(50.0 * np.exp(-1.645 * 0.3), rel=0.05)
+    for stats in [data["outputs"]["energy_released_megatons"]] + [
+        ring["radius_m"] for ring in data["outputs"]["rings"]
+    ]:
+        assert stats["p5"] < stats["p50"] < stats["p95"]
+
+
+def test_population_is_read_at_the_aim_point(monkeypatch):
+    calls = []
+    get_profile = uncertainty.get_radial_population_profile
+
+    def record(lat, lon, max_radius_m, points):
+        calls.append((lat, lon))
+        return get_profile(lat, lon, max_radius_m, points)
+
+    monkeypatch.setattr(uncertainty, "get_radial_population_profile", record)
+    # No speed distribution: the fixed entry_speed_m_s input is used
+    run_uncertainty_simulation(INPUTS, {"diameter_m": 60.0}, samples=10, seed=0)
+
+    assert calls == [(0.1, 0.1)]
+
+
+def test_profile_interpolation_is_close_to_exact_discs():
+    # Sub-pixel, pixel-scale and large discs; pixel-scale discs are step
+    # functions of the radius, interpolation smooths them
+    radii = np.array([20.0, 100.0, 1_000.0, 10_000.0])
+    profile_radii, profile = uncertainty.get_radial_population_profile(
+        0.1, 0.1, radii[-1], uncertainty.PROFILE_POINTS
+    )
+
+    got = np.interp(radii**2, profile_radii**2, profile)
+
+    np.testing.assert_allclose(got, get_disc_populations(0.1, 0.1, radii), rtol=0.05)
+
+
+def test_samples_stay_in_valid_range():
+    samples = Distribution("normal", {"mean": 1.0, "std": 5.0}).sample(
+        np.random.default_rng(0), 10_000, 0.0, np.inf
+    )
+    assert np.all(samples > 0)
+
+
+@pytest.mark.parametrize(
+    "distributions",
+    [
+        {"diameter_m": {"type": "weibull"}},
+        {"diameter_m": {"type": "normal", "mean": 50.0}},
+        {"diameter_m": {"type": "uniform", "low": 5.0, "high": 1.0}},
+        {"diameter_m": {"type": "lognormal", "median": -1.0, "sigma": 0.1}},
+        {"diameter_m": "50"},
+        {"mass_kg": 1.0},
+    ],
+)
+def test_bad_distributions_raise(distributions):
+    with pytest.raises(ValueError):
+        run_uncertainty_simulation(INPUTS, distributions, samples=10, seed=0)
+
+
+@pytest.mark.parametrize("samples", [0, -1, 1.5, True])
+def test_bad_sample_counts_raise(samples):
+    with pytest.raises(ValueError):
+        run_uncertainty_simulation(INPUTS, DISTRIBUTIONS, samples=samples, seed=0)
+
+
+def test_hundred_thousand_samples_run_in_seconds():
+    start = time.perf_counter()
+    run_uncertainty_simulation(INPUTS, DISTRIBUTIONS, samples=100_000, seed=0)
+    assert time.perf_counter() - start < 5.0
+
+
+def test_entry_outcomes_follow_diameter(monkeypatch):
+    monkeypatch.setattr(uncertainty, "ENTRY_SAMPLES", 200)
+    distributions = {
+        **DISTRIBUTIONS,
+        "diameter_m": {"type": "uniform", "low": 10.0, "high": 1_000.0},
+    }
+    data = run_uncertainty_simulation(INPUTS, distributions, samples=1_000, seed=2)
+
+    entry = data["outputs"]["entry"]
+    fractions = entry["terminal_type_fraction"]
+    assert entry["samples"] == 200
+    assert fractions["airburst"] > 0 and fractions["impact"] > 0
+    assert sum(fractions.values()) == pytest.approx(1.0)
+    assert entry["h1_breakup_begin_m"]["p5"] <= entry["h1_breakup_begin_m"]["p95"]
+    assert entry["h3_airburst_or_surface_m"]["p5"] == 0.0
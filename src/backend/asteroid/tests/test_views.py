@@ -0,0 +1,641 @@
+import json
+import struct
+
+import msgpack
+import numpy as np
+import pytest
+from django.urls import reverse
+
+from asteroid import simulations, views
+from asteroid.models import Simulation
+from asteroid.utils import compute_simulation_id, normalize_params
+
+INPUTS = {
+    "diameter_m": 50.0,
+    "density_kg_m3": 3000.0,
+    "material_type": "crystalline",
+    "entry_speed_m_s": 20000.0,
+    "entry_angle_deg": 45.0,
+    "azimuth_deg": 90.0,
+    "aim_point": {"lat": 0.1, "lon": 0.1},
+}
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def population_raster(tmp_path, monkeypatch, write_raster):
+    path = write_raster(
+        str(tmp_path / "pop.tif"),
+        np.ones((400, 400)),
+        origin=(-50_000.0, 50_000.0),
+    )
+    monkeypatch.setenv("DATASET_GHS_POP_URL", path)
+    return path
+
+
+@pytest.fixture
+def run_counter(monkeypatch):
+    calls = []
+    run_simulation = simulations.run_simulation
+
+    def counting_run(simulation_id, normalized_params):
+        calls.append(simulation_id)
+        return run_simulation(simulation_id, normalized_params)
+
+    monkeypatch.setattr(simulations, "run_simulation", counting_run)
+    return calls
+
+
+def post_simulation(client, inputs=INPUTS, **options):
+    return client.post(
+        reverse("simulations_compute_view"),
+        {"inputs": inputs, **options},
+        content_type="application/json",
+    )
+
+
+def test_compute_returns_params_hash_as_id(client):
+    response = post_simulation(client)
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["id"] == compute_simulation_id(normalize_params(INPUTS))
+    assert len(data["panel"]["rings"]) == 6
+
+
+def test_compute_fills_entry_altitudes(client):
+    data = post_simulation(client, {**INPUTS, "diameter_m": 20.0}).json()["data"]
+
+    entry = data["panel"]["entry"]
+    assert entry["terminal_type"] == "airburst"
+    assert entry["h1_breakup_begin_m"] > entry["h3_airburst_or_surface_m"] > 0
+    assert entry["impact_velocity_m_s"] is None
+    assert not data["panel"]["crater_final"]["formed"]
+
+
+def test_legacy_input_names_are_the_same_scenario(client):
+    # What the frontend sends: top-level lat/lon and the old speed/azimuth names
+    legacy = {
+        "diameter_m": 50.0,
+        "density_kg_m3": 3000.0,
+        "material_type": "crystalline",
+        "entry_velocity_m_s": 20000.0,
+        "entry_angle_deg": 45.0,
+        "azimuth_angle_deg": 90.0,
+        "lat": 0.1,
+        "lon": 0.1,
+    }
+
+    assert normalize_params(legacy) == normalize_params(INPUTS)
+    assert post_simulation(client, legacy).json()["data"]["id"] == (
+        post_simulation(client).json()["data"]["id"]
+    )
+
+
+def test_missing_dataset_is_a_server_error(client, monkeypatch):
+    # A configuration problem, not a bad request
+    monkeypatch.delenv("DATASET_GHS_POP_URL")
+    client.raise_request_exception = False
+    assert post_simulation(client).status_code == 500
+
+
+def test_compute_rejects_bad_entry_angle(client):
+    assert (
+        post_simulation(client, {**INPUTS, "entry_angle_deg": 120.0}).status_code == 400
+    )
+
+
+def test_compute_stores_simulation(client):
+    data = post_simulation(client).json()["data"]
+
+    simulation = Simulation.objects.get(pk=data["id"])
+    assert simulation.inputs == normalize_params(INPUTS)
+    assert simulation.outputs == data
+
+
+def test_repeated_compute_is_served_from_storage(client, run_counter):
+    first = post_simulation(client).json()
+    second = post_simulation(client).json()
+
+    assert first == second
+    assert len(run_counter) == 1
+    assert Simulation.objects.count() == 1
+
+
+def test_compute_requires_inputs(client):
+    response = client.post(
+        reverse("simulations_compute_view"), {}, content_type="application/json"
+    )
+    assert response.status_code == 400
+
+
+def test_fetch_returns_stored_simulation(client):
+    data = post_simulation(client).json()["data"]
+
+    response = client.get(reverse("simulations_fetch_view", args=[data["id"]]))
+
+    assert response.status_code == 200
+    assert response.json()["data"] == data
+
+
+def test_fetch_unknown_simulation_is_404(client):
+    response = client.get(reverse("simulations_fetch_view", args=["0" * 64]))
+    assert response.status_code == 404
+
+
+def test_fetch_sends_etag_and_cache_headers(client):
+    data = post_simulation(client).json()["data"]
+
+    response = client.get(reverse("simulations_fetch_view", args=[data["id"]]))
+
+    assert response["ETag"] == f'"{data["id"]}-v{data["meta"]["version"]}"'
+    # The URL has no version, so caches must revalidate to see a bump
+    cache_control = response["Cache-Control"]
+    assert "public" in cache_control
+    assert "no-cache" in cache_control
+    assert "immutable" not in cache_control
+
+
+def test_fetch_of_current_version_is_immutable(client, monkeypatch):
+    data = post_simulation(client).json()["data"]
+    url = reverse("simulations_fetch_view", args=[data["id"]])
+
+    response = client.get(url, {"v": data["meta"]["version"]})
+    assert response.status_code == 200
+    assert post_simulation(client)["Content-Location"] == (
+        f"{url}?v={data['meta']['version']}"
+    )
+    cache_control = response["Cache-Control"]
+    assert "immutable" in cache_control
+    assert f"max-age={views.SIMULATION_CACHE_MAX_AGE_S}" in cache_control
+
+    # After a bump the old versioned URL is revalidated like the plain one
+    next_version = str(int(simulations.SIMULATION_VERSION) + 1)
+    monkeypatch.setattr(simulations, "SIMULATION_VERSION", next_version)
+    cache_control = client.get(url, {"v": data["meta"]["version"]})["Cache-Control"]
+    assert "no-cache" in cache_control and "immutable" not in cache_control
+
+
+@pytest.mark.parametrize("tag_format", ["{}", "W/{}", '"other", {}'])
+def test_fetch_matching_etag_is_304(client, tag_format):
+    data = post_simulation(client).json()["data"]
+    url = reverse("simulations_fetch_view", args=[data["id"]])
+    etag = client.get(url)["ETag"]
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=tag_format.format(etag))
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert not response.content
+
+
+def test_fetch_if_none_match_star(client):
+    data = post_simulation(client).json()["data"]
+    url = reverse("simulations_fetch_view", args=[data["id"]])
+
+    assert client.get(url, HTTP_IF_NONE_MATCH="*").status_code == 304
+    missing = reverse("simulations_fetch_view", args=["0" * 64])
+    assert client.get(missing, HTTP_IF_NONE_MATCH="*").status_code == 404
+
+
+def test_fetch_deleted_simulation_is_404_despite_etag(client):
+    data = post_simulation(client).json()["data"]
+    url = reverse("simulations_fetch_view", args=[data["id"]])
+    etag = client.get(url)["ETag"]
+
+    Simulation.objects.filter(pk=data["id"]).delete()
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+
+def test_fetch_stale_etag_is_200(client):
+    data = post_simulation(client).json()["data"]
+    url = reverse("simulations_fetch_view", args=[data["id"]])
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=f'"{data["id"]}-v0"')
+
+    assert response.status_code == 200
+
+
+def test_version_bump_changes_etag_and_recomputes(client, run_counter, monkeypatch):
+    data = post_simulation(client).json()["data"]
+    url = reverse("simulations_fetch_view", args=[data["id"]])
+    old_etag = client.get(url)["ETag"]
+
+    next_version = str(int(simulations.SIMULATION_VERSION) + 1)
+    monkeypatch.setattr(simulations, "SIMULATION_VERSION", next_version)
+    response = client.get(url, HTTP_IF_NONE_MATCH=old_etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != old_etag
+    assert response.json()["data"]["meta"]["version"] == next_version
+    stored = Simulation.objects.get(pk=data["id"])
+    assert stored.outputs["meta"]["version"] == next_version
+    assert len(run_counter) == 2
+
+
+def post_batch(client, inputs, **options):
+    return client.post(
+        reverse("simulations_batch_view"),
+        {"inputs": inputs, **options},
+        content_type="application/json",
+    )
+
+
+def test_batch_matches_single_simulations(client):
+    scenarios = [
+        INPUTS,
+        {**INPUTS, "diameter_m": 200.0},
+        {
+            **INPUTS,
+            "aim_point": {"lat": -0.2, "lon": 0.1},
+            "material_type": "sedimentary",
+        },
+    ]
+
+    data = post_batch(client, scenarios).json()["data"]
+
+    assert data["count"] == 3
+    columns = data["columns"]
+    for i, inputs in enumerate(scenarios):
+        single = post_simulation(client, inputs).json()["data"]["panel"]
+        assert (
+            columns["energy_released_megatons"][i] == single["energy_released_megatons"]
+        )
+        assert columns["crater_depth_m"][i] == single["crater_final"]["depth_m"]
+        for ring in single["rings"]:
+            name = f"kpa_{ring['threshold_kpa']}"
+            assert columns[f"{name}_radius_m"][i] == ring["radius_m"]
+            assert columns[f"{name}_population"][i] == pytest.approx(ring["population"])
+        assert columns["total_estimated_deaths"][i] == pytest.approx(
+            single["totals"]["total_estimated_deaths"]
+        )
+        entry = single["entry"]
+        assert columns["entry_terminal_type"][i] == entry["terminal_type"]
+        assert columns["entry_breakup_altitude_m"][i] == pytest.approx(
+            entry["h1_breakup_begin_m"]
+        )
+        assert columns["entry_impact_velocity_m_s"][i] == pytest.approx(
+            entry["impact_velocity_m_s"]
+        )
+
+
+def test_batch_accepts_documented_schema(client):
+    # The keys normalize_params documents, not the legacy spellings
+    inputs = {
+        "diameter_m": 50.0,
+        "density_kg_m3": 3000.0,
+        "material_type": "crystalline",
+        "entry_speed_m_s": 20000.0,
+        "entry_angle_deg": 45.0,
+        "azimuth_deg": 90.0,
+        "aim_point": {"lat": 0.1, "lon": 0.1},
+    }
+
+    response = post_batch(client, [inputs, {**inputs, "entry_speed_m_s": 30000.0}])
+
+    assert response.status_code == 200
+    batch = response.json()["data"]["columns"]
+    single = post_simulation(client, inputs).json()["data"]
+    assert single["map"]["center"] == {"lat": 0.1, "lon": 0.1}
+    assert batch["energy_released_megatons"][0] == pytest.approx(
+        single["panel"]["energy_released_megatons"]
+    )
+    assert batch["energy_released_megatons"][1] > batch["energy_released_megatons"][0]
+
+
+def test_batch_reports_invalid_aim_points(client):
+    scenarios = [INPUTS, {**INPUTS, "aim_point": {"lat": 91.0, "lon": 0.0}}]
+
+    response = post_batch(client, scenarios)
+
+    assert response.status_code == 400
+    assert response.json()["invalid_rows"] == {"aim_point.lat": [1]}
+
+
+def test_batch_dedupes_scenarios_and_returns_ids(client):
+    scenarios = [INPUTS, {**INPUTS, "diameter_m": 80.0}, dict(INPUTS)]
+
+    data = post_batch(client, scenarios, include_ids=True).json()["data"]
+
+    assert data["meta"]["unique_scenarios"] == 2
+    assert data["ids"] == [
+        compute_simulation_id(normalize_params(inputs)) for inputs in scenarios
+    ]
+    assert data["columns"]["crater_depth_m"][0] == data["columns"]["crater_depth_m"][2]
+    assert "ids" not in post_batch(client, scenarios).json()["data"]
+
+
+def test_batch_reads_population_once_per_location(client, monkeypatch):
+    calls = []
+    get_disc_populations = simulations.get_disc_populations
+
+    def record(lat, lon, radii_m):
+        calls.append((lat, lon))
+        return get_disc_populations(lat, lon, radii_m)
+
+    monkeypatch.setattr(simulations, "get_disc_populations", record)
+    scenarios = [{**INPUTS, "diameter_m": d} for d in (40.0, 60.0, 80.0)]
+    scenarios.append({**INPUTS, "aim_point": {"lat": 0.2, "lon": 0.1}})
+
+    post_batch(client, scenarios)
+
+    assert sorted(calls) == [(0.1, 0.1), (0.2, 0.1)]
+
+
+def test_batch_reports_invalid_rows(client):
+    scenarios = [
+        INPUTS,
+        {**INPUTS, "diameter_m": -1.0},
+        {**INPUTS, "material_type": "lava"},
+        {**INPUTS, "diameter_m": -1.0},
+    ]
+
+    response = post_batch(client, scenarios)
+
+    assert response.status_code == 400
+    assert response.json()["invalid_rows"] == {
+        "diameter_m": [1, 3],
+        "material_type": [2],
+    }
+
+
+@pytest.mark.parametrize("inputs", [None, [], INPUTS])
+def test_batch_requires_inputs_list(client, inputs):
+    assert post_batch(client, inputs).status_code == 400
+
+
+def test_batch_rejects_too_many_scenarios(client, monkeypatch):
+    monkeypatch.setattr(views, "BATCH_MAX_SCENARIOS", 2)
+    assert post_batch(client, [INPUTS] * 3).status_code == 400
+
+
+def post_uncertainty(client, uncertainty):
+    return client.post(
+        reverse("simulations_uncertainty_view"),
+        {"inputs": INPUTS, "uncertainty": uncertainty},
+        content_type="application/json",
+    )
+
+
+def test_uncertainty_returns_percentiles(client):
+    uncertainty = {
+        "samples": 500,
+        "seed": 3,
+        "distributions": {
+            "diameter_m": {"type": "lognormal", "median": 50.0, "sigma": 0.2}
+        },
+    }
+
+    response = post_uncertainty(client, uncertainty)
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["seed"] == 3
+    assert set(data["outputs"]["total_estimated_deaths"]) == {"p5", "p50", "p95"}
+    assert post_uncertainty(client, uncertainty).json()["data"] == data
+
+
+@pytest.mark.parametrize(
+    "uncertainty",
+    [None, {"samples": 0}, {"distributions": {"diameter_m": {"type": "x"}}}],
+)
+def test_uncertainty_rejects_bad_requests(client, uncertainty):
+    assert post_uncertainty(client, uncertainty).status_code == 400
+
+
+def post_trajectory(client, HTTP_ACCEPT="*/*", **options):
+    return client.post(
+        reverse("simulations_trajectory_view"),
+        {"inputs": INPUTS, **options},
+        content_type="application/json",
+        HTTP_ACCEPT=HTTP_ACCEPT,
+    )
+
+
+def test_trajectory_streams_ndjson_chunks(client, monkeypatch):
+    monkeypatch.setattr(simulations, "TRAJECTORY_CHUNK_SAMPLES", 4)
+
+    response = post_trajectory(client)
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    header, *chunks = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).decode().splitlines()
+    ]
+    assert all(len(chunk) <= 4 * 4 for chunk in chunks)
+    coordinates = [value for chunk in chunks for value in chunk]
+    assert header["samples"] * 4 == len(coordinates)
+    assert coordinates == (
+        post_simulation(client).json()["data"]["asteroid_fall_coordinates"][0]
+    )
+
+
+@pytest.mark.parametrize("step_s", [0, -1, "fast", 1e-9])
+def test_trajectory_rejects_bad_step(client, step_s):
+    assert post_trajectory(client, step_s=step_s).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "inputs",
+    [
+        {"entry_speed_m_s": -1.0},
+        {"entry_angle_deg": 120.0},
+        {"azimuth_deg": "east"},
+        {"aim_point": {"lat": 95.0, "lon": 0.0}},
+    ],
+)
+def test_trajectory_rejects_bad_inputs_before_streaming(client, inputs):
+    response = client.post(
+        reverse("simulations_trajectory_view"),
+        {"inputs": {**INPUTS, **inputs}},
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    assert not response.streaming
+
+
+def test_trajectory_follows_documented_schema(client):
+    inputs = {
+        "entry_speed_m_s": 30000.0,
+        "entry_angle_deg": 45.0,
+        "azimuth_deg": 90.0,
+        "aim_point": {"lat": 10.0, "lon": 20.0},
+    }
+    response = client.post(
+        reverse("simulations_trajectory_view"),
+        {"inputs": inputs},
+        content_type="application/json",
+    )
+    header, *chunks = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).decode().splitlines()
+    ]
+
+    # The path ends on the aim point, travelling east
+    *_, lon, lat, h = chunks[-1][-4:]
+    assert (lat, lon, h) == (pytest.approx(10.0), pytest.approx(20.0), 0)
+    assert chunks[0][1] < lon
+
+
+def test_compute_msgpack_matches_json(client):
+    json_data = post_simulation(client).json()
+
+    response = client.post(
+        reverse("simulations_compute_view"),
+        {"inputs": INPUTS},
+        content_type="application/json",
+        HTTP_ACCEPT="application/msgpack",
+    )
+
+    assert response["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == json_data
+    assert len(response.content) < len(json.dumps(json_data))
+
+
+@pytest.mark.parametrize("dtype, np_dtype", [("float64", "<f8"), ("float32", "<f4")])
+def test_compute_binary_trajectory(client, dtype, np_dtype):
+    data = post_simulation(client).json()["data"]
+
+    response = client.post(
+        reverse("simulations_compute_view"),
+        {"inputs": INPUTS},
+        content_type="application/json",
+        HTTP_ACCEPT=f"application/vnd.asteroidsim.trajectory; dtype={dtype}",
+    )
+
+    assert response["Content-Type"].endswith(f"dtype={dtype}")
+    (header_size,) = struct.unpack("<I", response.content[:4])
+    assert (4 + header_size) % 8 == 0
+    header = json.loads(response.content[4 : 4 + header_size])
+    samples = np.frombuffer(response.content[4 + header_size :], dtype=np_dtype)
+
+    coordinates = data.pop("asteroid_fall_coordinates")[0]
+    assert header.pop("trajectory") == {
+        "fields": ["t", "lon", "lat", "h"],
+        "dtype": dtype,
+        "samples": len(coordinates) // 4,
+    }
+    assert header == data
+    np.testing.assert_array_equal(samples, np.array(coordinates, dtype=np_dtype))
+
+
+def test_fetch_etag_differs_per_format(client):
+    url = reverse(
+        "simulations_fetch_view", args=[post_simulation(client).json()["data"]["id"]]
+    )
+
+    json_response = client.get(url)
+    msgpack_response = client.get(url, HTTP_ACCEPT="application/msgpack")
+
+    assert "Accept" in msgpack_response["Vary"]
+    assert msgpack_response["ETag"] != json_response["ETag"]
+    assert msgpack.unpackb(msgpack_response.content) == json_response.json()
+    not_modified = client.get(
+        url,
+        HTTP_ACCEPT="application/msgpack",
+        HTTP_IF_NONE_MATCH=msgpack_response["ETag"],
+    )
+    assert not_modified.status_code == 304
+
+
+def test_batch_msgpack(client):
+    response = client.post(
+        reverse("simulations_batch_view"),
+        {"inputs": [INPUTS, {**INPUTS, "diameter_m": 80.0}]},
+        content_type="application/json",
+        HTTP_ACCEPT="application/msgpack",
+    )
+
+    assert response.status_code == 200
+    assert msgpack.unpackb(response.content)["data"]["count"] == 2
+
+
+def test_trajectory_stream_formats_agree(client):
+    ndjson = b"".join(post_trajectory(client).streaming_content).decode()
+    header, *chunks = [json.loads(line) for line in ndjson.splitlines()]
+    coordinates = [value for chunk in chunks for value in chunk]
+
+    packed = post_trajectory(client, HTTP_ACCEPT="application/msgpack")
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(b"".join(packed.streaming_content))
+    packed_header, *packed_chunks = list(unpacker)
+    assert packed_header == header
+    assert [value for chunk in packed_chunks for value in chunk] == coordinates
+
+    binary = b"".join(
+        post_trajectory(
+            client, HTTP_ACCEPT="application/vnd.asteroidsim.trajectory"
+        ).streaming_content
+    )
+    (header_size,) = struct.unpack("<I", binary[:4])
+    assert json.loads(binary[4 : 4 + header_size])["trajectory"]["samples"] == (
+        header["samples"]
+    )
+    assert np.frombuffer(binary[4 + header_size :], "<f8").tolist() == coordinates
+
+
+def test_binary_trajectory_errors_are_json(client):
+    response = post_trajectory(
+        client, step_s=0, HTTP_ACCEPT="application/vnd.asteroidsim.trajectory"
+    )
+
+    assert response.status_code == 400
+    assert response["Content-Type"] == "application/json"
+    assert "step_s" in response.json()["detail"]
+
+
+def test_trajectory_adaptive_resolution(client):
+    body = b"".join(
+        post_trajectory(client, resolution={"max_points": 5}).streaming_content
+    )
+    header, *chunks = [json.loads(line) for line in body.decode().splitlines()]
+
+    assert header["resolution"] == {"max_points": 5}
+    assert header["samples"] == 5
+    samples = np.array([value for chunk in chunks for value in chunk]).reshape(-1, 4)
+    assert len(samples) == 5
+    assert samples[0, 0] == 0 and samples[-1, 3] == 0
+
+
+@pytest.mark.parametrize(
+    "resolution",
+    [
+        {},
+        {"step_s": 1, "max_points": 5},
+        {"max_points": 1},
+        {"tolerance_m": -1},
+        {"points": 5},
+    ],
+)
+def test_trajectory_rejects_bad_resolution(client, resolution):
+    assert post_trajectory(client, resolution=resolution).status_code == 400
+
+
+def test_compute_samples_trajectory_at_resolution(client):
+    default = post_simulation(client).json()["data"]
+    assert post_simulation(client, resolution={"step_s": 1}).json()["data"] == default
+
+    adaptive = post_simulation(client, resolution={"max_points": 5}).json()["data"]
+    assert adaptive["id"] != default["id"]
+    body = b"".join(
+        post_trajectory(client, resolution={"max_points": 5}).streaming_content
+    )
+    _, *chunks = [json.loads(line) for line in body.decode().splitlines()]
+    assert adaptive["asteroid_fall_coordinates"] == [
+        [value for chunk in chunks for value in chunk]
+    ]
+
+    response = client.get(reverse("simulations_fetch_view", args=[adaptive["id"]]))
+    assert response.json()["data"] == adaptive
+
+
+def test_compute_rejects_too_many_trajectory_samples(client, monkeypatch):
+    monkeypatch.setattr(simulations, "SIMULATION_TRAJECTORY_MAX_SAMPLES", 100)
+    response = post_simulation(client, resolution={"step_s": 0.01})
+    assert response.status_code == 400
+    assert "step_s" in response.json()["detail"]
+    assert post_simulation(client, resolution={"points": 5}).status_code == 400
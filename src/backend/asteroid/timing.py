@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Whether requests are timed; flip at runtime with set_timing_enabled()
+_enabled = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def timing_enabled() -> bool:
+    return _enabled
+
+
+def set_timing_enabled(enabled: bool) -> None:
+    """Turn request timing on or off for this process."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+class _Stage:
+    """One timed pipeline stage, plus counters recorded while it was open.
+
+    Without `timings` (request not timed) only the stage histogram of the
+    metrics endpoint is fed.
+    """
+
+    __slots__ = ("timings", "name", "start", "duration_s", "counters")
+
+    def __init__(self, timings: Optional["RequestTimings"], name: str):
+        self.timings = timings
+        self.name = name
+        self.start = 0.0
+        self.duration_s = 0.0
+        self.counters: Dict[str, float] = {}
+
+    def __enter__(self) -> "_Stage":
+        if self.timings is not None:
+            self.timings.open_stages.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.duration_s = time.perf_counter() - self.start
+        metrics.observe_stage(self.name, self.duration_s)
+        if self.timings is not None:
+            self.timings.open_stages.pop()
+            self.timings.stages.append(self)
+
+
+class _NullStage:
+    """Stand-in when timing and metrics are off, so `with stage(...)` costs next to nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class RequestTimings:
+    """Stages and counters of one request."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.stages: List[_Stage] = []
+        self.open_stages: List[_Stage] = []
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Milliseconds, occurrences and summed counters by stage name, in
+        the order stages first finished."""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for finished in self.stages:
+            entry = summary.setdefault(finished.name, {"ms": 0.0, "count": 0})
+            entry["ms"] += finished.duration_s * 1e3
+            entry["count"] += 1
+            for key, value in finished.counters.items():
+                entry[key] = entry.get(key, 0) + value
+        for entry in summary.values():
+            entry["ms"] = round(entry["ms"], 3)
+        return summary
+
+    def server_timing_header(self, total_ms: float) -> str:
+        """Server-Timing value, counters in each stage's description."""
+        metrics = []
+        for name, entry in self.summary().items():
+            metric = f"{name};dur={entry['ms']:.3f}"
+            counters = [
+                f"{key}={value:g}"
+                for key, value in entry.items()
+                if key not in ("ms", "count")
+            ]
+            if counters:
+                metric += f';desc="{" ".join(counters)}"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={total_ms:.3f}")
+        return ", ".join(metrics)
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("timings", default=None)
+
+
+def stage(name: str):
+    """
+    Context manager timing one pipeline stage of the current request, e.g.
+    `with stage("population"): ...`. Outside timed requests only its
+    duration is recorded for the metrics endpoint.
+    """
+    timings = _timings.get()
+    if timings is None and not metrics.METRICS_ENABLED:
+        return _NULL_STAGE
+    return _Stage(timings, name)
+
+
+def count(key: str, amount: float = 1) -> None:
+    """Add `amount` to counter `key` of the innermost open stage, e.g.
+    count("pixels", 4096) or count("cache_hits")."""
+    timings = _timings.get()
+    if timings is None or not timings.open_stages:
+        return
+    counters = timings.open_stages[-1].counters
+    counters[key] = counters.get(key, 0) + amount
+
+
+class ServerTimingMiddleware:
+    """
+    Times every request while timing is enabled: stage durations and
+    counters go to the Server-Timing header and to one JSON log line on the
+    asteroid.timing logger.
+
+    Streamed bodies are produced after the response leaves the middleware,
+    only the work done before that is timed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _enabled:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+
+        total_ms = (time.perf_counter() - timings.start) * 1e3
+        response["Server-Timing"] = timings.server_timing_header(total_ms)
+        logger.info(
+            json.dumps(
+                {
+                    "event": "server_timing",
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "total_ms": round(total_ms, 3),
+                    "stages": timings.summary(),
+                }
+            )
+        )
+        return response
@@ -0,0 +1,273 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .batch_calculations import run_physics_batch
+from .constants import (
+    CRATER_MATERIAL_SF,
+    ENTRY_HEIGHT_M,
+    KPA_FATALITY_RATE,
+    RING_THRESHOLDS_KPA,
+)
+from .entry import TERMINAL_TYPES, simulate_entry_batch
+from .population import get_radial_population_profile
+
+# Samples used when the request does not say
+DEFAULT_SAMPLES = 10_000
+# Upper bound on samples per request
+MAX_SAMPLES = int(os.getenv("UNCERTAINTY_MAX_SAMPLES", 1_000_000))
+# Radii in the population profile interpolated for every sample
+PROFILE_POINTS = int(os.getenv("UNCERTAINTY_PROFILE_POINTS", 256))
+# Samples flown through the atmosphere; entry integration costs far more per
+# sample than the closed-form physics, and the samples are independent, so
+# the first ones are an unbiased subset
+ENTRY_SAMPLES = int(os.getenv("UNCERTAINTY_ENTRY_SAMPLES", 2000))
+PERCENTILES = (5, 50, 95)
+
+# Parameters of every distribution type, in the order they are passed on
+DISTRIBUTION_PARAMS = {
+    "normal": ("mean", "std"),
+    "lognormal": ("median", "sigma"),  # sigma of log(x)
+    "uniform": ("low", "high"),
+}
+
+# Inputs that can be given a distribution, with the range a sample must fall in
+UNCERTAIN_INPUTS = {
+    "diameter_m": (0.0, np.inf),
+    "density_kg_m3": (0.0, np.inf),
+    "entry_speed_m_s": (0.0, np.inf),
+    "entry_angle_deg": (0.0, 90.0),
+}
+
+# Rounds of redrawing out-of-range samples before giving up
+_MAX_REDRAWS = 100
+
+
+@dataclass
+class Distribution:
+    """A sampling distribution for one uncertain input."""
+
+    type: str
+    params: Dict[str, float]
+
+    @classmethod
+    def parse(cls, name: str, spec: Any) -> "Distribution":
+        """Build from a request value: a number (fixed) or {"type": ..., params}.
+
+        Raises:
+            ValueError: unknown type, missing/non-finite parameters or an
+            impossible parameter combination
+        """
+        if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+            return cls("uniform", {"low": float(spec), "high": float(spec)})
+        if not isinstance(spec, dict):
+            raise ValueError(f"{name} must be a number or a distribution object.")
+
+        dist_type = spec.get("type")
+        if dist_type not in DISTRIBUTION_PARAMS:
+            allowed = ", ".join(sorted(DISTRIBUTION_PARAMS))
+            raise ValueError(f"{name}.type must be one of: {allowed}.")
+
+        params = {}
+        for param in DISTRIBUTION_PARAMS[dist_type]:
+            value = spec.get(param)
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or not np.isfinite(value)
+            ):
+                raise ValueError(f"{name}.{param} must be a finite number.")
+            params[param] = float(value)
+
+        if dist_type == "normal" and params["std"] < 0:
+            raise ValueError(f"{name}.std must be >= 0.")
+        if dist_type == "lognormal" and (params["median"] <= 0 or params["sigma"] < 0):
+            raise ValueError(f"{name}.median must be > 0 and {name}.sigma >= 0.")
+        if dist_type == "uniform" and params["low"] > params["high"]:
+            raise ValueError(f"{name}.low must be <= {name}.high.")
+        return cls(dist_type, params)
+
+    def draw(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.type == "normal":
+            return rng.normal(self.params["mean"], self.params["std"], size)
+        if self.type == "lognormal":
+            return self.params["median"] * np.exp(
+                rng.normal(0.0, self.params["sigma"], size)
+            )
+        return rng.uniform(self.params["low"], self.params["high"], size)
+
+    def sample(
+        self, rng: np.random.Generator, size: int, low: float, high: float
+    ) -> np.ndarray:
+        """Draw `size` samples in (low, high], redrawing the ones outside it."""
+        samples = self.draw(rng, size)
+        for _ in range(_MAX_REDRAWS):
+            outside = ~((samples > low) & (samples <= high))
+            if not np.any(outside):
+                return samples
+            samples[outside] = self.draw(rng, int(np.count_nonzero(outside)))
+        raise ValueError(
+            f"Distribution {self.type} {self.params} rarely falls in ({low}, {high}]."
+        )
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, Optional[float]]:
+    """Percentiles of the non-NaN values, None if there are none."""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {f"p{q}": None for q in PERCENTILES}
+    return {
+        f"p{q}": value
+        for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist())
+    }
+
+
+def run_uncertainty_simulation(
+    normalized_params: Dict[str, Any],
+    distributions: Dict[str, Any],
+    samples: int = DEFAULT_SAMPLES,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Propagate input uncertainty through the physics chain by Monte Carlo.
+
+    Every sample runs through batch_calculations.run_physics_batch and
+    entry.simulate_entry_batch. The
+    population around the (fixed) impact point is read once as a radial
+    profile (see population.get_radial_population_profile) and interpolated
+    at each sample's ring radii in r^2, which is exact for uniform density.
+
+    Params:
+        normalized_params (dict[str, Any]): output of normalize_params(),
+            supplies every input without a distribution
+        distributions (dict[str, Any]): input name -> number or
+            {"type": "normal" | "lognormal" | "uniform", ...params}
+        samples (int): number of Monte Carlo samples
+        seed (int | None): RNG seed, a fresh one is drawn and returned if None
+
+    Returns:
+        dict[str, Any]: P5/P50/P95 of the inputs and of energy, crater
+        diameters, ring radii, deaths and entry altitudes, the share of
+        samples per entry outcome, plus the seed to reproduce the run
+
+    Raises:
+        ValueError: bad distributions, sample count or seed
+    """
+    if isinstance(samples, bool) or not isinstance(samples, int):
+        raise ValueError("samples must be an integer.")
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES}.")
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**63)
+    if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+        raise ValueError("seed must be a non-negative integer.")
+    if not isinstance(distributions, dict):
+        raise ValueError("distributions must be an object.")
+    unknown = set(distributions) - set(UNCERTAIN_INPUTS)
+    if unknown:
+        allowed = ", ".join(UNCERTAIN_INPUTS)
+        raise ValueError(
+            f"Unknown distributions {sorted(unknown)}, allowed: {allowed}."
+        )
+
+    material_type = normalized_params.get("material_type")
+    if material_type not in CRATER_MATERIAL_SF:
+        allowed = ", ".join(sorted(CRATER_MATERIAL_SF.keys()))
+        raise ValueError(f"material_type must be one of: {allowed}.")
+
+    # Draw in a fixed input order so a seed always gives the same samples
+    rng = np.random.default_rng(seed)
+    inputs: Dict[str, np.ndarray] = {}
+    for name, (low, high) in UNCERTAIN_INPUTS.items():
+        spec = distributions.get(name, normalized_params.get(name))
+        distribution = Distribution.parse(name, spec)
+        inputs[name] = distribution.sample(rng, samples, low, high)
+
+    physics = run_physics_batch(
+        inputs["diameter_m"],
+        inputs["density_kg_m3"],
+        inputs["entry_speed_m_s"],
+        material_type,
+        fall_height_m=ENTRY_HEIGHT_M,
+    )
+
+    entry_samples = min(samples, ENTRY_SAMPLES)
+    entry = simulate_entry_batch(
+        inputs["diameter_m"][:entry_samples],
+        inputs["density_kg_m3"][:entry_samples],
+        inputs["entry_speed_m_s"][:entry_samples],
+        inputs["entry_angle_deg"][:entry_samples],
+        ENTRY_HEIGHT_M,
+    )
+
+    ring_names = [f"kpa_{kpa}" for kpa in RING_THRESHOLDS_KPA]
+    # Rings are nested discs, see simulations.run_simulation
+    ring_radii_m = np.maximum.accumulate(
+        np.column_stack(
+            [physics["crater_final_diameter_m"] / 2]
+            + [physics[name] for name in ring_names]
+        ),
+        axis=1,
+    )
+
+    profile_radii_m, profile_populations = get_radial_population_profile(
+        normalized_params["aim_point"]["lat"],
+        normalized_params["aim_point"]["lon"],
+        float(ring_radii_m.max()),
+        PROFILE_POINTS,
+    )
+    disc_populations = np.interp(
+        ring_radii_m**2, profile_radii_m**2, profile_populations
+    )
+    populations = np.diff(disc_populations, axis=1, prepend=0.0)
+
+    fatality_rates = np.array(
+        [1.0] + [KPA_FATALITY_RATE.get(name, 0) for name in ring_names]
+    )
+    total_deaths = populations @ fatality_rates
+
+    return {
+        "samples": samples,
+        "seed": seed,
+        "inputs": {name: _percentiles(values) for name, values in inputs.items()},
+        "outputs": {
+            "energy_released_megatons": _percentiles(physics["energy_mt"]),
+            "crater_transient_diameter_m": _percentiles(
+                physics["crater_transient_diameter_m"]
+            ),
+            "crater_final_diameter_m": _percentiles(physics["crater_final_diameter_m"]),
+            "rings": [
+                {
+                    "threshold_kpa": kpa,
+                    "radius_m": _percentiles(physics[name]),
+                }
+                for kpa, name in zip(RING_THRESHOLDS_KPA, ring_names)
+            ],
+            "total_estimated_deaths": _percentiles(total_deaths),
+            "entry": {
+                "samples": entry_samples,
+                "terminal_type_fraction": {
+                    terminal_type: float(
+                        np.mean(entry["terminal_type"] == terminal_type)
+                    )
+                    for terminal_type in TERMINAL_TYPES
+                },
+                "h1_breakup_begin_m": _percentiles(entry["breakup_altitude_m"]),
+                "h2_peak_energy_m": _percentiles(entry["peak_energy_altitude_m"]),
+                "h3_airburst_or_surface_m": _percentiles(entry["terminal_altitude_m"]),
+                "impact_velocity_m_s": _percentiles(entry["impact_velocity_m_s"]),
+            },
+        },
+        "meta": {
+            "units": "SI; lat/lon degrees WGS-84",
+            "percentiles": list(PERCENTILES),
+            "notes": [
+                "Entry angle only affects the entry outputs.",
+                "Entry outputs use the first entry.samples samples; their "
+                "percentiles are over the samples a value applies to, e.g. h1 "
+                "over those that break up.",
+            ],
+        },
+    }
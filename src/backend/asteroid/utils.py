@@ -1,7 +1,9 @@
 import hashlib
 import json
 import math
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
 
 
 def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -31,6 +33,12 @@ def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
         "azimuth_deg": 90.0,
     }
     AIM_POINT_DEFAULTS = {"lat": 0.0, "lon": 0.0}
+    # Names older clients (and the frontend) send, used when the documented
+    # field is missing and dropped so both spellings hash alike
+    ALIASES = {
+        "entry_speed_m_s": "entry_velocity_m_s",
+        "azimuth_deg": "azimuth_angle_deg",
+    }
 
     def _round_if_numeric(key: str, value: Any) -> Any:
         """Round using PRECISION[key] if present and value is numeric; else return as-is."""
@@ -47,21 +55,26 @@ def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
 
     # Apply defaults + rounding
     for key, default in DEFAULTS.items():
-        normalized_params[key] = _round_if_numeric(key, params.get(key, default))
+        value = params.get(key, params.get(ALIASES.get(key), default))
+        normalized_params[key] = _round_if_numeric(key, value)
 
     # Ensure aim_point exists, fill defaults for lat/lon, and round them
     aim_point_param = params.get("aim_point")
     if not isinstance(aim_point_param, dict):
         aim_point_param = {}
 
+    # A top-level lat/lon is the legacy spelling of the aim point
     lat = _round_if_numeric(
-        "lat", aim_point_param.get("lat", AIM_POINT_DEFAULTS["lat"])
+        "lat", aim_point_param.get("lat", params.get("lat", AIM_POINT_DEFAULTS["lat"]))
     )
     lon = _round_if_numeric(
-        "lon", aim_point_param.get("lon", AIM_POINT_DEFAULTS["lon"])
+        "lon", aim_point_param.get("lon", params.get("lon", AIM_POINT_DEFAULTS["lon"]))
     )
     normalized_params["aim_point"] = {**aim_point_param, "lat": lat, "lon": lon}
 
+    for alias in (*ALIASES.values(), "lat", "lon"):
+        normalized_params.pop(alias, None)
+
     return normalized_params
 
 
@@ -108,3 +121,60 @@ def as_finite_positive_float(name: str, value: Any) -> float:
     if x <= 0:
         raise ValueError(f"{name} must be positive.")
     return x
+
+
+class RowValidationError(ValueError):
+    """Raised by the batch functions when some rows hold invalid values.
+
+    `rows` maps each offending field name to the indices of its bad rows.
+    """
+
+    def __init__(self, rows: Dict[str, List[int]]):
+        self.rows = rows
+        details = "; ".join(
+            f"{name} at rows {indices[:10]}{'...' if len(indices) > 10 else ''}"
+            for name, indices in rows.items()
+        )
+        super().__init__(f"Invalid values: {details}.")
+
+
+def as_float_array(name: str, values: Any) -> np.ndarray:
+    """Array counterpart of the type check in as_finite_positive_float.
+
+    - accepts scalars, sequences and arrays of int/float
+    - strings, objects and bool arrays are NOT accepted
+    - raises TypeError for non-numeric dtypes; values are not range-checked
+    """
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf":
+        raise TypeError(f"{name} must be an array of numbers.")
+    return np.atleast_1d(array.astype(np.float64))
+
+
+def as_float_columns(**columns: Any) -> Tuple[np.ndarray, ...]:
+    """Convert every column to float64 and broadcast them to one 1-D length."""
+    arrays = [as_float_array(name, values) for name, values in columns.items()]
+    try:
+        arrays = np.broadcast_arrays(*arrays)
+    except ValueError:
+        lengths = {name: len(array) for name, array in zip(columns, arrays)}
+        raise ValueError(f"Columns must have matching lengths, got {lengths}.")
+    if arrays[0].ndim != 1:
+        raise ValueError("Columns must be 1-D.")
+    return tuple(arrays)
+
+
+def is_finite_positive(values: np.ndarray) -> np.ndarray:
+    """Element-wise counterpart of the range check in as_finite_positive_float."""
+    return np.isfinite(values) & (values > 0)
+
+
+def raise_for_invalid_rows(invalid: Dict[str, np.ndarray]) -> None:
+    """Raise RowValidationError listing the rows flagged True in every mask."""
+    rows = {
+        name: np.flatnonzero(mask).tolist()
+        for name, mask in invalid.items()
+        if np.any(mask)
+    }
+    if rows:
+        raise RowValidationError(rows)
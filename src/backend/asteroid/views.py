@@ -1,41 +1,76 @@
-from typing import Any, Dict
-
-from django.http import JsonResponse
+from django.http import (Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views import View
 from rest_framework import status
-from rest_framework.exceptions import ParseError
+from rest_framework.exceptions import NotFound, ParseError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from asteroid.models import Asteroid
-from asteroid.serializers import BriefAsteroidSerializer
-
-from .api_calls import call_sbdb_lookup, extract_spkid
-from .calculations import (caclulate_asteroid_impact_mass,
-                           calculate_asteroid_fall_trajecotry_coordinates,
-                           calculate_crater_depth_final,
-                           calculate_crater_diameter_final,
-                           calculate_crater_diameter_transient,
-                           calculate_fall_time, calculate_impact_energy,
-                           calculate_rings, get_population_in_radius)
+from . import metrics
+from .api_calls import SBDBError, call_sbdb_lookup, extract_spkid
+from .catalog import find_spkid
+from .listing import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, list_asteroids,
+                      parse_filters)
+from .renderers import (SIMULATION_RENDERERS, SIMULATION_TRAJECTORY_RENDERERS,
+                        STREAM_RENDERERS, representation_tag)
+from .search import search_index
+from .simulations import (BATCH_MAX_SCENARIOS, get_or_run_simulation,
+                          get_stored_simulation, has_stored_simulation,
+                          is_current_version, run_simulation_batch,
+                          simulation_etag, stream_trajectory,
+                          with_trajectory_resolution)
+from .timing import stage
+from .uncertainty import DEFAULT_SAMPLES, run_uncertainty_simulation
+from .utils import RowValidationError, normalize_params
+
+# Fetched results are immutable per id and ?v= version, let browsers and
+# proxies keep them
+SIMULATION_CACHE_MAX_AGE_S = 365 * 24 * 60 * 60
 
-from .constants import KPA_FATALITY_RATE
-from .physics_helpers import calculate_mass, calculate_volume
-from .utils import compute_simulation_id, normalize_params
 
-
-# are we still doing the character thing to need this? @lukas
 class AsteroidListView(APIView):
-    queryset = Asteroid.objects.all()
-    serializers = BriefAsteroidSerializer
+    def get(self, request):
+        """
+        Cursor-paginated catalog listing:
+        GET ?limit=100&cursor=<next_cursor>&diameter_min=0.14&h_max=22&pha=true
+        Follow 'next_cursor' until it is null; 'count' is the filtered total.
+        """
+        try:
+            filters = parse_filters(request.query_params)
+            limit = int(request.query_params.get("limit", DEFAULT_PAGE_SIZE))
+            if not 0 < limit <= MAX_PAGE_SIZE:
+                raise ValueError(f"'limit' must be between 1 and {MAX_PAGE_SIZE}.")
+            page = list_asteroids(filters, request.query_params.get("cursor"), limit)
+        except ValueError as e:
+            return JsonResponse({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "count": page.count,
+                "next_cursor": page.next_cursor,
+                "results": page.results,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class SimulationsComputeView(APIView):
+    renderer_classes = SIMULATION_TRAJECTORY_RENDERERS
+
     def post(self, request):
         """
         Accepts a POST payload containing an 'inputs' object, e.g.:
         {
-            "inputs": { ...simulation parameters... }
+            "inputs": { ...simulation parameters... },
+            "resolution": {"max_points": 50}
         }
+
+        The optional "resolution" samples "asteroid_fall_coordinates" as in
+        the trajectory stream (default 1 s steps); scenarios differing only
+        in resolution are separate simulations with their own ids.
         """
 
         try:
@@ -46,220 +81,196 @@ class SimulationsComputeView(APIView):
                 "e.g. {'inputs': {...simulation parameters...}}"
             )
 
-        fall_height_m = 120 * 1000  # 12km
-
-        normalized_params = normalize_params(raw_params)
+        try:
+            with stage("normalize"):
+                normalized_params = with_trajectory_resolution(
+                    normalize_params(raw_params), request.data.get("resolution")
+                )
+            return_data = get_or_run_simulation(normalized_params)
+        except ValueError as e:
+            raise ParseError(detail=str(e))
+
+        response = Response({"data": return_data}, status=status.HTTP_200_OK)
+        # The versioned fetch URL, which caches may keep without revalidating
+        response["Content-Location"] = "{}?v={}".format(
+            reverse("simulations_fetch_view", args=[return_data["id"]]),
+            return_data["meta"]["version"],
+        )
+        return response
 
-        azimuth_angle_deg = normalized_params.get("azimuth_angle_deg", 0)
-        asteroid_entry_angle_deg = normalized_params.get("entry_angle_deg", 0)
-        asteroid_composition = normalized_params.get("material_type", 0)
-        asteroid_density_kg_m3 = normalized_params.get("density_kg_m3", 0)
-        asteroid_diameter_m = normalized_params.get("diameter_m", 0)
-        lat = normalized_params.get("lat", 0)
-        lon = normalized_params.get("lon", 0)
-        entry_velocity_m_s = normalized_params.get("entry_velocity_m_s", 0)
 
-        fall_time_s = calculate_fall_time(fall_height_m, entry_velocity_m_s)
+class SimulationsBatchView(APIView):
+    renderer_classes = SIMULATION_RENDERERS
 
-        asteroid_volume_m3 = calculate_volume(asteroid_diameter_m)
+    def post(self, request):
+        """
+        Accepts a POST payload containing a list of 'inputs' objects, e.g.:
+        {
+            "inputs": [{ ...simulation parameters... }, ...],
+            "include_ids": true
+        }
+        """
 
-        asteroid_mass_kg = calculate_mass(asteroid_volume_m3, asteroid_density_kg_m3)
+        raw_params_list = request.data.get("inputs")
+        if not isinstance(raw_params_list, list) or not raw_params_list:
+            raise ParseError(
+                detail="Request body must include a non-empty 'inputs' list, "
+                "e.g. {'inputs': [{...simulation parameters...}, ...]}"
+            )
+        if len(raw_params_list) > BATCH_MAX_SCENARIOS:
+            raise ParseError(
+                detail=f"At most {BATCH_MAX_SCENARIOS} scenarios per batch."
+            )
 
-        asteroid_mass_on_impact_kg = caclulate_asteroid_impact_mass(
-            asteroid_mass_kg, entry_velocity_m_s, fall_time_s, asteroid_density_kg_m3
-        )
+        try:
+            with stage("normalize"):
+                normalized_params_list = [
+                    normalize_params(raw_params) for raw_params in raw_params_list
+                ]
+            return_data = run_simulation_batch(
+                normalized_params_list,
+                include_ids=request.data.get("include_ids") is True,
+            )
+        except RowValidationError as e:
+            return Response(
+                {"detail": str(e), "invalid_rows": e.rows},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValueError as e:
+            raise ParseError(detail=str(e))
 
+        return Response({"data": return_data}, status=status.HTTP_200_OK)
 
-        impact_energy_Mt_tnt = calculate_impact_energy(
-            asteroid_mass_on_impact_kg, entry_velocity_m_s
-        )
 
-        crater_diameter_trans_m = calculate_crater_diameter_transient(
-            impact_energy_Mt_tnt, asteroid_composition
-        )
-        crater_diameter_m = calculate_crater_diameter_final(crater_diameter_trans_m)
-        crater_depth_m = calculate_crater_depth_final(crater_diameter_m)
+class SimulationsUncertaintyView(APIView):
+    renderer_classes = SIMULATION_RENDERERS
 
-        rings = calculate_rings(
-            impact_energy_Mt_tnt, asteroid_diameter_m, asteroid_composition
-        )
+    def post(self, request):
+        """
+        Accepts a POST payload with the usual 'inputs' plus an 'uncertainty'
+        object, e.g.:
+        {
+            "inputs": { ...simulation parameters... },
+            "uncertainty": {
+                "samples": 10000,
+                "seed": 42,
+                "distributions": {
+                    "diameter_m": {"type": "lognormal", "median": 50, "sigma": 0.3},
+                    "entry_angle_deg": {"type": "normal", "mean": 45, "std": 15}
+                }
+            }
+        }
+        """
 
-        kpa_70_radius_m = rings.get("kpa_70", 0)
-        kpa_50_radius_m = rings.get("kpa_50", 0)
-        kpa_35_radius_m = rings.get("kpa_35", 0)
-        kpa_20_radius_m = rings.get("kpa_20", 0)
-        kpa_10_radius_m = rings.get("kpa_10", 0)
-        kpa_3_radius_m = rings.get("kpa_3", 0)
+        raw_params = request.data.get("inputs")
+        uncertainty = request.data.get("uncertainty")
+        if not isinstance(raw_params, dict) or not isinstance(uncertainty, dict):
+            raise ParseError(
+                detail="Request body must include 'inputs' and 'uncertainty' "
+                "objects, e.g. {'inputs': {...}, 'uncertainty': "
+                "{'samples': 10000, 'distributions': {...}}}"
+            )
 
-        crater_population = get_population_in_radius(lat, lon, crater_diameter_m / 2)
-        kpa_70_population = (
-            get_population_in_radius(lat, lon, kpa_70_radius_m) - crater_population
-        )
-        kpa_50_population = (
-            get_population_in_radius(lat, lon, kpa_50_radius_m)
-            - crater_population
-            - kpa_70_population
-        )
-        kpa_35_population = (
-            get_population_in_radius(lat, lon, kpa_35_radius_m)
-            - crater_population
-            - kpa_70_population
-            - kpa_50_population
-        )
-        kpa_20_population = (
-            get_population_in_radius(lat, lon, kpa_20_radius_m)
-            - crater_population
-            - kpa_70_population
-            - kpa_50_population
-            - kpa_35_population
-        )
-        kpa_10_population = (
-            get_population_in_radius(lat, lon, kpa_10_radius_m)
-            - crater_population
-            - kpa_70_population
-            - kpa_50_population
-            - kpa_35_population
-            - kpa_20_population
-        )
-        kpa_3_population = (
-            get_population_in_radius(lat, lon, kpa_3_radius_m)
-            - crater_population
-            - kpa_70_population
-            - kpa_50_population
-            - kpa_35_population
-            - kpa_20_population
-            - kpa_10_population
-        )
+        try:
+            return_data = run_uncertainty_simulation(
+                normalize_params(raw_params),
+                uncertainty.get("distributions", {}),
+                samples=uncertainty.get("samples", DEFAULT_SAMPLES),
+                seed=uncertainty.get("seed"),
+            )
+        except ValueError as e:
+            raise ParseError(detail=str(e))
 
-        crater_casulties = crater_population
-        kpa_70_casulties = kpa_70_population * KPA_FATALITY_RATE.get("kpa_70", 0)
-        kpa_50_casulties = kpa_50_population * KPA_FATALITY_RATE.get("kpa_50", 0)
-        kpa_35_casulties = kpa_35_population * KPA_FATALITY_RATE.get("kpa_35", 0)
-        kpa_20_casulties = kpa_20_population * KPA_FATALITY_RATE.get("kpa_20", 0)
-        kpa_10_casulties = kpa_10_population * KPA_FATALITY_RATE.get("kpa_10", 0)
-        kpa_3_casulties = kpa_3_population * KPA_FATALITY_RATE.get("kpa_3", 0)
+        return Response({"data": return_data}, status=status.HTTP_200_OK)
 
 
-        asteroid_fall_coordinates = calculate_asteroid_fall_trajecotry_coordinates(
-            azimuth_angle_deg, asteroid_entry_angle_deg, entry_velocity_m_s, fall_time_s
-        )
+class SimulationsTrajectoryView(APIView):
+    renderer_classes = STREAM_RENDERERS
 
-        total_casulties = (
-            crater_casulties
-            + kpa_70_casulties
-            + kpa_50_casulties
-            + kpa_35_casulties
-            + kpa_20_casulties
-            + kpa_10_casulties
-            + kpa_3_casulties
-        )
+    def post(self, request):
+        """
+        Streams the fall trajectory while it is computed:
+        {"inputs": { ...simulation parameters... }, "resolution": {...}}
+
+        "resolution" is {"step_s": 0.1} for a fixed step, or {"max_points": 50}
+        and/or {"tolerance_m": 10} for only as many points as linear
+        interpolation needs (default 1 s steps; a top-level "step_s" works too).
+
+        By default as NDJSON: the first line is a header {"fall_time_s",
+        "samples", "resolution"}, every further line a flat [t, lon, lat, h, ...]
+        chunk as in "asteroid_fall_coordinates"; concatenated, the chunks are
+        the whole path. "Accept: application/msgpack" sends the same objects
+        as MessagePack, "Accept: application/vnd.asteroidsim.trajectory"
+        a raw float buffer (see renderers.TrajectoryBinaryRenderer).
+        """
+        raw_params = request.data.get("inputs")
+        if not isinstance(raw_params, dict):
+            raise ParseError(
+                detail="Request body must include 'inputs' object, e.g. "
+                "{'inputs': {...}, 'resolution': {'tolerance_m': 10}}"
+            )
 
-        return_data = {
-            "id": "id",
-            "map": {
-                "center": {"lat": lat, "lon": lon},
-                "crater_transient_diameter_m": crater_diameter_trans_m,
-                "crater_final_diameter_m": crater_diameter_m,
-                "rings": [
-                    {"threshold_kpa": 70, "radius_m": kpa_70_radius_m},
-                    {"threshold_kpa": 50, "radius_m": kpa_50_radius_m},
-                    {"threshold_kpa": 35, "radius_m": kpa_35_radius_m},
-                    {"threshold_kpa": 20, "radius_m": kpa_20_radius_m},
-                    {"threshold_kpa": 10, "radius_m": kpa_10_radius_m},
-                    {"threshold_kpa": 3, "radius_m": kpa_3_radius_m},
-                ],
-            },
-            "panel": {
-                "energy_released_megatons": impact_energy_Mt_tnt,
-                "crater_final": {
-                    "formed": True,
-                    "diameter_m": crater_diameter_m,
-                    "depth_m": crater_depth_m,
-                },
-                "rings": [
-                    {
-                        "threshold_kpa": 70,
-                        "radius_m": kpa_70_radius_m,
-                        "arrival_time_s": 5.9,
-                        "delta_to_next_s": 2.4,
-                        "population": kpa_70_population,
-                        "estimated_deaths": kpa_70_casulties,
-                        "blurb": "Severe structural damage (reinforced buildings fail).",
-                    },
-                    {
-                        "threshold_kpa": 50,
-                        "radius_m": kpa_50_radius_m,
-                        "arrival_time_s": 8.3,
-                        "delta_to_next_s": 2.7,
-                        "population": kpa_50_population,
-                        "estimated_deaths": kpa_50_casulties,
-                        "blurb": "Heavy damage; most buildings uninhabitable.",
-                    },
-                    {
-                        "threshold_kpa": 35,
-                        "radius_m": kpa_35_radius_m,
-                        "arrival_time_s": 11.0,
-                        "delta_to_next_s": 6.0,
-                        "population": kpa_35_population,
-                        "estimated_deaths": kpa_35_casulties,
-                        "blurb": "Moderate damage; walls collapse, serious injuries.",
-                    },
-                    {
-                        "threshold_kpa": 20,
-                        "radius_m": kpa_20_radius_m,
-                        "arrival_time_s": 17.0,
-                        "delta_to_next_s": 9.0,
-                        "population": kpa_20_population,
-                        "estimated_deaths": kpa_20_casulties,
-                        "blurb": "Light damage; roofs/doors blown in.",
-                    },
-                    {
-                        "threshold_kpa": 10,
-                        "radius_m": kpa_10_radius_m,
-                        "arrival_time_s": 26.0,
-                        "delta_to_next_s": 28.0,
-                        "population": kpa_10_population,
-                        "estimated_deaths": kpa_10_casulties,
-                        "blurb": "Minor damage; most windows shatter.",
-                    },
-                    {
-                        "threshold_kpa": 3,
-                        "radius_m": kpa_3_radius_m,
-                        "arrival_time_s": 54.0,
-                        "delta_to_next_s": None,
-                        "population": kpa_3_population,
-                        "estimated_deaths": kpa_3_casulties,
-                        "blurb": "Pressure wave felt; light glass damage.",
-                    },
-                ],
-                "entry": {
-                    "h1_breakup_begin_m": None,
-                    "h2_peak_energy_m": None,
-                    "h3_airburst_or_surface_m": 0,
-                    "terminal_type": "impact",
-                },
-                "totals": {"total_estimated_deaths": total_casulties},
-            },
-            "asteroid_fall_coordinates": [
-                asteroid_fall_coordinates,
-            ],
-            "meta": {
-                "units": "SI; lat/lon degrees WGS-84",
-                "notes": [
-                    "Impact case (surface crater formed).",
-                    "Arrival times measured from impact time.",
-                    "Population and deaths are per annulus between rings.",
-                ],
-                "version": "1",
-            },
-        }
+        resolution = request.data.get("resolution")
+        if resolution is None and "step_s" in request.data:
+            resolution = {"step_s": request.data["step_s"]}
 
-        return Response({"data": return_data}, status=status.HTTP_200_OK)
+        try:
+            header, chunks = stream_trajectory(normalize_params(raw_params), resolution)
+        except ValueError as e:
+            raise ParseError(detail=str(e))
+
+        renderer, media_type = request.accepted_renderer, request.accepted_media_type
+        response = StreamingHttpResponse(
+            renderer.stream(header, chunks, media_type),
+            content_type=renderer.content_type(media_type),
+        )
+        # Ask proxies (nginx) to pass chunks on instead of buffering the body
+        response["X-Accel-Buffering"] = "no"
+        return response
 
 
 class SimulationsFetchView(APIView):
+    renderer_classes = SIMULATION_TRAJECTORY_RENDERERS
+
     def get(self, request, simulation_id):
-        pass
+        """
+        The stored result of a simulation. With ?v=<meta.version> the URL is
+        bound to the current SIMULATION_VERSION and the result is cached for a
+        year as immutable; a version bump changes the URL. Without it (or with
+        an old version) caches keep the result but revalidate it.
+        """
+        etag = simulation_etag(
+            simulation_id,
+            representation_tag(request.accepted_renderer, request.accepted_media_type),
+        )
+        if_none_match = request.headers.get("If-None-Match", "")
+        client_etags = [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+
+        # An indexed existence check, so unknown or deleted ids are never 304
+        if not has_stored_simulation(simulation_id):
+            raise NotFound(detail=f"Simulation '{simulation_id}' does not exist.")
+        # Results never change for a given id, version and format; "*"
+        # matches any current representation
+        if etag in client_etags or "*" in client_etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            outputs = get_stored_simulation(simulation_id)
+            if outputs is None:
+                raise NotFound(detail=f"Simulation '{simulation_id}' does not exist.")
+            response = Response({"data": outputs}, status=status.HTTP_200_OK)
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Accept"])
+        if is_current_version(request.query_params.get("v")):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=SIMULATION_CACHE_MAX_AGE_S,
+                immutable=True,
+            )
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
 
 
 class NeoIdView(APIView):
@@ -272,7 +283,80 @@ class NeoIdView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        payload = call_sbdb_lookup(name)
-        id = extract_spkid(payload)
+        # The local catalog (manage.py load_neo_catalog) answers most names,
+        # JPL is only asked about the rest
+        id = find_spkid(name)
+        if id is None:
+            try:
+                payload = call_sbdb_lookup(name)
+            except SBDBError as e:
+                return JsonResponse({"detail": e.message}, status=e.http_status)
+            id = extract_spkid(payload)
 
         return Response({"neo_id": id}, status=status.HTTP_200_OK)
+
+
+SEARCH_MAX_LIMIT = 100
+
+
+class AsteroidSearchView(APIView):
+    def get(self, request):
+        """
+        Prefix search over asteroid names, numbers and designations of the
+        local catalog, falling back to fuzzy matching when nothing starts with
+        the query: GET ?q=apoph&offset=0&limit=20 (&fuzzy=true|false to force
+        or disable fuzzy matching).
+        """
+        query = (request.query_params.get("q") or "").strip()
+        if not query:
+            return JsonResponse(
+                {"detail": "Query parameter 'q' is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            offset = int(request.query_params.get("offset", 0))
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            return JsonResponse(
+                {"detail": "'offset' and 'limit' must be integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if offset < 0 or not 0 < limit <= SEARCH_MAX_LIMIT:
+            return JsonResponse(
+                {
+                    "detail": f"'offset' must be >= 0 and 'limit' between 1 and "
+                    f"{SEARCH_MAX_LIMIT}."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fuzzy = request.query_params.get("fuzzy")
+        if fuzzy is not None:
+            fuzzy = fuzzy.lower() in ("1", "true", "yes")
+
+        page = search_index.get().search(query, offset, limit, fuzzy)
+        return Response(
+            {
+                "count": page.count,
+                "offset": offset,
+                "limit": limit,
+                "fuzzy": page.fuzzy,
+                "results": page.results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class MetricsView(View):
+    def get(self, request):
+        """
+        Prometheus text exposition of the request, pipeline stage, cache,
+        raster and SBDB metrics (see metrics.py), merged over all workers
+        when PROMETHEUS_MULTIPROC_DIR is set.
+        """
+        if not metrics.METRICS_ENABLED:
+            raise Http404()
+        return HttpResponse(
+            metrics.render_metrics(), content_type=metrics.CONTENT_TYPE_LATEST
+        )
@@ -45,6 +45,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Outermost after security so its total covers the rest of the stack
+    "asteroid.timing.ServerTimingMiddleware",
+    "asteroid.metrics.MetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -136,3 +139,17 @@ CORS_ALLOWED_ORIGINS = [
     "https://localhost:5173",
     "http://asteroidsim.com",
 ]
+
+
+# Send the app's own log lines (e.g. asteroid.timing summaries) to stdout
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "asteroid": {
+            "handlers": ["console"],
+            "level": os.environ.get("DJANGO_LOGLEVEL", "info").upper(),
+        },
+    },
+}
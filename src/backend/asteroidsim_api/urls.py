@@ -10,13 +10,33 @@ urlpatterns = [
         views.AsteroidListView.as_view(),
         name="asteroid_list_view",
     ),
+    path(
+        "api/asteroid/search/",
+        views.AsteroidSearchView.as_view(),
+        name="asteroid_search_view",
+    ),
     path(
         "api/simulations/",
         views.SimulationsComputeView.as_view(),
         name="simulations_compute_view",
     ),
     path(
-        "api/simulations/<int:simulation_id>/",
+        "api/simulations/batch/",
+        views.SimulationsBatchView.as_view(),
+        name="simulations_batch_view",
+    ),
+    path(
+        "api/simulations/uncertainty/",
+        views.SimulationsUncertaintyView.as_view(),
+        name="simulations_uncertainty_view",
+    ),
+    path(
+        "api/simulations/trajectory/",
+        views.SimulationsTrajectoryView.as_view(),
+        name="simulations_trajectory_view",
+    ),
+    path(
+        "api/simulations/<str:simulation_id>/",
         views.SimulationsFetchView.as_view(),
         name="simulations_fetch_view",
     ),
@@ -25,4 +45,5 @@ urlpatterns = [
         views.NeoIdView.as_view(),
         name="neo_id_view",
     ),
+    path("metrics", views.MetricsView.as_view(), name="metrics_view"),
 ]
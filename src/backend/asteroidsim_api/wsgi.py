@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "asteroidsim_api.settings")
 
 application = get_wsgi_application()
+
+# Only serving processes build the name search index, in the background, so
+# management commands and the first searches do not wait for it
+from asteroid.search import search_index
+
+search_index.refresh_in_background()
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+from django.conf import settings
+
+from asteroid.datasets import (GHS_POP_ENV, GHS_POP_PYRAMID_ENV,
+                               GHS_POP_SAT_ENV, GHS_POP_TILES_ENV,
+                               RasterDataset, dataset_manager,
+                               write_summed_area_table, write_tiled_raster)
+from asteroid.synthetic_population import (SyntheticPopulation, random_cities,
+                                           write_synthetic_population)
+
+# DJANGO_SECRET_KEY is only provided through .env
+if not os.environ.get("DJANGO_SECRET_KEY"):
+    settings.SECRET_KEY = "test-secret-key"
+
+# Synthetic population grid: 1 km pixels (like the 1 km GHSL product) in
+# ESRI:54009 centred on lat/lon 0, wide enough for continental radii
+POPULATION_RESOLUTION_M = 1_000.0
+POPULATION_HALF_WIDTH_PX = 1_100
+
+
+@pytest.fixture(scope="session")
+def population_paths(tmp_path_factory):
+    """Population GeoTIFF, its summed-area table and tiled store, written
+    once per run."""
+    directory = tmp_path_factory.mktemp("population")
+    half_width_m = POPULATION_HALF_WIDTH_PX * POPULATION_RESOLUTION_M
+    bounds_m = (-half_width_m, half_width_m, -half_width_m, half_width_m)
+    # Rural background with a few hundred cities, like a populated continent
+    population = SyntheticPopulation(
+        density_per_km2=20.0, cities=random_cities(0, 300, bounds_m)
+    )
+    raster_path = str(directory / "ghs_pop.tif")
+    write_synthetic_population(
+        raster_path,
+        population,
+        2 * POPULATION_HALF_WIDTH_PX,
+        2 * POPULATION_HALF_WIDTH_PX,
+        POPULATION_RESOLUTION_M,
+    )
+
+    sat_path = str(directory / "ghs_pop_sat.npy")
+    source = RasterDataset.open(raster_path)
+    write_summed_area_table(source, sat_path)
+    tiles_path = write_tiled_raster(source, str(directory / "ghs_pop_tiles"))
+    source.close()
+    return raster_path, sat_path, tiles_path
+
+
+@pytest.fixture(params=["exact", "tiles", "sat"])
+def population(request, population_paths, monkeypatch):
+    """Configure the synthetic population raster, read from the GeoTIFF, from
+    its tiled store, or with its SAT."""
+    raster_path, sat_path, tiles_path = population_paths
+    monkeypatch.setenv(GHS_POP_ENV, raster_path)
+    monkeypatch.delenv(GHS_POP_PYRAMID_ENV, raising=False)
+    if request.param == "tiles":
+        monkeypatch.setenv(GHS_POP_TILES_ENV, tiles_path)
+    else:
+        monkeypatch.delenv(GHS_POP_TILES_ENV, raising=False)
+    if request.param == "sat":
+        monkeypatch.setenv(GHS_POP_SAT_ENV, sat_path)
+    else:
+        monkeypatch.delenv(GHS_POP_SAT_ENV, raising=False)
+    yield request.param
+    dataset_manager.clear()
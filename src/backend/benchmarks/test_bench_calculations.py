@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from asteroid.calculations import (
+    caclulate_asteroid_impact_mass,
+    calculate_asteroid_fall_trajecotry_coordinates,
+    calculate_crater_depth_final, calculate_crater_diameter_final,
+    calculate_crater_diameter_transient, calculate_fall_time,
+    calculate_impact_energy, calculate_ring_radius, calculate_rings,
+    fall_trajectory_samples, geodetic_to_ecef, ground_intercept_from_spawn,
+    iter_fall_trajectory_chunks, select_fall_trajectory_times)
+from asteroid.constants import ENTRY_HEIGHT_M
+
+pytest.importorskip("pytest_benchmark")
+
+# A 100 m stony body at 20 km/s
+MASS_KG = 1.57e9
+VELOCITY_M_S = 20_000.0
+DENSITY_KG_M3 = 3_000.0
+DIAMETER_M = 100.0
+E_MT = 75.0
+FALL_TIME_S = 6.0
+# lat, lon, azimuth, entry angle, velocity, fall time
+TRAJECTORY = (0.1, 0.1, 90.0, 45.0, VELOCITY_M_S, FALL_TIME_S)
+
+
+def test_impact_energy(benchmark):
+    benchmark(calculate_impact_energy, MASS_KG, VELOCITY_M_S)
+
+
+def test_impact_mass(benchmark):
+    benchmark(
+        caclulate_asteroid_impact_mass,
+        MASS_KG,
+        VELOCITY_M_S,
+        FALL_TIME_S,
+        DENSITY_KG_M3,
+    )
+
+
+def test_crater_diameter_transient(benchmark):
+    benchmark(calculate_crater_diameter_transient, E_MT, "crystalline")
+
+
+def test_crater_diameter_final(benchmark):
+    benchmark(calculate_crater_diameter_final, 1_500.0)
+
+
+def test_crater_depth_final(benchmark):
+    benchmark(calculate_crater_depth_final, 1_900.0)
+
+
+def test_fall_time(benchmark):
+    benchmark(calculate_fall_time, ENTRY_HEIGHT_M, VELOCITY_M_S)
+
+
+def test_ring_radius(benchmark):
+    benchmark(calculate_ring_radius, E_MT, 20_000.0, DIAMETER_M, "crystalline")
+
+
+def test_rings(benchmark):
+    benchmark(calculate_rings, E_MT, DIAMETER_M, "crystalline")
+
+
+def test_ground_intercept_from_spawn(benchmark):
+    benchmark(ground_intercept_from_spawn, 0.1, 0.1, 45.0, 90.0)
+
+
+def test_fall_trajectory_samples(benchmark):
+    times_s = np.linspace(0.0, FALL_TIME_S, 1_000)
+    benchmark(fall_trajectory_samples, *TRAJECTORY, times_s)
+
+
+def test_fall_trajectory_coordinates(benchmark):
+    benchmark(calculate_asteroid_fall_trajecotry_coordinates, *TRAJECTORY)
+
+
+def test_iter_fall_trajectory_chunks(benchmark):
+    # 10 Hz over a slow, shallow entry: ~1000 samples in 4 chunks
+    trajectory = (0.1, 0.1, 90.0, 15.0, 11_000.0, 100.0)
+    benchmark(
+        lambda: list(
+            iter_fall_trajectory_chunks(*trajectory, step_s=0.1, chunk_samples=300)
+        )
+    )
+
+
+def test_geodetic_to_ecef(benchmark):
+    n = 4_096
+    benchmark(
+        geodetic_to_ecef,
+        np.linspace(-180.0, 180.0, n),
+        np.linspace(-90.0, 90.0, n),
+        np.linspace(0.0, ENTRY_HEIGHT_M, n),
+    )
+
+
+def test_select_fall_trajectory_times(benchmark):
+    benchmark(select_fall_trajectory_times, *TRAJECTORY, tolerance_m=1.0)
@@ -0,0 +1,48 @@
+import pytest
+from django.urls import reverse
+
+from asteroid.models import Simulation
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = [
+    pytest.mark.django_db,
+    # A production deployment has the full-resolution raster at least
+    pytest.mark.parametrize("population", ["exact"], indirect=True),
+]
+
+INPUTS = {
+    "diameter_m": 100.0,
+    "density_kg_m3": 3000.0,
+    "material_type": "crystalline",
+    "entry_speed_m_s": 20000.0,
+    "entry_angle_deg": 45.0,
+    "aim_point": {"lat": 0.1, "lon": 0.1},
+}
+
+
+def post_simulation(client):
+    response = client.post(
+        reverse("simulations_compute_view"),
+        {"inputs": INPUTS},
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    return response
+
+
+def forget_simulations():
+    Simulation.objects.all().delete()
+
+
+def test_compute_view(benchmark, client, population):
+    post_simulation(client)  # open the datasets
+    # Every round computes, nothing is served from storage
+    benchmark.pedantic(
+        post_simulation, args=(client,), setup=forget_simulations, rounds=20
+    )
+
+
+def test_compute_view_stored(benchmark, client, population):
+    post_simulation(client)  # every later round is a storage hit
+    benchmark(post_simulation, client)
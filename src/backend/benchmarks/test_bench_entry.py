@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from asteroid.entry import simulate_entry, simulate_entry_batch
+
+pytest.importorskip("pytest_benchmark")
+
+# diameter, density, speed, angle: a 100 m stony body bursting high
+BODY = (100.0, 3_000.0, 20_000.0, 45.0)
+
+
+def test_simulate_entry(benchmark):
+    # One per uncached compute
+    benchmark(simulate_entry, *BODY)
+
+
+def test_simulate_entry_batch(benchmark):
+    rng = np.random.default_rng(0)
+    n = 1_000
+    benchmark.pedantic(
+        simulate_entry_batch,
+        args=(
+            rng.uniform(5.0, 500.0, n),
+            rng.uniform(1_500.0, 8_000.0, n),
+            rng.uniform(11_000.0, 40_000.0, n),
+            rng.uniform(10.0, 90.0, n),
+        ),
+        rounds=3,
+    )
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from asteroid.population import (get_disc_populations,
+                                 get_radial_population_profile)
+
+pytest.importorskip("pytest_benchmark")
+
+# Crater-scale, blast-ring-scale and continental radii
+RADII_M = {"small": 5_000.0, "medium": 100_000.0, "continental": 1_000_000.0}
+
+
+@pytest.mark.parametrize("radius_m", RADII_M.values(), ids=RADII_M.keys())
+def test_disc_population(benchmark, population, radius_m):
+    get_disc_populations(0.1, 0.1, [radius_m])  # open the datasets
+    benchmark(get_disc_populations, 0.1, 0.1, [radius_m])
+
+
+@pytest.mark.parametrize("radius_m", RADII_M.values(), ids=RADII_M.keys())
+def test_ring_populations(benchmark, population, radius_m):
+    # Six nested rings, as run_simulation asks for
+    radii_m = radius_m * np.geomspace(0.05, 1.0, 6)
+    get_disc_populations(0.1, 0.1, radii_m)
+    benchmark(get_disc_populations, 0.1, 0.1, radii_m)
+
+
+def test_radial_profile(benchmark, population):
+    get_radial_population_profile(0.1, 0.1, RADII_M["medium"])
+    benchmark(get_radial_population_profile, 0.1, 0.1, RADII_M["medium"])
@@ -0,0 +1,50 @@
+import pytest
+
+from asteroid.calculations import (
+    calculate_asteroid_fall_trajecotry_coordinates, calculate_fall_time,
+    select_fall_trajectory_times)
+from asteroid.constants import ENTRY_HEIGHT_M
+from asteroid.simulations import stream_trajectory
+from asteroid.utils import normalize_params
+
+pytest.importorskip("pytest_benchmark")
+
+ENTRY_ANGLES_DEG = [5.0, 15.0, 45.0, 90.0]
+# Slowest entries have the longest paths, hence the most samples
+ENTRY_VELOCITY_M_S = 11_000.0
+
+
+def trajectory(entry_angle_deg):
+    fall_time_s = calculate_fall_time(ENTRY_HEIGHT_M, ENTRY_VELOCITY_M_S)
+    return (0.1, 0.1, 90.0, entry_angle_deg, ENTRY_VELOCITY_M_S, fall_time_s)
+
+
+@pytest.mark.parametrize("entry_angle_deg", ENTRY_ANGLES_DEG)
+def test_trajectory_coordinates(benchmark, entry_angle_deg):
+    benchmark(
+        calculate_asteroid_fall_trajecotry_coordinates, *trajectory(entry_angle_deg)
+    )
+
+
+@pytest.mark.parametrize("entry_angle_deg", ENTRY_ANGLES_DEG)
+def test_adaptive_trajectory_times(benchmark, entry_angle_deg):
+    benchmark(
+        select_fall_trajectory_times, *trajectory(entry_angle_deg), tolerance_m=1.0
+    )
+
+
+@pytest.mark.parametrize("entry_angle_deg", ENTRY_ANGLES_DEG)
+def test_streamed_trajectory(benchmark, entry_angle_deg):
+    params = normalize_params(
+        {
+            "entry_angle_deg": entry_angle_deg,
+            "entry_speed_m_s": ENTRY_VELOCITY_M_S,
+            "aim_point": {"lat": 0.1, "lon": 0.1},
+        }
+    )
+
+    def stream():
+        header, chunks = stream_trajectory(params, {"step_s": 0.01})
+        return header, list(chunks)
+
+    benchmark(stream)
@@ -0,0 +1,24 @@
+# gunicorn -c gunicorn.conf.py asteroidsim_api.wsgi
+# With PROMETHEUS_MULTIPROC_DIR set, every worker keeps its metrics in
+# memory-mapped files in that directory and /metrics merges all of them.
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.getenv('DJANGO_PORT', '8000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", 4))
+
+
+def on_starting(server):
+    # Files of a previous run would be merged into the new counters
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        # Drop the live gauges of the dead worker, its counters are kept
+        multiprocess.mark_process_dead(worker.pid)